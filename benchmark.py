@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tarfile
+import time
+import zipfile
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: benchmark
+# Purpose: Synthetic collectinfo bundles and repeatable ingest/rule benchmarks.
+# Usage:   python3 benchmark.py make bench.tgz --nodes 150
+#          python3 benchmark.py memory bench.tgz
+#          python3 benchmark.py workers bench.tgz --max-workers 8
+#          python3 benchmark.py load bench.tgz
+#          python3 benchmark.py platform --nodes 20
+#          python3 benchmark.py scan before.db after.db
+#          python3 benchmark.py history --days 90
+
+BASE_SNAPSHOT = datetime.datetime(2026, 1, 20, 23, 0, 14)
+
+
+def synthetic_node(idx, namespaces=4, sets=8, stat_width=400, seed=0):
+    """Builds a single node payload shaped like Aerospike 7.x asadm output."""
+    rnd = random.Random(seed * 100003 + idx)
+    ip = f"10.94.{idx // 250}.{idx % 250 + 1}"
+    ns_names = [f"ns{n}" for n in range(namespaces)]
+
+    service_stats = {f"stat_counter_{i}": rnd.randint(0, 10**9) for i in range(stat_width)}
+    service_stats.update({
+        "client_connections": rnd.randint(50, 500),
+        "client_proxy_error": rnd.randint(0, 50),
+        "service_error": rnd.randint(0, 50),
+        "stat_read_reqs": rnd.randint(10**6, 10**9),
+        "stat_write_reqs": rnd.randint(10**6, 10**9),
+        "batch_index_initiate": rnd.randint(0, 10**6),
+        "asd_build": "E-7.2.0.6",
+        "uptime": 86400 + idx,
+    })
+
+    ns_stats, ns_configs, set_stats = {}, {}, {}
+    for ns in ns_names:
+        svc = {f"ns_counter_{i}": rnd.randint(0, 10**9) for i in range(stat_width // 4)}
+        svc.update({
+            "data_used_pct": rnd.randint(10, 80),
+            "memory_used_pct": rnd.randint(10, 80),
+            "client_read_success": rnd.randint(0, 10**9),
+            "client_write_success": rnd.randint(0, 10**9),
+            "client_read_not_found": rnd.randint(0, 10**6),
+            "client_delete_not_found": rnd.randint(0, 10**6),
+            "fail_key_busy": rnd.randint(0, 500),
+            "objects": rnd.randint(10**5, 10**7),
+        })
+        ns_stats[ns] = {"service": svc}
+        ns_configs[ns] = {"service": {
+            "replication-factor": 2,
+            "strong-consistency": "false",
+            "index-type": "flash" if ns == ns_names[0] else "shmem",
+            "sindex-type": "shmem",
+            "partition-tree-sprigs": 256,
+            "defrag-lwm-free-pct": 50,
+            "high-water-disk-pct": 60,
+            "stop-writes-used-pct": 70,
+            "storage-engine": "device",
+        }}
+        set_stats[ns] = {
+            f"set{s}": {"objects": rnd.randint(10**4, 10**6), "tombstones": 0,
+                        "data_used_bytes": rnd.randint(10**6, 10**9), "stop-writes-count": 0}
+            for s in range(sets)
+        }
+
+    return {
+        "as_stat": {
+            "meta_data": {"asd_build": "E-7.2.0.6", "edition": "Enterprise", "node_id": f"BB9{idx:013X}"},
+            "config": {
+                "service": {f"cfg_{i}": rnd.choice(["true", "false", "64", "128"]) for i in range(stat_width // 4)},
+                "network": {
+                    "service": {"address": "any", "access-address": ip, "port": 3000, "tls-port": 0},
+                    "heartbeat": {"address": ip, "mode": "mesh"},
+                    "fabric": {"address": ip, "tls-port": 0},
+                },
+                "security": {"enable-security": "true"},
+                "namespace": ns_configs,
+            },
+            "statistics": {"service": service_stats, "namespace": ns_stats, "set": set_stats, "xdr": {}},
+            "acl": {"users": {"app": {"connections": rnd.randint(100, 400)},
+                              "admin": {"connections": rnd.randint(0, 5)}}},
+        },
+        "sys_stat": {
+            "hostname": f"ip-{ip.replace('.', '-')}.ec2.internal",
+            "instance-type": "i4i.4xlarge",
+            "network_driver": "ena",
+            "kernel": "6.1.0",
+            "mem_total_kb": 131072000,
+        },
+    }
+
+
+# Cumulative counters (service / namespace level) and the peak per-second rate they grow at
+SERVICE_COUNTERS = {"client_proxy_error": 5.0, "service_error": 5.0}
+NAMESPACE_COUNTERS = {"client_read_not_found": 500.0, "client_delete_not_found": 50.0, "fail_key_busy": 150.0}
+
+
+def _advance(payload, first, idx, seconds, seed=0):
+    """Carries the cumulative counters (and uptime) of the first snapshot `seconds` forward."""
+    rnd = random.Random(seed * 7919 + idx)
+    service, first_service = payload["as_stat"]["statistics"]["service"], first["as_stat"]["statistics"]["service"]
+    for name, peak in SERVICE_COUNTERS.items():
+        service[name] = first_service[name] + int(rnd.uniform(0, peak) * seconds)
+    service["uptime"] = first_service["uptime"] + seconds
+    for ns, stats in payload["as_stat"]["statistics"]["namespace"].items():
+        first_ns = first["as_stat"]["statistics"]["namespace"][ns]["service"]
+        for name, peak in NAMESPACE_COUNTERS.items():
+            stats["service"][name] = first_ns[name] + int(rnd.uniform(0, peak) * seconds)
+
+
+def synthetic_telemetry(nodes, namespaces=4, sets=8, stat_width=400, snapshots=1, cluster="bench-cluster", seed=0,
+                        start=BASE_SNAPSHOT):
+    """
+    Returns the full {timestamp: {cluster: {node: payload}}} document. Snapshots
+    are an hour apart; gauges are redrawn, cumulative counters keep growing.
+    """
+    doc, first = {}, {}
+    for snap in range(snapshots):
+        ts = (start + datetime.timedelta(hours=snap)).strftime("%Y-%m-%d %H:%M:%S")
+        doc[ts] = {cluster: {}}
+        for i in range(nodes):
+            node = synthetic_node(i, namespaces, sets, stat_width, seed + snap)
+            if snap:
+                _advance(node, first[i], i, snap * 3600, seed)
+            else:
+                first[i] = node
+            doc[ts][cluster][f"10.94.{i // 250}.{i % 250 + 1}:3000"] = node
+    return doc
+
+
+def make_bundle(path, nodes=20, namespaces=4, sets=8, stat_width=400, snapshots=1, wrapper="zip", cluster="bench-cluster", seed=0,
+                start=BASE_SNAPSHOT):
+    """Writes a .tgz bundle whose telemetry member uses the requested wrapper (json, gz, zip)."""
+    payload = json.dumps(synthetic_telemetry(nodes, namespaces, sets, stat_width, snapshots, cluster, seed,
+                                             start)).encode("utf-8")
+    name = "collect_info_20260120_230014/20260120_230014_ascinfo.json"
+    if wrapper == "gz":
+        payload, name = gzip.compress(payload, compresslevel=1), name + ".gz"
+    elif wrapper == "zip":
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr(os.path.basename(name), payload)
+        payload, name = buf.getvalue(), name + ".zip"
+
+    with tarfile.open(path, "w:gz", compresslevel=1) as tar:
+        for member_name, data in [
+            ("collect_info_20260120_230014/manifest.json", b"{}"),
+            ("collect_info_20260120_230014/aerospike.conf", b"service {\n}\n"),
+            (name, payload),
+            ("collect_info_20260120_230014/aerospike.log", b"INFO (as): started\n" * 1000),
+        ]:
+            info = tarfile.TarInfo(member_name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def _child_ingest(bundle, db_path, extra_args):
+    """Runs one ingest in a fresh interpreter; returns (seconds, peak RSS in MB)."""
+    code = (
+        "import resource, sys, time, contextlib, io\n"
+        "from ingest_manager import process_collectinfo\n"
+        "t = time.perf_counter()\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    process_collectinfo({bundle!r}, {db_path!r}, force=True, **{extra_args!r})\n"
+        "print(time.perf_counter() - t, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    secs, rss = out.stdout.split()[-2:]
+    return float(secs), float(rss)
+
+
+def table_digests(db_path, ignore_columns=("run_id", "loaded_at", "ingested_at", "seconds")):
+    """Order-independent {table: (rows, md5)} fingerprint for output comparisons (load times ignored)."""
+    conn = sqlite3.connect(db_path)
+    digests = {}
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+                          "AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall()
+    for (table,) in tables:
+        cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")') if r[1] not in ignore_columns]
+        if not cols:
+            continue
+        col_list = ", ".join(f'"{c}"' for c in cols)
+        rows = sorted(repr(r) for r in conn.execute(f'SELECT {col_list} FROM "{table}"'))
+        digests[table] = (len(rows), hashlib.md5("\n".join(rows).encode()).hexdigest())
+    conn.close()
+    return digests
+
+
+def bench_memory(bundle, db_path="bench_health.db"):
+    """Compares peak RSS and wall time of the full-load and streaming ingest modes."""
+    print(f"{'mode':<12} {'seconds':>8} {'peak RSS (MB)':>14}")
+    for label, kwargs in [("full-load", {"streaming": False}), ("streaming", {"streaming": True})]:
+        secs, rss = _child_ingest(bundle, db_path, kwargs)
+        print(f"{label:<12} {secs:>8.2f} {rss:>14.1f}")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def bench_workers(bundle, max_workers=None, streaming=True, db_path="bench_health.db"):
+    """Wall time of serial vs --workers N ingest, and whether outputs match."""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = [0] + [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= max_workers]
+    print(f"cpu_count={os.cpu_count()}  streaming={streaming}")
+    print(f"{'workers':>8} {'seconds':>8} {'speedup':>8} {'identical':>10}")
+    baseline_secs, baseline_digest = None, None
+    for n in counts:
+        secs, _ = _child_ingest(bundle, db_path, {"streaming": streaming, "workers": n})
+        digest = table_digests(db_path)
+        if baseline_secs is None:
+            baseline_secs, baseline_digest = secs, digest
+        label = "serial" if n == 0 else str(n)
+        print(f"{label:>8} {secs:>8.2f} {baseline_secs / secs:>7.2f}x {str(digest == baseline_digest):>10}")
+    os.remove(db_path)
+
+
+def _extract_bundle(bundle):
+    """Decodes and extracts every node once, so load benchmarks time only the writes."""
+    import contextlib
+    from ingest import INGESTORS
+    from ingest.bundle_scan import open_telemetry
+    from ingest.json_stream import iter_nodes
+    from ingest_manager import extract_node
+
+    nodes = []
+    with contextlib.redirect_stdout(io.StringIO()), open_telemetry(bundle) as (ref, stream):
+        for timestamp, _, node_id, node_data in iter_nodes(stream):
+            nodes.append([(INGESTORS[idx].TABLES, batch)
+                          for idx, batch in extract_node(node_id, node_data, "bench", snapshot=timestamp)])
+    return nodes
+
+
+def _load_row_at_a_time(conn, nodes):
+    """The pre-bulk write path: one execute per row, a commit after every node."""
+    from ingest.dimensions import FactTable, Interner, dimension_ddl
+    created = set()
+    interner = Interner()
+    for batches in nodes:
+        cursor = conn.cursor()
+        for tables, batch in batches:
+            for table, rows in batch.items():
+                spec = tables[table]
+                if isinstance(spec, FactTable):
+                    ddl = [dimension_ddl(dim)[0] for dim in set(spec.interned.values())] + spec.ddl()
+                    insert_sql, encode = spec.insert_sql(), spec.encoder(interner)
+                else:
+                    (ddl, insert_sql), encode = spec, None
+                if table not in created:
+                    for statement in ([ddl] if isinstance(ddl, str) else ddl):
+                        cursor.execute(statement)
+                    created.add(table)
+                for row in rows:
+                    if encode:
+                        row = encode(row)
+                        for dim, dim_rows in interner.drain():
+                            cursor.executemany(dimension_ddl(dim)[1], dim_rows)
+                    cursor.execute(insert_sql, row)
+        conn.commit()
+
+
+def _load_bulk(conn, nodes):
+    from ingest.bulk_loader import BulkLoader
+    with BulkLoader(conn) as loader:
+        for batches in nodes:
+            for tables, batch in batches:
+                loader.add(tables, batch)
+
+
+def bench_load(bundle, db_path="bench_health.db"):
+    """Rows/sec of the SQLite write path: row-at-a-time vs BulkLoader."""
+    nodes = _extract_bundle(bundle)
+    total = sum(len(rows) for batches in nodes for _, batch in batches for rows in batch.values())
+    print(f"{len(nodes)} nodes, {total:,} rows")
+    print(f"{'write path':<16} {'seconds':>8} {'rows/s':>12}")
+    for label, load in [("row-at-a-time", _load_row_at_a_time), ("bulk", _load_bulk)]:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        conn = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        load(conn, nodes)
+        secs = time.perf_counter() - start
+        conn.close()
+        print(f"{label:<16} {secs:>8.2f} {total / secs:>12,.0f}")
+    os.remove(db_path)
+
+
+# (address prefix, hostname suffix) substituted into the AWS-shaped synthetic node
+PLATFORM_VARIANTS = {
+    "aws": ("10.94.", "ec2.internal"),
+    "aws-ip-only": ("10.94.", "corp.local"),
+    "azure-ip-only": ("10.181.", "corp.local"),
+    "azure-hostname": ("172.16.", "internal.cloudapp.net"),
+    "on-prem": ("192.168.", "corp.local"),
+}
+
+
+def _legacy_platform(node_id, node_data):
+    """The pre-platform_detect MetadataIngestor logic: search str(whole payload)."""
+    full_context = str(node_data).lower()
+    if any(x in full_context for x in ["amazonaws", "ec2.internal", "10.94."]):
+        return "AWS"
+    if any(x in full_context for x in ["azure", "cloudapp", "10.181."]):
+        return "Azure"
+    return "Bare Metal / On-Prem"
+
+
+def bench_platform(nodes=20, stat_width=2000):
+    """Legacy vs targeted platform detection: same answer, per-cluster cost."""
+    from ingest.platform_detect import PlatformDetector
+
+    print(f"{'variant':<16} {'legacy':<22} {'detector':<22} {'match':>6} {'legacy ms':>10} {'new ms':>8} {'scanned':>8}")
+    for variant, (prefix, suffix) in PLATFORM_VARIANTS.items():
+        cluster = []
+        for i in range(nodes):
+            raw = json.dumps(synthetic_node(i, stat_width=stat_width))
+            raw = raw.replace("10.94.", prefix).replace("ec2.internal", suffix)
+            cluster.append((f"{prefix}0.{i + 1}:3000", json.loads(raw)))
+
+        start = time.perf_counter()
+        legacy = [_legacy_platform(node_id, node) for node_id, node in cluster][-1]  # last node won
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        detector = PlatformDetector()
+        for node_id, node in cluster:
+            detector.observe(node_id, node)
+        new_ms = (time.perf_counter() - start) * 1000
+
+        match = legacy == detector.platform
+        print(f"{variant:<16} {legacy:<22} {detector.platform:<22} {str(match):>6} {legacy_ms:>10.1f} {new_ms:>8.2f} {detector.nodes_scanned:>8}")
+
+
+# Representative consumers of the vertical tables: full scans and rule lookups
+SCAN_QUERIES = {
+    "node_stats full SUM": "SELECT COUNT(*), SUM(value_num) FROM node_stats",
+    "node_stats full rows": "SELECT node_id, metric, value FROM node_stats",
+    "metric lookup": "SELECT node_id, value_num FROM node_stats WHERE metric = 'as_stat.statistics.service.service_error'",
+    "config GLOB": "SELECT node_id, config_name, value FROM node_configs WHERE config_name GLOB 'namespace.*.index-type'",
+    "config symmetry": "SELECT config_name, COUNT(DISTINCT value) AS v FROM node_configs GROUP BY config_name HAVING v > 1",
+    "set objects": "SELECT node_id, ns, set_name, value_num FROM set_stats WHERE key = 'objects'",
+    "namespace metric": "SELECT node_id, namespace, value FROM namespace_stats WHERE metric = 'service.data_used_pct'",
+}
+
+
+def bench_scan(db_paths, repeat=5):
+    """Database size and query time of SCAN_QUERIES for each database given."""
+    for db_path in db_paths:
+        conn = sqlite3.connect(db_path)
+        print(f"{db_path}: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+        for label, query in SCAN_QUERIES.items():
+            conn.execute(query).fetchall()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(query).fetchall()
+            print(f"   {label:<22} {(time.perf_counter() - start) / repeat * 1000:>9.2f} ms")
+        conn.close()
+
+
+def bench_history(days=90, nodes=8, snapshots=4, db_path="bench_history.db", repeat=20):
+    """
+    Builds `days` daily bundles of one cluster into a fleet store, then times
+    trend windows and run comparisons against the same question asked of the
+    raw namespace_stats rows.
+    """
+    import shutil
+    import tempfile
+    import pandas as pd
+    from ingest_manager import process_fleet
+    from rules.trends import compare_runs, trend_window
+
+    bundle_dir = tempfile.mkdtemp(prefix="bench_history_")
+    try:
+        for day in range(days):
+            make_bundle(os.path.join(bundle_dir, f"day_{day:04d}.tgz"), nodes, namespaces=2, sets=4, stat_width=50,
+                        snapshots=snapshots, wrapper="json", seed=day,
+                        start=BASE_SNAPSHOT + datetime.timedelta(days=day))
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_fleet(bundle_dir, db_path, workers=os.cpu_count() or 1)
+        print(f"{days} bundles x {snapshots} snapshots x {nodes} nodes ingested in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(db_path) / 1024 / 1024:.1f} MB)")
+    finally:
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+
+    conn = sqlite3.connect(db_path)
+    node = conn.execute("SELECT node_id FROM trend_series LIMIT 1").fetchone()[0]
+    first = BASE_SNAPSHOT.strftime("%Y-%m-%d")
+
+    def _raw_daily():
+        df = pd.read_sql_query("SELECT node_id, namespace, value, snapshot_ts FROM namespace_stats "
+                               "WHERE metric = 'service.data_used_pct'", conn)
+        df["day"] = df["snapshot_ts"].str[:10]
+        return df.sort_values("snapshot_ts").groupby(["node_id", "namespace", "day"])["value"].agg(["min", "max", "last"])
+
+    queries = {
+        "raw rows, daily groupby": _raw_daily,
+        "rollup window (all)": lambda: trend_window(conn, "service.data_used_pct"),
+        "rollup window (node)": lambda: trend_window(conn, "service.data_used_pct", start=first, node=node),
+        "points window (node)": lambda: trend_window(conn, "service.data_used_pct", node=node, daily=False),
+        "compare latest runs": lambda: compare_runs(conn),
+    }
+    for label, query in queries.items():
+        rows = len(query())
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        print(f"   {label:<26} {(time.perf_counter() - start) / repeat * 1000:>9.2f} ms  ({rows:,} rows)")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aerospike Health Analyzer benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    mk = sub.add_parser("make", help="Write a synthetic collectinfo bundle")
+    mk.add_argument("path")
+    mk.add_argument("--nodes", type=int, default=20)
+    mk.add_argument("--namespaces", type=int, default=4)
+    mk.add_argument("--sets", type=int, default=8)
+    mk.add_argument("--stat-width", type=int, default=400)
+    mk.add_argument("--snapshots", type=int, default=1)
+    mk.add_argument("--wrapper", choices=["json", "gz", "zip"], default="zip")
+    mk.add_argument("--cluster", default="bench-cluster")
+
+    mem = sub.add_parser("memory", help="Peak RSS: full-load vs streaming ingest")
+    mem.add_argument("bundle")
+
+    wk = sub.add_parser("workers", help="Ingest scaling with --workers N")
+    wk.add_argument("bundle")
+    wk.add_argument("--max-workers", type=int, default=None)
+    wk.add_argument("--full-load", action="store_true", help="Benchmark the non-streaming path")
+
+    ld = sub.add_parser("load", help="SQLite write throughput: row-at-a-time vs bulk")
+    ld.add_argument("bundle")
+
+    pf = sub.add_parser("platform", help="Legacy vs targeted platform detection")
+    pf.add_argument("--nodes", type=int, default=20)
+    pf.add_argument("--stat-width", type=int, default=2000)
+
+    sc = sub.add_parser("scan", help="Database size and rule query timings")
+    sc.add_argument("db_paths", nargs="+")
+
+    hs = sub.add_parser("history", help="Trend store: window queries and run comparisons over daily bundles")
+    hs.add_argument("--days", type=int, default=90)
+    hs.add_argument("--nodes", type=int, default=8)
+    hs.add_argument("--snapshots", type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == "make":
+        make_bundle(args.path, args.nodes, args.namespaces, args.sets, args.stat_width,
+                    args.snapshots, args.wrapper, args.cluster)
+        print(f"✅ Wrote {args.path} ({os.path.getsize(args.path) / 1024 / 1024:.1f} MB)")
+    elif args.command == "memory":
+        bench_memory(args.bundle)
+    elif args.command == "workers":
+        bench_workers(args.bundle, args.max_workers, streaming=not args.full_load)
+    elif args.command == "load":
+        bench_load(args.bundle)
+    elif args.command == "platform":
+        bench_platform(args.nodes, args.stat_width)
+    elif args.command == "scan":
+        bench_scan(args.db_paths)
+    elif args.command == "history":
+        bench_history(args.days, args.nodes, args.snapshots)
+
+
+if __name__ == "__main__":
+    main()
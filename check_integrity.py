@@ -16,48 +16,45 @@ def verify():
 
     # Define the ruleset to check
     try:
-        from rules import (
-            error_skew_check, version_consistency_check, network_acceleration_check,
-            storage_deadlock_check, sindex_on_flash_check, sprig_limit_check, hwm_check,
-            memory_hwm_check, config_symmetry_check, config_drift_check,
-            hot_key_check, read_not_found_check, delete_not_found_check,
-            set_object_skew_check, capacity_check,
-            security_connection_audit  # Added incrementally
-        )
+        from rules import RULESET
+        from rules.runner import RuleRunner
     except ImportError as e:
         print(f"❌ FAILED: Could not import rules. {e}")
         return False
 
-    REQUIRED_RULES = [
-        error_skew_check, version_consistency_check, network_acceleration_check,
-        storage_deadlock_check, sindex_on_flash_check, sprig_limit_check, hwm_check,
-        memory_hwm_check, config_symmetry_check, config_drift_check,
-        hot_key_check, read_not_found_check, delete_not_found_check,
-        set_object_skew_check, capacity_check,
-        security_connection_audit  # Added to validation list
-    ]
-
-    print(f"--- Integrity Check: Validating {len(REQUIRED_RULES)} Rules ---")
+    print(f"--- Integrity Check: Validating {len(RULESET)} Rules ---")
     errors = 0
-    
-    # ... inside your for rule in REQUIRED_RULES loop ...
-    for rule in REQUIRED_RULES:
+
+    # One shared read-only context; rules run concurrently, results in RULESET order
+    runner = RuleRunner(db_path, RULESET)
+    for rule, res in zip(RULESET, runner.run()):
         rule_name = getattr(rule, "__name__", str(rule))
-        try:
-            res = rule.run_check(db_path)
-            rid = res.get('id', '??')  # Get the ID from the rule output
-            
-            msg = res.get('message', '')
-            if "Error" in msg or "no such" in msg.lower():
-                print(f"❌ {rid:<5} | {rule_name:<30} | SCHEMA ERROR: {msg}")
-                errors += 1
-            else:
-                print(f"✅ {rid:<5} | {rule_name:<30} | Logic OK ({res['status']})")
-                
-        except Exception as e:
-            print(f"💥 {rule_name:<30} | CRASHED: {str(e)}")
+        rid = res.get('id', '??')  # Get the ID from the rule output
+        short_name = rule_name.rsplit(".", 1)[-1]
+        timing = "cached" if short_name in runner.cached else f"{runner.timings.get(short_name, 0.0) * 1000:.0f}ms"
+
+        msg = res.get('message', '')
+        if "Error" in msg or "no such" in msg.lower() or "crashed" in msg.lower():
+            print(f"❌ {rid:<5} | {rule_name:<30} | SCHEMA ERROR: {msg}")
             errors += 1
-    
+        else:
+            print(f"✅ {rid:<5} | {rule_name:<30} | Logic OK ({res['status']}, {timing})")
+    print(f"⏱️ {runner.report()}")
+
+    # Access-pattern indexes: every rule probe must be an index SEARCH, not a SCAN
+    from ingest.indexes import explain_access_patterns
+    print("\n--- Query Plan Check: Rule Access Patterns ---")
+    conn = sqlite3.connect(db_path)
+    try:
+        for table, index, uses_index, plan in explain_access_patterns(conn):
+            if uses_index:
+                print(f"✅ {table:<16} | {plan}")
+            else:
+                print(f"❌ {table:<16} | {index} not used: {plan} (re-run ingestion to build indexes)")
+                errors += 1
+    finally:
+        conn.close()
+
     return errors == 0
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-import tarfile, json, gzip, zipfile, io, sys, os
+import sys, os
+from ingest.decoder import DecodeStats
+from ingest.bundle_scan import open_telemetry
+from ingest.json_stream import iter_nodes
 __version__ = "1.4.0"
 
 def profile_telemetry(path):
@@ -9,26 +12,11 @@ def profile_telemetry(path):
 
     print(f"🕵️  Profiling Bundle: {path}\n" + "="*60)
     try:
-        with tarfile.open(path, "r:*") as tar:
-            member = next((m for m in tar.getmembers() if 'ascinfo.json' in m.name), None)
-            if not member:
-                print("❌ No ascinfo.json found.")
-                return
-            
-            f = tar.extractfile(member).read()
-            if member.name.endswith('.zip'):
-                with zipfile.ZipFile(io.BytesIO(f)) as z:
-                    f = z.read(z.namelist()[0])
-            elif f.startswith(b'\x1f\x8b'):
-                f = gzip.decompress(f)
-            
-            data = json.loads(f.decode('utf-8'))
-            
-            # Drill to first node
-            ts = list(data.keys())[0]
-            cluster = list(data[ts].keys())[0]
-            node = list(data[ts][cluster].keys())[0]
-            payload = data[ts][cluster][node]
+        stats = DecodeStats()
+        with open_telemetry(path, stats) as (member, stream):
+            # Drill to first node (only its subtree is decoded)
+            ts, cluster, node, payload = next(iter_nodes(stream))
+            print(f"📊 Decode Layers ({member.name}, first node only):\n{stats.report()}\n")
 
             print(f"📍 Node: {node}")
             print(f"⏰ Timestamp: {ts}")
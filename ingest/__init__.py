@@ -7,6 +7,7 @@ from .security_stats_ingest_ci import SecurityStatsIngestor
 from .config_ingest_ci import ConfigIngestor
 from .features_ingest_ci import FeaturesIngestor
 from .system_info_ingest_ci import SystemInfoIngestor
+from .traversal import TraversalEngine
 
 __version__ = "1.6.0"
 
@@ -20,4 +21,26 @@ INGESTORS = [
     NamespaceStatsIngestor(),
     SetStatsIngestor(),
     SecurityStatsIngestor()
-]
\ No newline at end of file
+]
+
+# One walk per node payload, routed to the ingestors above
+ENGINE = TraversalEngine(INGESTORS)
+
+
+def select_ingestors(names):
+    """
+    Resolves ingestor names for a partial re-ingest. Accepts the class name
+    (SetStatsIngestor), the display name (Set Stats) or a table it owns
+    (set_stats), case-insensitively. Returns the set of INGESTORS indexes.
+    """
+    selected = set()
+    for name in names:
+        wanted = name.strip().lower()
+        matches = {idx for idx, ingestor in enumerate(INGESTORS)
+                   if wanted in (type(ingestor).__name__.lower(), ingestor.name.lower())
+                   or wanted in ingestor.TABLES}
+        if not matches:
+            known = ", ".join(type(i).__name__ for i in INGESTORS)
+            raise ValueError(f"Unknown ingestor '{name}' (known: {known})")
+        selected |= matches
+    return selected
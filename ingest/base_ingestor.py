@@ -1,7 +1,21 @@
 __version__ = "1.6.0"
+import datetime
 from abc import ABC, abstractmethod
 
 class BaseIngestor(ABC):
+    # Tables this ingestor owns: {table_name: (CREATE TABLE DDL, INSERT statement)}
+    TABLES = {}
+    # Payload subtrees this ingestor reads, as dotted paths; empty means the whole payload
+    PATHS = ()
+    # Subtrees whose rows live only in this ingestor's tables (kept out of the catch-all)
+    OWNS = ()
+    # The catch-all ingestor receives the payload minus every owned subtree
+    CATCH_ALL = False
+    # Tables whose last column is snapshot_ts. extract() leaves it out; the
+    # traversal engine (or write(), for run_ingest) appends the telemetry
+    # timestamp of the payload to every row
+    SNAPSHOT_TABLES = ()
+
     @property
     @abstractmethod
     def name(self):
@@ -9,6 +23,41 @@ class BaseIngestor(ABC):
         pass
 
     @abstractmethod
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
+        """
+        Parses one node payload (or the view the traversal engine built from
+        PATHS) into row batches: {table_name: [row, ...]}.
+        Must not touch the database, so it can run in a worker process.
+        A table listed with no rows is still created (matching legacy schema).
+        """
+        pass
+
+    def collect(self, batch):
+        """
+        Main-process hook: sees each node's batch as it is written, in node
+        order. Ingestors that aggregate across nodes keep their signals here.
+        """
+        pass
+
+    def finalize(self):
+        """Called once per cluster after its last node. Returns a batch (may be empty)."""
+        return {}
+
+    def write(self, conn, batch, snapshot=None):
+        """
+        Applies a batch produced by extract() to SQLite (commits). Rows of
+        SNAPSHOT_TABLES get `snapshot` (the payload's telemetry timestamp)
+        appended, as the traversal engine does; without one, the time of
+        the write stands in (snapshot_ts is interned and cannot be NULL).
+        """
+        from ingest import ENGINE
+        from ingest.bulk_loader import SAFE_PRAGMAS, BulkLoader
+        if snapshot is None:
+            snapshot = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # `conn` may be an existing store: keep its journal durable
+        with BulkLoader(conn, pragmas=SAFE_PRAGMAS) as loader:
+            loader.add(self.TABLES, ENGINE.stamp(self, batch, snapshot))
+
+    def run_ingest(self, node_id, node_data, conn, run_id, snapshot=None):
         """Standard method to parse data and insert into SQLite."""
-        pass
\ No newline at end of file
+        self.write(conn, self.extract(node_id, node_data, run_id), snapshot)
@@ -0,0 +1,179 @@
+import datetime
+import time
+
+from ingest.dimensions import DIMENSIONS, FactTable, Interner, dimension_ddl
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: bulk_loader
+# Purpose: Shared write path for all ingestors. Rows are buffered per table
+#          and flushed with executemany inside a single transaction per
+#          bundle, under bulk-load PRAGMAs that are restored on exit.
+#          FactTable specs are dictionary-encoded against dim_* tables here,
+#          in the single writer, so surrogate keys are globally consistent.
+
+DEFAULT_FLUSH_ROWS = 50000
+
+# Applied for the duration of the load into a freshly created database (a
+# full ingest, or a fleet / append shard): a crash mid-load leaves a file
+# that is simply rebuilt from the bundle.
+BULK_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "cache_size": -65536,  # 64 MiB
+    "temp_store": "MEMORY",
+}
+
+# Loads into an existing store (partial `--only` re-ingest, single-batch
+# writes): its other tables cannot be rebuilt, so the journal stays on disk.
+SAFE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+}
+
+# One stamp per loaded table. Persisted rule results are keyed on the stamps
+# of the tables each rule reads, so a re-load invalidates exactly those.
+TABLE_VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY, run_id TEXT, row_count INTEGER, loaded_at TEXT)
+"""
+TABLE_VERSIONS_UPSERT = "INSERT OR REPLACE INTO table_versions VALUES (?, ?, ?, ?)"
+
+
+class BulkLoader:
+    """
+    Buffered, single-transaction writer. Use as a context manager:
+
+        with BulkLoader(conn) as loader:
+            loader.add(ingestor.TABLES, ingestor.extract(...))
+
+    Tables are created the first time they are seen; rows keep their
+    arrival order within each table, so output matches row-at-a-time inserts.
+    Pass pragmas=SAFE_PRAGMAS when loading into a database that already
+    holds data the bundle cannot rebuild.
+    """
+
+    def __init__(self, conn, flush_rows=DEFAULT_FLUSH_ROWS, pragmas=BULK_PRAGMAS):
+        self.conn = conn
+        self.flush_rows = flush_rows
+        self.pragmas = pragmas
+        self._created = set()
+        self._buffers = {}  # table -> (insert_sql, [rows]); dicts keep first-seen order
+        self._buffered = 0
+        self._saved_pragmas = {}
+        self.interner = Interner()
+        self.rows_written = {}
+        self.tables_loaded = {}  # table (or FactTable view) -> rows queued, including empty tables
+        self.flush_count = 0
+        self.seconds = 0.0
+
+    # -------------------------------------------------------------------------
+    # TRANSACTION / PRAGMA LIFECYCLE
+    # -------------------------------------------------------------------------
+    def __enter__(self):
+        self.conn.commit()  # journal_mode cannot change inside a transaction
+        self.interner.load(self.conn)
+        for pragma, value in self.pragmas.items():
+            self._saved_pragmas[pragma] = self.conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        self._started = time.perf_counter()
+        self.conn.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                try:
+                    self.flush()
+                    self.conn.commit()
+                except BaseException:
+                    # Close the transaction first: PRAGMAs cannot change inside one
+                    self.conn.rollback()
+                    raise
+            else:
+                self.conn.rollback()
+        finally:
+            self.seconds = time.perf_counter() - self._started
+            if not self.conn.in_transaction:
+                for pragma, value in self._saved_pragmas.items():
+                    self.conn.execute(f"PRAGMA {pragma} = {value}")
+        return False
+
+    # -------------------------------------------------------------------------
+    # BUFFERING
+    # -------------------------------------------------------------------------
+    def _create(self, table, ddl):
+        if table not in self._created:
+            for statement in ([ddl] if isinstance(ddl, str) else ddl):
+                self.conn.execute(statement)
+            self._created.add(table)
+
+    def add_rows(self, table, ddl, insert_sql, rows):
+        self._create(table, ddl)
+        self.tables_loaded[table] = self.tables_loaded.get(table, 0) + len(rows)
+        if not rows:
+            return
+        buffered = self._buffers.setdefault(table, (insert_sql, []))[1]
+        buffered.extend(rows)
+        self._buffered += len(rows)
+        if self._buffered >= self.flush_rows:
+            self.flush()
+
+    def add_facts(self, spec, rows):
+        """Encodes logical rows of a FactTable and queues any new dimension entries."""
+        for dim in set(spec.interned.values()):
+            self._create(DIMENSIONS[dim][0], dimension_ddl(dim)[0])
+        self._create(spec.fact, spec.ddl())
+        self.tables_loaded[spec.name] = self.tables_loaded.get(spec.name, 0) + len(rows)
+        encode = spec.encoder(self.interner)
+        encoded = [encode(row) for row in rows]
+        for dim, dim_rows in self.interner.drain():
+            table = DIMENSIONS[dim][0]
+            self.add_rows(table, *dimension_ddl(dim), dim_rows)
+        self.add_rows(spec.fact, None, spec.insert_sql(), encoded)
+
+    def add(self, tables, batch):
+        """Queues an ingestor batch ({table: rows}) using the ingestor's TABLES."""
+        for table, rows in batch.items():
+            spec = tables[table]
+            if isinstance(spec, FactTable):
+                self.add_facts(spec, rows)
+            else:
+                ddl, insert_sql = spec
+                self.add_rows(table, ddl, insert_sql, rows)
+
+    def flush(self):
+        if not self._buffered:
+            return
+        for table, (insert_sql, rows) in self._buffers.items():
+            if rows:
+                self.conn.executemany(insert_sql, rows)
+                self.rows_written[table] = self.rows_written.get(table, 0) + len(rows)
+        self._buffers.clear()
+        self._buffered = 0
+        self.flush_count += 1
+
+    def stamp_tables(self, run_id):
+        """Records a version stamp for every table touched by this load (same transaction)."""
+        loaded_at = datetime.datetime.now().isoformat(timespec="microseconds")
+        self.conn.execute(TABLE_VERSIONS_DDL)
+        self.conn.executemany(TABLE_VERSIONS_UPSERT,
+                              [(table, run_id, rows, loaded_at) for table, rows in self.tables_loaded.items()])
+
+    # -------------------------------------------------------------------------
+    # REPORTING
+    # -------------------------------------------------------------------------
+    @property
+    def total_rows(self):
+        return sum(self.rows_written.values())
+
+    def report(self):
+        rate = self.total_rows / self.seconds if self.seconds else 0.0
+        return (f"{self.total_rows:,} rows across {len(self.rows_written)} tables in "
+                f"{self.flush_count} flushes, {self.seconds:.2f}s ({rate:,.0f} rows/s)")
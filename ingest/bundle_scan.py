@@ -0,0 +1,241 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import tarfile
+
+from ingest.decoder import metered, unwrap
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: bundle_scan
+# Purpose: Single sequential pass over a collectinfo archive. Classifies every
+#          member (telemetry, config, log, other) from its header, streams the
+#          members a caller asks for while the pass is positioned on them, and
+#          can persist a sidecar index of member offsets for later commands.
+#          Telemetry selection: the first '*ascinfo*' JSON member is decoded
+#          while the pass sits on it, so the bundle is inflated once. The old
+#          "largest non-manifest JSON" rule needs the whole member list first;
+#          it is kept as the fallback for bundles without an ascinfo member.
+
+INDEX_SUFFIX = ".index.json"
+INDEX_VERSION = 1
+TELEMETRY_HINT = "ascinfo"
+
+
+def classify(name):
+    """Maps a member name to telemetry / config / log / other."""
+    lower = name.lower()
+    if ".json" in lower and "manifest" not in lower:
+        return "telemetry"
+    if lower.endswith(".conf"):
+        return "config"
+    if lower.endswith(".log") or "aerospike.log" in lower:
+        return "log"
+    return "other"
+
+
+class MemberRef:
+    """Header facts for one archive member, enough to locate it again."""
+
+    __slots__ = ("name", "category", "size", "offset", "offset_data")
+
+    def __init__(self, name, category, size, offset, offset_data):
+        self.name = name
+        self.category = category
+        self.size = size
+        self.offset = offset
+        self.offset_data = offset_data
+
+    @classmethod
+    def from_tarinfo(cls, member):
+        return cls(member.name, classify(member.name), member.size, member.offset, member.offset_data)
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class BundleInventory:
+    """Result of a scan: every regular member, grouped by category."""
+
+    def __init__(self, path):
+        self.path = path
+        self.members = []
+        self.telemetry = None  # MemberRef chosen as the primary telemetry file
+
+    def by_category(self, category):
+        return [m for m in self.members if m.category == category]
+
+    @property
+    def configs(self):
+        return self.by_category("config")
+
+    @property
+    def logs(self):
+        return self.by_category("log")
+
+    def best_telemetry(self):
+        """Fallback telemetry choice: the largest non-manifest JSON member."""
+        candidates = self.by_category("telemetry")
+        return max(candidates, key=lambda m: m.size) if candidates else None
+
+
+def _is_primary_telemetry(ref):
+    """A telemetry member named like the collectinfo output ('*ascinfo*'), taken as soon as it is reached."""
+    return ref.category == "telemetry" and TELEMETRY_HINT in ref.name.lower()
+
+
+def _compression(path):
+    with open(path, 'rb') as f:
+        return "gz" if f.read(2) == b'\x1f\x8b' else "none"
+
+
+def iter_members(path, stats=None):
+    """
+    Walks the archive once, front to back (tar stream mode, no getmembers()).
+    Yields (ref, tar, member) for each regular file; tar.extractfile(member)
+    is only readable until the generator advances.
+    """
+    with open(path, 'rb') as raw:
+        with tarfile.open(fileobj=metered(raw, stats, "disk"), mode="r|*") as tar:
+            for member in tar:
+                if member.isfile():
+                    yield MemberRef.from_tarinfo(member), tar, member
+
+
+def scan_bundle(path, handlers=None, index_path=None, stats=None, stop_after_telemetry=False):
+    """
+    Inventories the archive in one sequential pass.
+
+    handlers maps a category to fn(ref, stream); the stream is only valid while
+    the handler runs. The 'telemetry' handler receives the decoded JSON stream
+    of the first '*ascinfo*' member, or, when the bundle has none, of the
+    largest telemetry member (best_telemetry); other handlers get the raw
+    member bytes.
+    When index_path is given the member offsets are saved as a sidecar index.
+    """
+    handlers = handlers or {}
+    inventory = BundleInventory(path)
+    for ref, tar, member in iter_members(path, stats):
+        inventory.members.append(ref)
+
+        if inventory.telemetry is None and _is_primary_telemetry(ref):
+            inventory.telemetry = ref
+            if "telemetry" in handlers:
+                with unwrap(tar.extractfile(member), ref.name, stats, sequential=True) as stream:
+                    handlers["telemetry"](ref, stream)
+            if stop_after_telemetry:
+                break
+        elif ref.category in handlers and ref.category != "telemetry":
+            handlers[ref.category](ref, tar.extractfile(member))
+
+    if inventory.telemetry is None:
+        # Unusual naming: fall back to the largest JSON, reached via its offset
+        inventory.telemetry = inventory.best_telemetry()
+        if inventory.telemetry and "telemetry" in handlers:
+            with open_indexed_member(path, inventory.telemetry, stats) as stream:
+                handlers["telemetry"](inventory.telemetry, stream)
+
+    if index_path:
+        save_index(inventory, index_path)
+    return inventory
+
+
+# -----------------------------------------------------------------------------
+# SIDECAR INDEX
+# -----------------------------------------------------------------------------
+def default_index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def save_index(inventory, index_path):
+    st = os.stat(inventory.path)
+    doc = {
+        "index_version": INDEX_VERSION,
+        "bundle_size": st.st_size,
+        "bundle_mtime": int(st.st_mtime),
+        "compression": _compression(inventory.path),
+        "telemetry": inventory.telemetry.name if inventory.telemetry else None,
+        "members": [m.as_dict() for m in inventory.members],
+    }
+    with open(index_path, 'w') as f:
+        json.dump(doc, f, indent=1)
+    print(f"🗂️  Saved bundle index: {index_path} ({len(inventory.members)} members)")
+
+
+def load_index(path, index_path=None):
+    """Returns a BundleInventory from the sidecar index, or None if absent or stale."""
+    index_path = index_path or default_index_path(path)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        doc = json.load(f)
+    st = os.stat(path)
+    if (doc.get("index_version") != INDEX_VERSION or doc.get("bundle_size") != st.st_size
+            or doc.get("bundle_mtime") != int(st.st_mtime)):
+        return None
+    inventory = BundleInventory(path)
+    inventory.members = [MemberRef(**m) for m in doc["members"]]
+    inventory.telemetry = next((m for m in inventory.members if m.name == doc.get("telemetry")), None)
+    return inventory
+
+
+class _Window(io.RawIOBase):
+    """Read-only view of [start, start + size) of an underlying stream."""
+
+    def __init__(self, fileobj, start, size):
+        self._fileobj = fileobj
+        self._remaining = size
+        fileobj.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._fileobj.read(min(len(b), self._remaining))
+        self._remaining -= len(data)
+        b[:len(data)] = data
+        return len(data)
+
+
+@contextlib.contextmanager
+def open_indexed_member(path, ref, stats=None):
+    """
+    Jumps straight to a member's data using its recorded offset (no header
+    walk). Uncompressed tars seek directly; .tgz archives inflate forward to
+    the offset once, which is still a single decompression pass.
+    """
+    with open(path, 'rb') as raw:
+        source = metered(raw, stats, "disk")
+        if _compression(path) == "gz":
+            source = gzip.GzipFile(fileobj=source)
+        with unwrap(_Window(source, ref.offset_data, ref.size), ref.name, stats, sequential=True) as stream:
+            yield stream
+
+
+@contextlib.contextmanager
+def open_telemetry(path, stats=None):
+    """
+    Yields (ref, stream) for the bundle's telemetry JSON. Uses the sidecar
+    index when present, otherwise reads forward only as far as the member.
+    """
+    inventory = load_index(path)
+    if inventory is None:
+        inventory = BundleInventory(path)
+        for ref, tar, member in iter_members(path, stats):
+            inventory.members.append(ref)
+            if _is_primary_telemetry(ref):
+                with unwrap(tar.extractfile(member), ref.name, stats, sequential=True) as stream:
+                    yield ref, stream
+                return
+        inventory.telemetry = inventory.best_telemetry()
+
+    if inventory.telemetry is None:
+        raise FileNotFoundError("Dynamic discovery failed: No telemetry JSON found in bundle.")
+    with open_indexed_member(path, inventory.telemetry, stats) as stream:
+        yield inventory.telemetry, stream
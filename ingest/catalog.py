@@ -0,0 +1,73 @@
+import time
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: catalog
+# Purpose: Catalog of the distinct metric / config names per table, with an
+#          FTS5 trigram index. Leading-wildcard patterns ('%fail_key_busy%')
+#          cannot use a B-tree index, so they are resolved against the
+#          catalog into an exact name list first; the big tables are then
+#          read with indexed `metric IN (...)` equality lookups.
+
+CATALOG_TABLE = "metric_catalog"
+
+# Searchable tables and the column that holds their metric / config name
+NAME_COLUMNS = {
+    "node_stats": "metric",
+    "namespace_stats": "metric",
+    "set_stats": "key",
+    "node_configs": "config_name",
+    "system_info": "metric",
+}
+
+
+def _existing(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def build_catalog(conn):
+    """(Re)builds the catalog from the loaded tables. Returns the number of names."""
+    start = time.perf_counter()
+    conn.execute(f"DROP TABLE IF EXISTS {CATALOG_TABLE}")
+    conn.execute(f"CREATE VIRTUAL TABLE {CATALOG_TABLE} USING fts5(name, source UNINDEXED, tokenize='trigram')")
+    existing = _existing(conn)
+    for table, column in NAME_COLUMNS.items():
+        if table in existing:
+            conn.execute(f"INSERT INTO {CATALOG_TABLE} (name, source) SELECT DISTINCT {column}, ? FROM {table}", (table,))
+    conn.commit()
+    count = conn.execute(f"SELECT COUNT(*) FROM {CATALOG_TABLE}").fetchone()[0]
+    print(f"📇 Metric catalog: {count:,} names in {time.perf_counter() - start:.2f}s")
+    return count
+
+
+def pattern_operator(pattern):
+    """'%' patterns use LIKE, '*' / '?' / '[' patterns use GLOB, anything else is an exact name."""
+    if "%" in pattern:
+        return "LIKE"
+    if any(c in pattern for c in "*?["):
+        return "GLOB"
+    return "="
+
+
+def resolve_metrics(conn, table, patterns):
+    """
+    Expands name patterns (see pattern_operator) into the exact names present in
+    `table`, sorted. Uses the trigram catalog when it exists, otherwise scans
+    the table once.
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    if CATALOG_TABLE in _existing(conn):
+        # One trigram probe per pattern: an OR of LIKEs makes FTS5 scan the catalog
+        sql = " UNION ".join(f"SELECT name FROM {CATALOG_TABLE} WHERE name {pattern_operator(p)} ? AND source = ?"
+                             for p in patterns)
+        params = [p for pattern in patterns for p in (pattern, table)]
+    else:
+        column = NAME_COLUMNS[table]
+        sql = f"SELECT DISTINCT {column} FROM {table} WHERE {' OR '.join(f'{column} {pattern_operator(p)} ?' for p in patterns)}"
+        params = patterns
+    return sorted(r[0] for r in conn.execute(sql, params))
@@ -1,5 +1,7 @@
 __version__ = "1.6.0"
 from ingest.base_ingestor import BaseIngestor
+from ingest.dimensions import FactTable
+from ingest.value_types import to_number
 
 class ConfigIngestor(BaseIngestor):
     """
@@ -8,29 +10,35 @@ class ConfigIngestor(BaseIngestor):
     into a key-value schema compatible with health rules.
     """
 
+    # Whole as_stat for the legacy (pre-7.x) fallback; only the 7.x config block is owned
+    PATHS = ("as_stat",)
+    OWNS = ("as_stat.config",)
+    SNAPSHOT_TABLES = ("node_configs",)
+
+    # The 'source' column is required by rules like config_drift_check.py
+    # value_num holds the numeric form of value (NULL for strings like 'flash')
+    # run/node/config_name are interned into dim_* tables behind the node_configs view
+    TABLES = {
+        "node_configs": FactTable(
+            "node_configs",
+            [("run_id", "TEXT"), ("node_id", "TEXT"), ("config_name", "TEXT"),
+             ("value", "TEXT"), ("source", "TEXT"), ("value_num", "REAL"), ("snapshot_ts", "TEXT")],
+            {"run_id": "run", "node_id": "node", "config_name": "config_key", "snapshot_ts": "snapshot"},
+        )
+    }
+
     @property
     def name(self):
         return "Configs"
 
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
         as_stat = node_data.get('as_stat', {})
         
         # In Aerospike 7.x, configs are grouped in a dedicated 'config' block.
         # Fallback to as_stat for legacy versions.
         config_data = as_stat.get('config', as_stat)
         
-        cursor = conn.cursor()
-        
-        # The 'source' column is required by rules like config_drift_check.py
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS node_configs (
-                run_id TEXT, 
-                node_id TEXT, 
-                config_name TEXT, 
-                value TEXT, 
-                source TEXT
-            )
-        """)
+        rows = []
 
         def flatten_configs(data, prefix=""):
             """
@@ -49,10 +57,8 @@ class ConfigIngestor(BaseIngestor):
                 else:
                     # We default source to 'config' to distinguish from 'file' 
                     # sources in future drift analysis.
-                    cursor.execute(
-                        "INSERT INTO node_configs VALUES (?, ?, ?, ?, ?)",
-                        (run_id, node_id, full_key, str(v), 'config')
-                    )
+                    rows.append((run_id, node_id, full_key, str(v), 'config', to_number(v)))
 
         flatten_configs(config_data)
-        print(f"✅ {self.name} processed for {node_id}")
\ No newline at end of file
+        print(f"✅ {self.name} processed for {node_id}")
+        return {"node_configs": rows}
@@ -0,0 +1,197 @@
+import contextlib
+import gzip
+import io
+import json
+import struct
+import tarfile
+import time
+import zipfile
+import zlib
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: decoder
+# Purpose: Shared tar -> zip -> gzip decompression chain for telemetry members.
+#          Every wrapper is a chained file-like stream, so no full-size
+#          intermediate buffer is built. Each layer is metered (bytes in/out
+#          and time spent) to show where ingest time goes.
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+ZIP_LOCAL_MAGIC = 0x04034b50
+
+
+class LayerStats:
+    """Byte and time counters for one decompression layer."""
+
+    def __init__(self, name):
+        self.name = name
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0      # cumulative, includes the layers below
+        self.self_seconds = 0.0  # time attributable to this layer alone
+
+
+class DecodeStats:
+    """Ordered collection of LayerStats, outermost layer (disk) first."""
+
+    def __init__(self):
+        self.layers = []
+
+    def add(self, name):
+        layer = LayerStats(name)
+        self.layers.append(layer)
+        return layer
+
+    def finalize(self):
+        """Derives bytes_in and self time from the neighbouring layer."""
+        for outer, inner in zip(self.layers, self.layers[1:]):
+            inner.bytes_in = outer.bytes_out
+            inner.self_seconds = max(inner.seconds - outer.seconds, 0.0)
+        if self.layers:
+            # The outermost layer is a pass-through read of the source file
+            self.layers[0].bytes_in = self.layers[0].bytes_out
+            self.layers[0].self_seconds = self.layers[0].seconds
+        return self
+
+    def report(self):
+        self.finalize()
+        lines = [f"{'layer':<8} {'bytes in':>14} {'bytes out':>14} {'ratio':>7} {'self s':>8}"]
+        for layer in self.layers:
+            ratio = layer.bytes_out / layer.bytes_in if layer.bytes_in else 0.0
+            lines.append(f"{layer.name:<8} {layer.bytes_in:>14,} {layer.bytes_out:>14,} {ratio:>6.1f}x {layer.self_seconds:>8.2f}")
+        return "\n".join(lines)
+
+
+class _MeteredStream(io.RawIOBase):
+    """Pass-through raw stream that records bytes read and time spent reading."""
+
+    def __init__(self, raw, layer):
+        self._raw = raw
+        self._layer = layer
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        start = time.perf_counter()
+        data = self._raw.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._layer.bytes_out += n
+        self._layer.seconds += time.perf_counter() - start
+        return n
+
+    def seekable(self):
+        return self._raw.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._raw.seek(offset, whence)
+
+    def tell(self):
+        return self._raw.tell()
+
+
+class _ZipEntryStream(io.RawIOBase):
+    """
+    Forward-only reader for the first entry of a zip archive. Parses the local
+    file header and inflates as it goes, so it works on non-seekable sources
+    (tar members read during a sequential pass) where zipfile cannot.
+    """
+
+    def __init__(self, source):
+        header = source.read(ZIP_LOCAL_HEADER.size)
+        if len(header) < ZIP_LOCAL_HEADER.size:
+            raise ValueError("Truncated zip member: local file header missing.")
+        (magic, _, flags, method, _, _, _, csize, _, name_len, extra_len) = ZIP_LOCAL_HEADER.unpack(header)
+        if magic != ZIP_LOCAL_MAGIC:
+            raise ValueError("Zip member does not start with a local file header.")
+        source.read(name_len + extra_len)
+        if method == zipfile.ZIP_DEFLATED:
+            self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        elif method == zipfile.ZIP_STORED and not flags & 0x08:
+            self._inflater = None
+        else:
+            raise ValueError(f"Unsupported zip entry for streaming (method={method}, flags={flags:#x}).")
+        self._source = source
+        self._remaining = csize
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._pending:
+            if self._inflater is None:
+                chunk = self._source.read(min(len(b), self._remaining))
+                self._remaining -= len(chunk)
+                self._pending = chunk
+                if not chunk:
+                    return 0
+            else:
+                if self._inflater.eof:
+                    return 0
+                chunk = self._inflater.unconsumed_tail or self._source.read(io.DEFAULT_BUFFER_SIZE)
+                if not chunk:
+                    raise ValueError("Truncated zip member: deflate stream ended early.")
+                self._pending = self._inflater.decompress(chunk, len(b))
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def metered(raw, stats, name):
+    if stats is None:
+        return raw
+    return io.BufferedReader(_MeteredStream(raw, stats.add(name)))
+
+
+@contextlib.contextmanager
+def open_bundle(path, stats=None):
+    """Opens a collectinfo archive; with stats, compressed disk reads are metered."""
+    with open(path, 'rb') as raw:
+        with tarfile.open(fileobj=metered(raw, stats, "disk"), mode="r:*") as tar:
+            yield tar
+
+
+def unwrap(stream, name, stats=None, sequential=False):
+    """
+    Layers zip and gzip decoding over a raw member stream. With sequential=True
+    the source is never seeked, so it can be read during a single tar pass.
+    """
+    stream = metered(stream, stats, "tar")
+
+    # Handle Zip wrapper (common in newer collectinfo)
+    if name.endswith('.zip'):
+        if sequential:
+            inner = io.BufferedReader(_ZipEntryStream(stream))
+        else:
+            z = zipfile.ZipFile(stream)
+            inner = z.open(z.namelist()[0])
+        stream = metered(inner, stats, "zip")
+
+    # Handle Gzip wrapper (detected by magic bytes, not extension)
+    if not isinstance(stream, io.BufferedReader):
+        stream = io.BufferedReader(stream)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream = metered(gzip.GzipFile(fileobj=stream), stats, "gzip")
+    return stream
+
+
+def open_member(tar, member, stats=None, sequential=False):
+    """
+    Returns a binary stream over the JSON document inside a tar member,
+    unwrapping .zip and gzip layers lazily as the stream is read.
+    """
+    return unwrap(tar.extractfile(member), member.name, stats, sequential)
+
+
+def load_json(tar, member, stats=None):
+    """Decodes a whole telemetry member; use open_member + iter_nodes for large bundles."""
+    with open_member(tar, member, stats) as stream:
+        return json.load(stream)
@@ -0,0 +1,139 @@
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: dimensions
+# Purpose: Interned storage for the vertical tables. Repeated TEXT keys
+#          (run_id, node_id, metric / config names, snapshot timestamps) live once in dim_* tables
+#          with INTEGER surrogate keys; fact_* tables hold the compact rows.
+#          A view with the original table name and column order joins them
+#          back, so rule and report SQL keeps working unchanged.
+
+# dimension -> (table, surrogate key column, text column)
+DIMENSIONS = {
+    "run": ("dim_runs", "run_key", "run_id"),
+    "node": ("dim_nodes", "node_key", "node_id"),
+    "metric": ("dim_metrics", "metric_key", "metric"),
+    "config_key": ("dim_config_keys", "config_key", "config_name"),
+    "snapshot": ("dim_snapshots", "snapshot_key", "snapshot_ts"),
+}
+
+
+def dimension_ddl(dim):
+    table, key_col, text_col = DIMENSIONS[dim]
+    return (f"CREATE TABLE IF NOT EXISTS {table} ({key_col} INTEGER PRIMARY KEY, {text_col} TEXT NOT NULL UNIQUE)",
+            f"INSERT INTO {table} ({key_col}, {text_col}) VALUES (?, ?)")
+
+
+class Interner:
+    """Main-process dictionary from text to surrogate key, one per dimension."""
+
+    def __init__(self):
+        self._keys = {dim: {} for dim in DIMENSIONS}
+        self._next = {dim: 1 for dim in DIMENSIONS}
+        self._pending = {dim: [] for dim in DIMENSIONS}
+
+    def load(self, conn):
+        """Seeds the dictionaries from dim_* tables already in the database."""
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for dim, (table, key_col, text_col) in DIMENSIONS.items():
+            if table in existing:
+                keys = self._keys[dim]
+                keys.update((text, key) for key, text in conn.execute(f"SELECT {key_col}, {text_col} FROM {table}"))
+                self._next[dim] = max(keys.values(), default=0) + 1
+
+    def key(self, dim, text):
+        keys = self._keys[dim]
+        found = keys.get(text)
+        if found is None:
+            found = keys[text] = self._next[dim]
+            self._next[dim] += 1
+            self._pending[dim].append((found, text))
+        return found
+
+    def drain(self):
+        """Yields (dim, new rows) for every dimension that gained entries since the last drain."""
+        for dim, rows in self._pending.items():
+            if rows:
+                self._pending[dim] = []
+                yield dim, rows
+
+
+class FactTable:
+    """
+    Logical table stored as fact_<name> plus a compatibility view <name>.
+    columns is the logical column list [(name, type)], in the original order;
+    interned maps a logical column to the dimension that encodes it.
+    """
+
+    def __init__(self, name, columns, interned, primary_key=None, replace=False):
+        self.name = name
+        self.fact = f"fact_{name}"
+        self.columns = columns
+        self.interned = interned
+        self.primary_key = primary_key
+        self.replace = replace
+
+    def _fact_column(self, col):
+        dim = self.interned.get(col)
+        return DIMENSIONS[dim][1] if dim else col
+
+    def ddl(self):
+        cols = [f"{self._fact_column(c)} {'INTEGER' if c in self.interned else t}" for c, t in self.columns]
+        if self.primary_key:
+            cols.append(f"PRIMARY KEY ({', '.join(self._fact_column(c) for c in self.primary_key)})")
+        fact = f"CREATE TABLE IF NOT EXISTS {self.fact} ({', '.join(cols)})"
+
+        select, joins = [], []
+        for col, _ in self.columns:
+            dim = self.interned.get(col)
+            if dim:
+                table, key_col, text_col = DIMENSIONS[dim]
+                select.append(f"{table}.{text_col} AS {col}")
+                # Inner join: filters on the text column search the dimension's
+                # UNIQUE index first, then the fact index on the surrogate key
+                joins.append(f"JOIN {table} ON {table}.{key_col} = f.{key_col}")
+            else:
+                select.append(f"f.{col}")
+        view = f"CREATE VIEW IF NOT EXISTS {self.name} AS SELECT {', '.join(select)} FROM {self.fact} f {' '.join(joins)}"
+        return [fact, view]
+
+    def insert_sql(self):
+        verb = "INSERT OR REPLACE" if self.replace else "INSERT"
+        cols = ", ".join(self._fact_column(c) for c, _ in self.columns)
+        return f"{verb} INTO {self.fact} ({cols}) VALUES ({', '.join('?' * len(self.columns))})"
+
+    def copy_sql(self, source):
+        """
+        INSERT ... SELECT copying the fact rows of attached schema `source`
+        (another health database) into main, re-keying every interned column
+        through the text value of its dimension. main's dim_* tables must
+        already hold the source's entries (see ingest.fleet.merge_shard).
+        """
+        select, joins = [], []
+        for col, _ in self.columns:
+            dim = self.interned.get(col)
+            if dim:
+                table, key_col, text_col = DIMENSIONS[dim]
+                select.append(f"m_{col}.{key_col}")
+                joins.append(f"JOIN {source}.{table} s_{col} ON s_{col}.{key_col} = f.{key_col} "
+                             f"JOIN main.{table} m_{col} ON m_{col}.{text_col} = s_{col}.{text_col}")
+            else:
+                select.append(f"f.{col}")
+        verb = "INSERT OR REPLACE" if self.replace else "INSERT"
+        cols = ", ".join(self._fact_column(c) for c, _ in self.columns)
+        return (f"{verb} INTO main.{self.fact} ({cols}) SELECT {', '.join(select)} "
+                f"FROM {source}.{self.fact} f {' '.join(joins)}")
+
+    def encoder(self, interner):
+        """Returns a function mapping a logical row to its fact row."""
+        slots = [(i, self.interned[c]) for i, (c, _) in enumerate(self.columns) if c in self.interned]
+
+        def encode(row):
+            row = list(row)
+            for i, dim in slots:
+                row[i] = interner.key(dim, row[i])
+            return row
+        return encode
@@ -2,11 +2,20 @@ __version__ = "1.6.0"
 from ingest.base_ingestor import BaseIngestor
 
 class FeaturesIngestor(BaseIngestor):
+    PATHS = ("as_stat.statistics.service", "as_stat.statistics.namespace", "as_stat.config")
+    SNAPSHOT_TABLES = ("active_features",)
+    TABLES = {
+        "active_features": (
+            "CREATE TABLE IF NOT EXISTS active_features (run_id TEXT, node_id TEXT, feature TEXT, snapshot_ts TEXT)",
+            "INSERT INTO active_features VALUES (?, ?, ?, ?)",
+        )
+    }
+
     @property
     def name(self):
         return "Feature Discovery"
 
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
         as_stat = node_data.get('as_stat', {})
         stats = as_stat.get('statistics', {})
         configs = as_stat.get('config', {})
@@ -114,10 +123,8 @@ class FeaturesIngestor(BaseIngestor):
                stat_gt(ns_svc_stats, ['index_flash_used_bytes', 'index_flash_alloc_bytes']):
                 active.add("Index-on-flash")
 
-        # --- Database Insertion ---
-        cursor = conn.cursor()
-        cursor.execute("CREATE TABLE IF NOT EXISTS active_features (run_id TEXT, node_id TEXT, feature TEXT)")
-        for feature in active:
-            cursor.execute("INSERT INTO active_features VALUES (?, ?, ?)", (run_id, node_id, feature))
+        # --- Row Batch (sorted so serial and parallel runs write identical rows) ---
+        rows = [(run_id, node_id, feature) for feature in sorted(active)]
         
-        print(f"✅ {self.name} processed for {node_id} ({len(active)} features discovered)")
\ No newline at end of file
+        print(f"✅ {self.name} processed for {node_id} ({len(active)} features discovered)")
+        return {"active_features": rows}
\ No newline at end of file
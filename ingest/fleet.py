@@ -0,0 +1,117 @@
+import os
+
+from ingest import INGESTORS
+from ingest.catalog import CATALOG_TABLE
+from ingest.dimensions import DIMENSIONS, FactTable, dimension_ddl
+from ingest.registry import BUNDLES_DDL, BUNDLES_HASH_INDEX
+from ingest.trends import TREND_TABLES
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: fleet
+# Purpose: Fleet store. Many bundles share one database: each bundle is
+#          ingested concurrently into its own shard (a regular health
+#          database, own run_id), then merged here by the single writer.
+#          Dimension entries are unioned and fact rows re-keyed through
+#          their text values; every row keeps its run_id, and cluster_nodes
+#          maps (run_id, node_id) to its cluster, so (bundle, cluster) is the
+#          partition key of every node-level row. cluster_metadata (one
+#          key/value set per database) is kept per bundle in bundle_metadata.
+#          Each shard carries its bundle's registry row (ingest/registry.py),
+#          so merging is also how a bundle is appended to an existing store.
+
+BUNDLE_SUFFIXES = (".tgz", ".tar.gz")
+
+BUNDLE_METADATA_DDL = """
+    CREATE TABLE IF NOT EXISTS bundle_metadata (
+        run_id TEXT, key TEXT, value TEXT, PRIMARY KEY (run_id, key))
+"""
+
+# Shard tables that are rebuilt or re-keyed rather than copied as-is
+_DERIVED = {"table_versions", "rule_results", "cluster_metadata", "bundles", *TREND_TABLES}
+
+
+def find_bundles(bundle_dir):
+    """collectinfo bundles in `bundle_dir`, sorted by name."""
+    return sorted(os.path.join(bundle_dir, name) for name in os.listdir(bundle_dir)
+                  if name.endswith(BUNDLE_SUFFIXES) and os.path.isfile(os.path.join(bundle_dir, name)))
+
+
+def _adopt_metadata(conn, main_tables):
+    """
+    A single-bundle database being appended to: its own cluster_metadata
+    becomes its run's bundle_metadata, so partitions of the first run keep it.
+    """
+    if "cluster_metadata" not in main_tables or "cluster_nodes" not in main_tables:
+        return
+    orphans = [r[0] for r in conn.execute(
+        "SELECT DISTINCT run_id FROM main.cluster_nodes "
+        "WHERE run_id NOT IN (SELECT run_id FROM main.bundle_metadata)")]
+    if len(orphans) == 1:
+        conn.execute("INSERT OR IGNORE INTO main.bundle_metadata SELECT ?, key, value FROM main.cluster_metadata",
+                     (orphans[0],))
+
+
+def merge_shard(conn, shard_path):
+    """
+    Copies one shard database into the fleet store in a single transaction.
+    Returns (run_id, number of fact / table rows copied).
+    """
+    conn.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+    try:
+        shard_tables = {name: sql for name, sql in conn.execute(
+            "SELECT name, sql FROM shard.sqlite_master WHERE type = 'table'")}
+        main_tables = {r[0] for r in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+        facts = {spec.fact: spec for ingestor in INGESTORS for spec in ingestor.TABLES.values()
+                 if isinstance(spec, FactTable)}
+        run_id = conn.execute("SELECT run_id FROM shard.bundles").fetchone()[0]
+        copied = 0
+
+        conn.execute("BEGIN")
+        conn.execute(BUNDLE_METADATA_DDL)
+        _adopt_metadata(conn, main_tables)
+        # 1. Dimensions: union of the text values (main assigns its own keys)
+        for dim, (table, key_col, text_col) in DIMENSIONS.items():
+            if table in shard_tables:
+                conn.execute(dimension_ddl(dim)[0])
+                conn.execute(f"INSERT OR IGNORE INTO main.{table} ({text_col}) "
+                             f"SELECT {text_col} FROM shard.{table} ORDER BY {key_col}")
+        dim_tables = {table for table, _, _ in DIMENSIONS.values()}
+
+        for name, sql in shard_tables.items():
+            if name in dim_tables or name in _DERIVED or name.startswith(CATALOG_TABLE) or name.startswith("sqlite_"):
+                continue
+            # 2. Fact tables: re-keyed through the dimensions; the view comes with the DDL
+            if name in facts:
+                for statement in facts[name].ddl():
+                    conn.execute(statement)
+                copied += conn.execute(facts[name].copy_sql("shard")).rowcount
+                continue
+            # 3. Plain tables (node_flavors, cluster_nodes, ...): same layout, copied as-is
+            if name not in main_tables:
+                conn.execute(sql)
+            copied += conn.execute(f"INSERT INTO main.{name} SELECT * FROM shard.{name}").rowcount
+
+        # 4. Per-bundle metadata and the bundle registry
+        if "cluster_metadata" in shard_tables:
+            conn.execute("INSERT OR REPLACE INTO bundle_metadata SELECT ?, key, value FROM shard.cluster_metadata",
+                         (run_id,))
+        conn.execute(BUNDLES_DDL)
+        conn.execute(BUNDLES_HASH_INDEX)
+        conn.execute("INSERT OR REPLACE INTO main.bundles SELECT * FROM shard.bundles")
+
+        # 5. Stamps: the merge re-versions every table the shard loaded
+        if "table_versions" in shard_tables:
+            conn.execute(shard_tables["table_versions"].replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            conn.execute("INSERT OR REPLACE INTO main.table_versions SELECT * FROM shard.table_versions")
+        conn.commit()
+        return run_id, copied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE shard")
@@ -0,0 +1,76 @@
+import time
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: indexes
+# Purpose: Post-load index build. Indexes are derived from the declared
+#          access patterns of the rules and report queries, built once after
+#          the bulk load (cheaper than maintaining them row by row), then
+#          ANALYZE refreshes the planner statistics.
+#          Prefix matches must use GLOB ('namespace.*.index-type'): LIKE is
+#          case-insensitive and cannot use a BINARY-collated index.
+
+# (table, indexed columns, probe query representative of the consumers, consumers)
+# The vertical tables are fact_* tables keyed by dim_* surrogate keys; probes
+# query the compatibility views, exactly like the rules do.
+ACCESS_PATTERNS = [
+    ("fact_node_stats", ("metric_key", "node_key"),
+     "SELECT node_id, value_num FROM node_stats WHERE metric = 'as_stat.statistics.service.client_connections'",
+     "error_skew_check, service_error_skew_check, version_consistency_check, performance_utilization.qmd"),
+    ("fact_namespace_stats", ("metric_key", "node_key"),
+     "SELECT node_id, namespace, value FROM namespace_stats WHERE metric = 'service.data_used_pct'",
+     "hwm_check, memory_hwm_check, read_not_found_check, delete_not_found_check"),
+    ("fact_node_configs", ("config_key", "node_key"),
+     "SELECT node_id, config_name, value FROM node_configs WHERE config_name GLOB 'namespace.*.index-type'",
+     "sindex_on_flash_check, sprig_limit_check, storage_deadlock_check, config_drift_check"),
+    ("fact_set_stats", ("metric_key", "ns", "set_name"),
+     "SELECT node_id, ns, set_name, value_num FROM set_stats WHERE key = 'objects'",
+     "set_object_skew_check"),
+    ("system_info", ("metric", "node_id"),
+     "SELECT node_id, value FROM system_info WHERE metric = 'network_driver'",
+     "network_acceleration_check"),
+]
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is not None
+
+
+def build_indexes(conn, patterns=ACCESS_PATTERNS):
+    """Creates one composite index per access pattern, then runs ANALYZE. Returns seconds."""
+    start = time.perf_counter()
+    built = []
+    for table, columns, _, _ in patterns:
+        if not _table_exists(conn, table):
+            continue
+        name = index_name(table, columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        built.append(name)
+    conn.execute("ANALYZE")
+    conn.commit()
+    seconds = time.perf_counter() - start
+    print(f"🗂️  Built {len(built)} indexes + ANALYZE in {seconds:.2f}s")
+    return seconds
+
+
+def explain_access_patterns(conn, patterns=ACCESS_PATTERNS):
+    """
+    Runs EXPLAIN QUERY PLAN on each probe query.
+    Returns [(table, index_name, uses_index, plan_text)].
+    """
+    results = []
+    for table, columns, probe, _ in patterns:
+        if not _table_exists(conn, table):
+            continue
+        name = index_name(table, columns)
+        plan = " | ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {probe}"))
+        results.append((table, name, name in plan, plan))
+    return results
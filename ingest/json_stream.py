@@ -0,0 +1,124 @@
+import codecs
+import json
+import re
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: json_stream
+# Purpose: Incremental decoding of the collectinfo telemetry document
+#          ({timestamp: {cluster: {node: payload}}}) one node at a time.
+#          Only the current node's payload is ever materialised, so peak
+#          memory tracks the largest node rather than the whole bundle.
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB of compressed-stream output per read
+_WS = re.compile(r'[ \t\n\r]*')
+_SCALAR_END = re.compile(r'[,}\] \t\n\r]')
+_DECODER = json.JSONDecoder()
+
+
+class _StreamReader:
+    """Buffered, position-tracking view over a binary telemetry stream."""
+
+    def __init__(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._stream = stream
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """Appends the next chunk to the buffer. Returns False at end of stream."""
+        if self.eof:
+            return False
+        data = self._stream.read(size or self._chunk_size)
+        if not data:
+            self.eof = True
+            self.buf += self._decoder.decode(b"", final=True)
+            return False
+        self.buf += self._decoder.decode(data)
+        return True
+
+    def compact(self):
+        """Releases everything before the read position."""
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+    def peek(self):
+        """Skips whitespace and returns the next character ('' at end of stream)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed telemetry JSON: expected '{char}' at offset {self.pos}, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def decode_value(self):
+        """
+        Decodes exactly one JSON value from the read position.
+        The buffer grows geometrically until the value is complete, so a
+        payload of N bytes costs O(N) decode work in total.
+        """
+        # Bare scalars (numbers, true/false/null) are not self-delimiting: a
+        # prefix such as '1.' decodes happily, so buffer up to the delimiter.
+        if self.peek() not in '{["':
+            while not _SCALAR_END.search(self.buf, self.pos) and self.fill():
+                pass
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(max(self._chunk_size, len(self.buf) - self.pos))
+
+    def iter_object_keys(self):
+        """
+        Yields the keys of the object at the read position. The caller must
+        consume each key's value before advancing the generator.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError(f"Malformed telemetry JSON: expected an object key at offset {self.pos}")
+            key = self.decode_value()
+            self.expect(':')
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == '}':
+                return
+            if sep != ',':
+                raise ValueError(f"Malformed telemetry JSON: expected ',' or '}}' at offset {self.pos - 1}")
+
+
+def iter_nodes(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Walks the Timestamp -> Cluster -> Node hierarchy of a telemetry stream.
+    Yields (timestamp, cluster_name, node_id, node_data) as soon as each
+    node's subtree has been parsed; the subtree is dropped on the next step.
+    """
+    reader = _StreamReader(stream, chunk_size)
+    for timestamp in reader.iter_object_keys():
+        for cluster_name in reader.iter_object_keys():
+            for node_id in reader.iter_object_keys():
+                node_data = reader.decode_value()
+                reader.compact()
+                yield timestamp, cluster_name, node_id, node_data
+                del node_data
+    if reader.peek():
+        raise ValueError(f"Malformed telemetry JSON: trailing data at offset {reader.pos}")
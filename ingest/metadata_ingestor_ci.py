@@ -1,4 +1,5 @@
 import sqlite3
+from collections import Counter
 from ingest.base_ingestor import BaseIngestor
 
 # -----------------------------------------------------------------------------
@@ -8,15 +9,41 @@ __version__ = "1.6.0"
 
 # --- Metadata ---
 # Module: MetadataIngestor
-# Purpose: Cluster-wide flavor discovery (Cloud, Storage, Consistency)
-# Target: cluster_metadata table
+# Purpose: Cluster-wide flavor discovery (Storage, Consistency, Topology)
+#          Cloud platform: see ingest/platform_detect.py
+# Target: node_flavors (one signal row per node), cluster_metadata (written
+#         once per cluster by finalize() from the collected node signals)
+
+FLAVOR_KEYS = ["server_version", "major_version", "consistency_model", "storage_flavor", "topology"]
 
 class MetadataIngestor(BaseIngestor):
+    # Cloud platform is detected once per cluster by ingest.platform_detect
+    PATHS = ("as_stat.meta_data", "as_stat.statistics.service", "as_stat.statistics.xdr", "as_stat.config.namespace")
+    SNAPSHOT_TABLES = ("node_flavors",)
+    TABLES = {
+        "node_flavors": (
+            """
+            CREATE TABLE IF NOT EXISTS node_flavors (
+                run_id TEXT, node_id TEXT, server_version TEXT, major_version TEXT,
+                consistency_model TEXT, storage_flavor TEXT, topology TEXT, snapshot_ts TEXT
+            )
+            """,
+            "INSERT INTO node_flavors VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ),
+        "cluster_metadata": (
+            "CREATE TABLE IF NOT EXISTS cluster_metadata (key TEXT PRIMARY KEY, value TEXT)",
+            "INSERT OR REPLACE INTO cluster_metadata (key, value) VALUES (?, ?)",
+        )
+    }
+
+    def __init__(self):
+        self._signals = []
+
     @property
     def name(self):
         return "Metadata & Flavor Discovery"
 
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
         # -------------------------------------------------------------------------
         # DATA EXTRACTION
         # -------------------------------------------------------------------------
@@ -65,33 +92,46 @@ class MetadataIngestor(BaseIngestor):
 
         storage_flavor = "/".join(sorted(storage_types)) if storage_types else "MEMORY"
 
-        # 5. Platform Flavor (catching naming conventions like va6prod)
-        full_context = str(node_data).lower()
-        platform = "Bare Metal / On-Prem"
-        if any(x in full_context for x in ["amazonaws", "ec2.internal", "10.94."]): 
-            platform = "AWS"
-        elif any(x in full_context for x in ["azure", "cloudapp", "10.181."]): 
-            platform = "Azure"
-
-        # 6. Topology Discovery
+        # 5. Topology Discovery
         is_xdr = len(as_stat.get('statistics', {}).get('xdr', {})) > 0
         topology = "XDR Enabled" if is_xdr else "Standalone"
 
         # -------------------------------------------------------------------------
-        # DATABASE UPDATE
+        # ROW BATCH (per-node signal record; cluster values come from finalize)
         # -------------------------------------------------------------------------
-        cursor = conn.cursor()
+        signal = (run_id, node_id, version_str, major_v, consistency, storage_flavor, topology)
+        return {"node_flavors": [signal]}
+
+    def collect(self, batch):
+        self._signals.extend(batch.get("node_flavors", []))
+
+    def finalize(self):
+        """Aggregates the collected node signals into one set of cluster flavors."""
+        # Latest signal per node (a bundle may hold several snapshots of the same node)
+        signals = list({row[1]: row for row in self._signals}.values())
+        self._signals = []
+        if not signals:
+            return {}
+        columns = {key: [row[2 + i] for row in signals] for i, key in enumerate(FLAVOR_KEYS)}
+
+        def summarize(values):
+            counts = Counter(values).most_common()
+            if len(counts) == 1:
+                return counts[0][0]
+            return "Mixed: " + ", ".join(f"{v} ({c} nodes)" for v, c in counts)
+
+        storage_types = {t for flavor in columns["storage_flavor"] for t in flavor.split("/")}
         meta_items = [
-            ("server_version", version_str), 
-            ("major_version", major_v),
-            ("cloud_platform", platform), 
-            ("consistency_model", consistency),
-            ("storage_flavor", storage_flavor), 
-            ("topology", topology)
+            ("server_version", summarize(columns["server_version"])),
+            ("major_version", summarize(columns["major_version"])),
+            ("consistency_model", summarize(columns["consistency_model"])),
+            ("storage_flavor", "/".join(sorted(storage_types))),
+            ("topology", "XDR Enabled" if "XDR Enabled" in columns["topology"] else "Standalone"),
         ]
-        for key, val in meta_items:
-            cursor.execute("INSERT OR REPLACE INTO cluster_metadata (key, value) VALUES (?, ?)", (key, val))
-        
-        conn.commit()
+        mixed = [key for key, values in columns.items() if len(set(values)) > 1]
+        if mixed:
+            meta_items.append(("mixed_flavors", ",".join(mixed)))
 
-        print(f"✅ {self.name}: Identified as {platform} | {consistency} | {storage_flavor}")
\ No newline at end of file
+        print(f"✅ {self.name}: {len(signals)} nodes | {meta_items[2][1]} | {meta_items[3][1]}"
+              + (f" | ⚠️ mixed: {', '.join(mixed)}" if mixed else ""))
+        return {"cluster_metadata": meta_items}
\ No newline at end of file
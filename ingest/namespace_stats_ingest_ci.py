@@ -1,32 +1,44 @@
 __version__ = "1.6.0"
 from ingest.base_ingestor import BaseIngestor
+from ingest.dimensions import FactTable
+from ingest.value_types import to_number
 
 class NamespaceStatsIngestor(BaseIngestor):
+    # Not owned: namespace_stats keeps numeric values only, node_stats keeps the rest
+    PATHS = ("as_stat.statistics.namespace", "as_stat.namespaces")
+    SNAPSHOT_TABLES = ("namespace_stats",)
+    TABLES = {
+        "namespace_stats": FactTable(
+            "namespace_stats",
+            [("run_id", "TEXT"), ("node_id", "TEXT"), ("namespace", "TEXT"),
+             ("metric", "TEXT"), ("value", "REAL"), ("source", "TEXT"), ("snapshot_ts", "TEXT")],
+            {"run_id": "run", "node_id": "node", "metric": "metric", "snapshot_ts": "snapshot"},
+        )
+    }
+
     @property
     def name(self): 
         return "Namespace Stats"
 
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
         as_stat = node_data.get('as_stat', {})
-        cursor = conn.cursor()
+        batch = {}
 
         # --- Namespace Stats Logic ---
         # Supports 6.x 'namespaces' and 7.x 'statistics.namespace' paths
         ns_container = as_stat.get('statistics', {}).get('namespace', as_stat.get('namespaces', {}))
 
         if ns_container:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS namespace_stats 
-                (run_id TEXT, node_id TEXT, namespace TEXT, metric TEXT, value REAL, source TEXT)
-            """)
+            rows = batch.setdefault("namespace_stats", [])
             
             for ns_name, ns_data in ns_container.items():
                 metrics = ns_data.get('service', ns_data) if isinstance(ns_data, dict) else {}
                 for metric, value in metrics.items():
-                    if isinstance(value, (int, float, str)) and str(value).replace('.','',1).isdigit():
+                    # Typed at ingest: negative and exponent-form numbers are kept
+                    number = to_number(value)
+                    if number is not None:
                         m_name = f"service.{metric}" if not metric.startswith('service.') else metric
-                        cursor.execute("INSERT INTO namespace_stats VALUES (?, ?, ?, ?, ?, ?)",
-                                       (run_id, node_id, ns_name, m_name, float(value), 'statistics'))
+                        rows.append((run_id, node_id, ns_name, m_name, number, 'statistics'))
 
-        conn.commit()
-        print(f"✅ {self.name} processed for {node_id}")
\ No newline at end of file
+        print(f"✅ {self.name} processed for {node_id}")
+        return batch
\ No newline at end of file
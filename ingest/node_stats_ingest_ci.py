@@ -1,4 +1,7 @@
 import sqlite3
+from ingest.base_ingestor import BaseIngestor
+from ingest.dimensions import FactTable
+from ingest.value_types import to_number
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -8,11 +11,29 @@ __version__ = "1.6.0"
 # --- Metadata ---
 # Module: NodeStatsIngestor
 # Purpose: Recursively flattens and ingests node-level statistics/service metrics
-# Target: node_stats table (Schema: run_id, node_id, metric, value)
+# Target: node_stats view over fact_node_stats (Schema: run_id, node_id, metric, value, value_num, snapshot_ts)
+
+class NodeStatsIngestor(BaseIngestor):
+    # Flattens whatever no other ingestor owns (config, sets, acl, sys_stat are stored elsewhere)
+    CATCH_ALL = True
+    SNAPSHOT_TABLES = ("node_stats",)
 
-class NodeStatsIngestor:
     def __init__(self):
         self.table_name = "node_stats"
+        # Ensure the table can store both Numbers and Strings; run/node/metric
+        # text is interned into dim_* tables (see ingest/dimensions.py)
+        self.TABLES = {
+            self.table_name: FactTable(
+                self.table_name,
+                [("run_id", "TEXT"), ("node_id", "TEXT"), ("metric", "TEXT"), ("value", "TEXT"), ("value_num", "REAL"),
+                 ("snapshot_ts", "TEXT")],
+                {"run_id": "run", "node_id": "node", "metric": "metric", "snapshot_ts": "snapshot"},
+            )
+        }
+
+    @property
+    def name(self):
+        return "Node Stats"
 
     def flatten_dict(self, d, parent_key='', sep='.'):
         """
@@ -28,22 +49,7 @@ class NodeStatsIngestor:
                 items.append((new_key, v))
         return dict(items)
 
-    def run_ingest(self, node_id, data, conn, run_id):
-        # -------------------------------------------------------------------------
-        # TABLE INITIALIZATION
-        # -------------------------------------------------------------------------
-        cursor = conn.cursor()
-        
-        # Ensure the table can store both Numbers and Strings
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS {self.table_name} (
-                run_id TEXT,
-                node_id TEXT,
-                metric TEXT,
-                value TEXT
-            )
-        """)
-
+    def extract(self, node_id, data, run_id):
         # -------------------------------------------------------------------------
         # DATA PROCESSING
         # -------------------------------------------------------------------------
@@ -61,14 +67,8 @@ class NodeStatsIngestor:
             # ---------------------------------------------------------------------
             # We store everything as TEXT in the DB to ensure version strings
             # and build numbers (e.g., 'E-7.2.0.6') aren't truncated or lost.
-            # Rules handle casting to REAL/FLOAT for mathematical comparisons.
-            insert_items.append((run_id, node_id, key, str(value)))
+            # Numeric values are also classified once into value_num (REAL),
+            # so rules compare and aggregate without CASTing text per row.
+            insert_items.append((run_id, node_id, key, str(value), to_number(value)))
 
-        # -------------------------------------------------------------------------
-        # BATCH INGESTION
-        # -------------------------------------------------------------------------
-        cursor.executemany(
-            f"INSERT INTO {self.table_name} (run_id, node_id, metric, value) VALUES (?, ?, ?, ?)",
-            insert_items
-        )
-        conn.commit()
\ No newline at end of file
+        return {self.table_name: insert_items}
@@ -0,0 +1,108 @@
+import re
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: platform_detect
+# Purpose: Cloud platform detection from the handful of fields that can carry
+#          a platform signal (node address, hostnames, network/XDR addresses,
+#          cluster name, sys_stat cloud metadata) instead of str(whole payload).
+#          One detector runs per cluster and stops at the first
+#          high-confidence hit.
+
+DEFAULT_PLATFORM = "Bare Metal / On-Prem"
+
+# Explicit cloud identifiers: a single hit decides the cluster
+HIGH_CONFIDENCE = [
+    ("AWS", ["amazonaws", "ec2.internal", "ami-id", "aws-"]),
+    ("Azure", ["azure", "cloudapp", "hv_vmbus", "microsoft"]),
+    ("GCP", ["googleapis.com", "gce.internal", "google-managed"]),
+]
+
+# Naming conventions / private address plans: used only if nothing above matched
+LOW_CONFIDENCE = [
+    ("AWS", ["10.94.", "us-east-"]),
+    ("Azure", ["10.181.", "_va7"]),
+]
+
+# sys_stat keys that can hold cloud metadata (hostname, instance type, DMI, kernel)
+SYS_STAT_KEYS = re.compile(r'host|name|instance|cloud|region|zone|ec2|dmi|vendor|product|kernel|uname|driver', re.I)
+
+
+def _scalars(block, depth=3):
+    """Scalar leaves of a small config block, as lowercase strings."""
+    if isinstance(block, dict):
+        if depth:
+            for value in block.values():
+                yield from _scalars(value, depth - 1)
+    elif isinstance(block, (list, tuple)):
+        for value in block:
+            yield from _scalars(value, depth)
+    elif block is not None:
+        yield str(block).lower()
+
+
+def signal_fields(node_id, node_data):
+    """Yields the lowercase text of every field that can carry a platform hint."""
+    yield str(node_id).lower()
+
+    sys_stat = node_data.get('sys_stat', {})
+    if isinstance(sys_stat, dict):
+        for key, value in sys_stat.items():
+            if SYS_STAT_KEYS.search(key):
+                yield from _scalars(value)
+
+    as_stat = node_data.get('as_stat', {})
+    config = as_stat.get('config', {})
+    yield from _scalars(config.get('network', {}), depth=4)
+    yield from _scalars(config.get('service', {}).get('cluster-name'))
+    yield from _scalars(config.get('xdr', {}), depth=5)
+    yield from _scalars(as_stat.get('meta_data', {}))
+
+
+def _match(text, table):
+    for platform, hints in table:
+        if any(hint in text for hint in hints):
+            return platform
+    return None
+
+
+class PlatformDetector:
+    """
+    Accumulates platform evidence for one cluster. observe() is a no-op once
+    a high-confidence identifier has been seen, so typically one node is read.
+    """
+
+    def __init__(self):
+        self.high = None
+        self.low = None
+        self.nodes_scanned = 0
+
+    @property
+    def confident(self):
+        return self.high is not None
+
+    @property
+    def platform(self):
+        return self.high or self.low or DEFAULT_PLATFORM
+
+    def observe(self, node_id, node_data):
+        if self.confident:
+            return self.platform
+        self.nodes_scanned += 1
+        for text in signal_fields(node_id, node_data):
+            hit = _match(text, HIGH_CONFIDENCE)
+            if hit:
+                self.high = hit
+                break
+            if self.low is None:
+                self.low = _match(text, LOW_CONFIDENCE)
+        return self.platform
+
+
+def detect_platform(node_id, node_data):
+    """One-shot detection for a single node payload."""
+    return PlatformDetector().observe(node_id, node_data)
@@ -0,0 +1,115 @@
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: registry
+# Purpose: Bundle identity. A run_id is derived from the bundle itself: the
+#          snapshot timestamp of its telemetry plus a SHA-256 of the archive
+#          ('20260120_230014_3f9a1c0d2b7e'), so the same bundle always gets the
+#          same run_id. Every ingest registers its bundle in `bundles`; a
+#          bundle already there is recognised by (path, size, mtime) without
+#          reading it, or else by its content hash, and skipped.
+
+BUNDLES_DDL = """
+    CREATE TABLE IF NOT EXISTS bundles (
+        run_id TEXT PRIMARY KEY, bundle TEXT, content_hash TEXT, snapshot_ts TEXT,
+        size INTEGER, mtime_ns INTEGER, clusters TEXT, nodes INTEGER,
+        ingested_at TEXT, seconds REAL)
+"""
+BUNDLES_HASH_INDEX = "CREATE INDEX IF NOT EXISTS idx_bundles_hash ON bundles (content_hash)"
+BUNDLES_UPSERT = "INSERT OR REPLACE INTO bundles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+HASH_CHUNK = 1024 * 1024
+RUN_HASH_CHARS = 12
+
+# Oldest snapshot first (the run_id prefix); bundles sharing a snapshot
+# timestamp in the order they entered the store (rowid), not by hash
+RUN_ORDER = f"substr(run_id, 1, length(run_id) - {RUN_HASH_CHARS + 1}), rowid"
+
+
+def content_hash(path):
+    """SHA-256 of the archive bytes, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_id(timestamp):
+    """'2026-01-20 23:00:14' -> '20260120_230014'; other formats keep their alphanumerics."""
+    digits = re.sub(r"\D", "", str(timestamp))
+    if len(digits) >= 14:
+        return f"{digits[:8]}_{digits[8:14]}"
+    return re.sub(r"[^0-9A-Za-z]+", "_", str(timestamp)).strip("_") or "unknown"
+
+
+def derive_run_id(timestamp, digest):
+    """run_id of a bundle: snapshot timestamp + content hash prefix."""
+    return f"{snapshot_id(timestamp)}_{digest[:RUN_HASH_CHARS]}"
+
+
+def _stat(path):
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+def find_registered(conn, path, digest=None):
+    """
+    (run_id or None, digest) for a bundle file. An unchanged file at a known
+    path is matched on (path, size, mtime) alone; otherwise the archive is
+    hashed (unless `digest` is given) and matched on content.
+    """
+    try:
+        row = conn.execute("SELECT run_id, content_hash FROM bundles WHERE bundle = ? AND size = ? AND mtime_ns = ?",
+                           _stat(path)).fetchone()
+        if row and row[1]:
+            return row[0], row[1]
+        digest = digest or content_hash(path)
+        row = conn.execute("SELECT run_id FROM bundles WHERE content_hash = ?", (digest,)).fetchone()
+    except sqlite3.OperationalError:
+        # No registry yet (new store, or a database from an older ingest)
+        return None, digest or content_hash(path)
+    return (row[0] if row else None), digest
+
+
+def registered_in(db_path, path):
+    """find_registered() against a database file that may not exist yet."""
+    if not os.path.exists(db_path):
+        return None, content_hash(path)
+    conn = sqlite3.connect(db_path)
+    try:
+        return find_registered(conn, path)
+    finally:
+        conn.close()
+
+
+def run_count(conn):
+    """Bundles registered in the database (0 for older ingests)."""
+    try:
+        return conn.execute("SELECT COUNT(*) FROM bundles").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def register(conn, run_id, path, digest, timestamp, seconds):
+    """Records the bundle behind `run_id` (clusters / nodes from cluster_nodes)."""
+    try:
+        clusters, nodes = conn.execute("SELECT group_concat(DISTINCT cluster_name), COUNT(DISTINCT node_id) "
+                                       "FROM cluster_nodes WHERE run_id = ?", (run_id,)).fetchone()
+    except sqlite3.OperationalError:
+        clusters, nodes = "", 0
+    bundle, size, mtime_ns = _stat(path)
+    conn.execute(BUNDLES_DDL)
+    conn.execute(BUNDLES_HASH_INDEX)
+    conn.execute(BUNDLES_UPSERT, (run_id, bundle, digest, str(timestamp) if timestamp else None, size, mtime_ns,
+                                  clusters or "", nodes or 0,
+                                  datetime.datetime.now().isoformat(timespec="seconds"), seconds))
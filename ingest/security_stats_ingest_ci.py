@@ -1,37 +1,51 @@
 import sqlite3
+from ingest.base_ingestor import BaseIngestor
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
 __version__ = "1.6.0"
 
-class SecurityStatsIngestor:
+class SecurityStatsIngestor(BaseIngestor):
     """
     Processes as_stat.acl (users and connections) from collectinfo.
     Aligned with INGEST-TEMPLATE.md requirements.
     """
-    def run_ingest(self, node_id, node_data, conn, run_id):
-        cursor = conn.cursor()
-
-        # 1. Ensure Table Exists
-        cursor.execute("""
+    # 1. Table Definition
+    PATHS = ("as_stat.acl",)
+    OWNS = ("as_stat.acl",)
+    SNAPSHOT_TABLES = ("security_stats",)
+    TABLES = {
+        "security_stats": (
+            """
             CREATE TABLE IF NOT EXISTS security_stats (
                 node_id TEXT, 
                 user TEXT, 
                 connections INTEGER, 
                 run_id TEXT,
-                PRIMARY KEY (node_id, user, run_id)
+                snapshot_ts TEXT,
+                PRIMARY KEY (node_id, user, run_id, snapshot_ts)
             )
-        """)
+            """,
+            """
+            INSERT OR REPLACE INTO security_stats (node_id, user, connections, run_id, snapshot_ts)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+        )
+    }
+
+    @property
+    def name(self):
+        return "Security Stats"
 
+    def extract(self, node_id, node_data, run_id):
         # 2. Extract Data (Navigate the 7.x JSON path: as_stat -> acl -> users)
         acl_data = node_data.get("as_stat", {}).get("acl", {})
         users = acl_data.get("users", {})
         
-        # 3. Persist
+        # 3. Row batch
+        rows = []
         for username, user_metrics in users.items():
             conns = user_metrics.get("connections", 0)
-            cursor.execute("""
-                INSERT OR REPLACE INTO security_stats (node_id, user, connections, run_id)
-                VALUES (?, ?, ?, ?)
-            """, (node_id, username, conns, run_id))
\ No newline at end of file
+            rows.append((node_id, username, conns, run_id))
+        return {"security_stats": rows}
\ No newline at end of file
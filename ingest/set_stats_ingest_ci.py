@@ -1,39 +1,46 @@
 import sqlite3
+from ingest.base_ingestor import BaseIngestor
+from ingest.dimensions import FactTable
+from ingest.value_types import to_number
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
 __version__ = "1.6.0"
 
-class SetStatsIngestor:
+class SetStatsIngestor(BaseIngestor):
     """
     Processes Aerospike 7.x set metrics using the standard Vertical Schema.
     Aligned with INGEST-TEMPLATE.md requirements.
     """
-    def run_ingest(self, node_id, node_data, conn, run_id):
-        cursor = conn.cursor()
+    # 1. Table Definition (Matches existing vertical schema)
+    PATHS = ("as_stat.statistics.set",)
+    OWNS = ("as_stat.statistics.set",)
+    SNAPSHOT_TABLES = ("set_stats",)
+    TABLES = {
+        "set_stats": FactTable(
+            "set_stats",
+            [("node_id", "TEXT"), ("ns", "TEXT"), ("set_name", "TEXT"), ("key", "TEXT"),
+             ("value", "TEXT"), ("run_id", "TEXT"), ("value_num", "REAL"), ("snapshot_ts", "TEXT")],
+            {"node_id": "node", "key": "metric", "run_id": "run", "snapshot_ts": "snapshot"},
+            # One row per set, run and snapshot: multi-snapshot bundles keep every snapshot
+            primary_key=("node_id", "ns", "set_name", "key", "run_id", "snapshot_ts"),
+            replace=True,
+        )
+    }
 
-        # 1. Ensure Table Exists (Matches existing vertical schema)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS set_stats (
-                node_id TEXT, 
-                ns TEXT, 
-                set_name TEXT, 
-                key TEXT, 
-                value TEXT, 
-                run_id TEXT,
-                PRIMARY KEY (node_id, ns, set_name, key, run_id)
-            )
-        """)
+    @property
+    def name(self):
+        return "Set Stats"
 
+    def extract(self, node_id, node_data, run_id):
         # 2. Navigate hierarchy: as_stat -> statistics -> set
         set_data = node_data.get("as_stat", {}).get("statistics", {}).get("set", {})
         
-        # 3. Extract and Persist using the Vertical (Key/Value) pattern
+        # 3. Extract using the Vertical (Key/Value) pattern
+        rows = []
         for ns_name, sets in set_data.items():
             for set_name, metrics in sets.items():
                 for key, val in metrics.items():
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO set_stats (node_id, ns, set_name, key, value, run_id)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (node_id, ns_name, set_name, key, str(val), run_id))
\ No newline at end of file
+                    rows.append((node_id, ns_name, set_name, key, str(val), run_id, to_number(val)))
+        return {"set_stats": rows}
\ No newline at end of file
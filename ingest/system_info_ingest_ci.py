@@ -1,32 +1,39 @@
 __version__ = "1.6.0"
 from ingest.base_ingestor import BaseIngestor
+from ingest.value_types import to_number
 
 class SystemInfoIngestor(BaseIngestor):
+    PATHS = ("sys_stat",)
+    OWNS = ("sys_stat",)
+    SNAPSHOT_TABLES = ("system_info",)
+    TABLES = {
+        "system_info": (
+            """
+            CREATE TABLE IF NOT EXISTS system_info (
+                run_id TEXT, 
+                node_id TEXT, 
+                metric TEXT, 
+                value TEXT,
+                value_num REAL,
+                snapshot_ts TEXT
+            )
+            """,
+            "INSERT INTO system_info VALUES (?, ?, ?, ?, ?, ?)",
+        )
+    }
+
     @property
     def name(self):
         return "System Info"
 
-    def run_ingest(self, node_id, node_data, conn, run_id):
+    def extract(self, node_id, node_data, run_id):
         # System info lives in a peer object to as_stat
         sys_info = node_data.get('sys_stat', {})
         if not sys_info:
-            return
+            return {}
 
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS system_info (
-                run_id TEXT, 
-                node_id TEXT, 
-                metric TEXT, 
-                value TEXT
-            )
-        """)
-
-        for metric, value in sys_info.items():
-            # System info is often strings (e.g., "instance-type": "m5.large")
-            cursor.execute(
-                "INSERT INTO system_info VALUES (?, ?, ?, ?)",
-                (run_id, node_id, metric, str(value))
-            )
+        # System info is often strings (e.g., "instance-type": "m5.large")
+        rows = [(run_id, node_id, metric, str(value), to_number(value)) for metric, value in sys_info.items()]
         
-        print(f"✅ {self.name}: Ingested for {node_id}")
\ No newline at end of file
+        print(f"✅ {self.name}: Ingested for {node_id}")
+        return {"system_info": rows}
\ No newline at end of file
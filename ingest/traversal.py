@@ -0,0 +1,125 @@
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: traversal
+# Purpose: Single traversal engine shared by all ingestors. Each ingestor
+#          declares the payload subtrees it reads (PATHS) and the subtrees
+#          whose rows it alone stores (OWNS). The engine resolves every
+#          declared path once per node, hands each ingestor a view holding
+#          only its subtrees, and gives the catch-all ingestor (node_stats)
+#          the payload minus everything another ingestor owns, so no
+#          subtree is flattened or stored twice. Rows of SNAPSHOT_TABLES are
+#          stamped here with the payload's telemetry timestamp.
+
+
+def _split(path):
+    return tuple(path.split('.'))
+
+
+def _build_trie(paths):
+    """{'as_stat': {'config': {}}} style trie; an empty dict marks a path end."""
+    trie = {}
+    for parts in paths:
+        node = trie
+        for part in parts:
+            node = node.setdefault(part, {})
+    return trie
+
+
+class NodeView(dict):
+    """Plain dict view of a payload; subtrees are shared, never copied."""
+
+    def graft(self, parts, subtree):
+        node = self
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = subtree
+
+
+class TraversalEngine:
+    """Routes one node payload to every registered ingestor in a single pass."""
+
+    def __init__(self, ingestors):
+        self.ingestors = list(ingestors)
+        self._paths = {id(i): [_split(p) for p in i.PATHS] for i in self.ingestors}
+        owned = [_split(p) for i in self.ingestors for p in i.OWNS]
+        self._owned_trie = _build_trie(owned)
+        self._wanted_trie = _build_trie(owned + [p for paths in self._paths.values() for p in paths])
+
+    # -------------------------------------------------------------------------
+    # PAYLOAD WALK
+    # -------------------------------------------------------------------------
+    def resolve(self, node_data):
+        """Descends the payload once along every declared path: {parts: subtree}."""
+        found = {}
+
+        def descend(data, trie, prefix):
+            for key, child_trie in trie.items():
+                if not isinstance(data, dict) or key not in data:
+                    continue
+                parts = prefix + (key,)
+                found[parts] = data[key]
+                if child_trie:
+                    descend(data[key], child_trie, parts)
+
+        descend(node_data, self._wanted_trie, ())
+        return found
+
+    def prune(self, data, trie=None):
+        """The payload without owned subtrees. Only dicts on an owned path are copied."""
+        trie = self._owned_trie if trie is None else trie
+        pruned = dict(data)
+        for key, child_trie in trie.items():
+            if key not in pruned:
+                continue
+            if not child_trie:
+                del pruned[key]
+            elif isinstance(pruned[key], dict):
+                pruned[key] = self.prune(pruned[key], child_trie)
+        return pruned
+
+    def view_for(self, ingestor, node_data, resolved):
+        if ingestor.CATCH_ALL:
+            return self.prune(node_data)
+        paths = self._paths[id(ingestor)]
+        if not paths:
+            return node_data
+        view = NodeView()
+        for parts in paths:
+            if parts in resolved:
+                view.graft(parts, resolved[parts])
+        return view
+
+    # -------------------------------------------------------------------------
+    # DISPATCH
+    # -------------------------------------------------------------------------
+    def stamp(self, ingestor, batch, snapshot):
+        """Appends the snapshot timestamp to every row of the ingestor's SNAPSHOT_TABLES."""
+        for table in ingestor.SNAPSHOT_TABLES:
+            rows = batch.get(table)
+            if rows:
+                batch[table] = [(*row, snapshot) for row in rows]
+        return batch
+
+    def extract(self, node_id, node_data, run_id, only=None, snapshot=None):
+        """
+        Runs every ingestor's extract() on its view. Returns [(ingestor_index, batch)].
+        `only` (a set of ingestor indexes) restricts the pass for a partial
+        re-ingest; ownership still comes from every registered ingestor, so
+        the catch-all view is the same as in a full pass. `snapshot` is the
+        payload's telemetry timestamp (see stamp).
+        """
+        resolved = self.resolve(node_data)
+        batches = []
+        for idx, ingestor in enumerate(self.ingestors):
+            if only is not None and idx not in only:
+                continue
+            try:
+                view = self.view_for(ingestor, node_data, resolved)
+                batches.append((idx, self.stamp(ingestor, ingestor.extract(node_id, view, run_id), snapshot)))
+            except Exception as e:
+                print(f"⚠️ {ingestor.__class__.__name__} failed: {e}")
+        return batches
@@ -0,0 +1,161 @@
+import datetime
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from ingest.bulk_loader import TABLE_VERSIONS_DDL, TABLE_VERSIONS_UPSERT
+from ingest.catalog import resolve_metrics
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: trends
+# Purpose: Historical trend store. The numeric metrics worth following over
+#          weeks (TREND_METRICS) are copied out of every run into a narrow
+#          time-series layout:
+#            trend_series  one row per (cluster, node, namespace, set, metric)
+#            trend_points  (series, snapshot time) -> value, clustered by series
+#            trend_daily   (series, day) -> min / max / last / samples
+#          Points and rollups are WITHOUT ROWID tables keyed (series, time),
+#          so a window over months of one metric is one B-tree range scan per
+#          series. Only the runs just loaded are (re)written, and only the
+#          days they touch are rolled up again. Every refresh stamps the
+#          trend tables in table_versions, so rules reading the history
+#          (READS) are recomputed when it changes.
+
+# table -> (namespace column, set column, name column, value column, metric patterns)
+TREND_METRICS = {
+    "namespace_stats": ("namespace", None, "metric", "value",
+                        ["service.data_used_pct", "service.memory_used_pct", "service.device_used_pct",
+                         "service.objects", "service.tombstones"]),
+    "node_stats": (None, None, "metric", "value_num",
+                   ["as_stat.statistics.service.client_connections",
+                    "as_stat.statistics.service.system_free_mem_pct"]),
+    "set_stats": ("ns", "set_name", "key", "value_num", ["objects", "tombstones", "data_used_bytes"]),
+}
+
+TREND_TABLES = ("trend_series", "trend_points", "trend_daily")
+
+# Stored point times; text order = time order
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+TREND_DDL = [
+    """CREATE TABLE IF NOT EXISTS trend_series (
+        series_key INTEGER PRIMARY KEY, metric TEXT NOT NULL, cluster_name TEXT NOT NULL,
+        node_id TEXT NOT NULL, namespace TEXT NOT NULL, set_name TEXT NOT NULL, source TEXT NOT NULL,
+        UNIQUE (metric, cluster_name, node_id, namespace, set_name))""",
+    """CREATE TABLE IF NOT EXISTS trend_points (
+        series_key INTEGER NOT NULL, ts TEXT NOT NULL, run_id TEXT NOT NULL, value REAL,
+        PRIMARY KEY (series_key, ts)) WITHOUT ROWID""",
+    # Run comparisons: the last point of every series in one run
+    "CREATE INDEX IF NOT EXISTS idx_trend_points_run ON trend_points (run_id, series_key, ts)",
+    """CREATE TABLE IF NOT EXISTS trend_daily (
+        series_key INTEGER NOT NULL, day TEXT NOT NULL, min REAL, max REAL, last REAL, last_ts TEXT,
+        samples INTEGER, PRIMARY KEY (series_key, day)) WITHOUT ROWID""",
+]
+
+
+@lru_cache(maxsize=4096)
+def normalize_ts(value):
+    """
+    Snapshot time as TS_FORMAT. Parsed with pandas, so collectinfo keys
+    SQLite's datetime() rejects ('2026-01-20 23:00:14 UTC') are normalised
+    too; text that is not a time at all is kept as is.
+    """
+    stamp = pd.to_datetime(value, errors="coerce") if value is not None else pd.NaT
+    return stamp.strftime(TS_FORMAT) if pd.notna(stamp) else value
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def _load_points(conn, table, run_ids, existing):
+    """Copies the TREND_METRICS rows of `table` for `run_ids` into trend_series / trend_points."""
+    ns_col, set_col, name_col, value_col, patterns = TREND_METRICS[table]
+    metrics = resolve_metrics(conn, table, patterns)
+    if not metrics:
+        return 0
+    ns = f"t.{ns_col}" if ns_col else "''"
+    set_name = f"t.{set_col}" if set_col else "''"
+    # Snapshot time normalised to TS_FORMAT (normalize_ts, registered on the
+    # connection); rows ingested before snapshot_ts existed take their bundle's snapshot
+    columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    snapshot = "t.snapshot_ts" if "snapshot_ts" in columns else "NULL"
+    bundle_ts = "(SELECT snapshot_ts FROM bundles b WHERE b.run_id = t.run_id)" if "bundles" in existing else "NULL"
+    ts = f"trend_ts(COALESCE({snapshot}, {bundle_ts}, t.run_id))"
+
+    rows = (f"FROM {table} t JOIN cluster_nodes c ON c.run_id = t.run_id AND c.node_id = t.node_id "
+            f"WHERE t.run_id IN ({_placeholders(run_ids)}) AND t.{name_col} IN ({_placeholders(metrics)}) "
+            f"AND t.{value_col} IS NOT NULL")
+    params = [*run_ids, *metrics]
+    conn.execute("INSERT OR IGNORE INTO trend_series (metric, cluster_name, node_id, namespace, set_name, source) "
+                 f"SELECT DISTINCT t.{name_col}, c.cluster_name, t.node_id, {ns}, {set_name}, '{table}' {rows}",
+                 params)
+    # Series resolved through the UNIQUE index; a run holding several
+    # snapshots contributes one point per snapshot
+    series = (f"(SELECT series_key FROM trend_series s WHERE s.metric = t.{name_col} AND "
+              f"s.cluster_name = c.cluster_name AND s.node_id = t.node_id AND s.namespace = {ns} AND "
+              f"s.set_name = {set_name})")
+    return conn.execute("INSERT OR REPLACE INTO trend_points (series_key, ts, run_id, value) "
+                        f"SELECT {series}, {ts}, t.run_id, t.{value_col} {rows}", params).rowcount
+
+
+def refresh_trends(conn, run_ids=None):
+    """
+    (Re)writes the trend points of `run_ids` (default: the runs of
+    cluster_nodes the trend store does not hold yet) and rolls up the days
+    they touch. Returns the number of points written.
+    """
+    start = time.perf_counter()
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    if "cluster_nodes" not in existing:
+        return 0
+    conn.create_function("trend_ts", 1, normalize_ts, deterministic=True)
+    with conn:
+        for statement in TREND_DDL:
+            conn.execute(statement)
+        if run_ids is None:
+            run_ids = [r[0] for r in conn.execute(
+                "SELECT DISTINCT run_id FROM cluster_nodes c "
+                "WHERE NOT EXISTS (SELECT 1 FROM trend_points p WHERE p.run_id = c.run_id)")]
+        run_ids = [r for r in run_ids if r]
+        if not run_ids:
+            return 0
+        in_runs = f"run_id IN ({_placeholders(run_ids)})"
+        # Days to roll up again: those of the points replaced and of the points written
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS trend_touched (series_key INTEGER, day TEXT, "
+                     "PRIMARY KEY (series_key, day)) WITHOUT ROWID")
+        conn.execute("DELETE FROM trend_touched")
+        touch = f"INSERT OR IGNORE INTO trend_touched SELECT series_key, substr(ts, 1, 10) FROM trend_points WHERE {in_runs}"
+        conn.execute(touch, run_ids)
+        conn.execute(f"DELETE FROM trend_points WHERE {in_runs}", run_ids)
+
+        points = sum(_load_points(conn, table, run_ids, existing) for table in TREND_METRICS if table in existing)
+        conn.execute(touch, run_ids)
+
+        conn.execute("DELETE FROM trend_daily WHERE (series_key, day) IN (SELECT series_key, day FROM trend_touched)")
+        # Range scan of each touched (series, day); `last` is the point at the day's latest snapshot
+        conn.execute("""
+            INSERT INTO trend_daily (series_key, day, min, max, last, last_ts, samples)
+            SELECT d.series_key, d.day, d.lo, d.hi, p.value, d.last_ts, d.samples
+            FROM (SELECT k.series_key, k.day, MIN(p.value) AS lo, MAX(p.value) AS hi, MAX(p.ts) AS last_ts,
+                         COUNT(*) AS samples
+                  FROM trend_touched k JOIN trend_points p
+                    ON p.series_key = k.series_key AND p.ts >= k.day AND p.ts < k.day || 'z'
+                  GROUP BY k.series_key, k.day) d
+            JOIN trend_points p ON p.series_key = d.series_key AND p.ts = d.last_ts""")
+        days = conn.execute("SELECT COUNT(*) FROM trend_touched").fetchone()[0]
+        conn.execute("DELETE FROM trend_touched")
+        # Version stamps for the persisted rule results (see rules/store.py)
+        loaded_at = datetime.datetime.now().isoformat(timespec="microseconds")
+        conn.execute(TABLE_VERSIONS_DDL)
+        conn.executemany(TABLE_VERSIONS_UPSERT, [
+            (table, max(run_ids), conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], loaded_at)
+            for table in TREND_TABLES])
+    print(f"📈 Trends: {points:,} points, {days:,} daily rollups in {time.perf_counter() - start:.2f}s")
+    return points
@@ -0,0 +1,33 @@
+import math
+import re
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: value_types
+# Purpose: Classifies telemetry values once at ingest. Tables keep the exact
+#          text in `value` and the parsed magnitude in `value_num` (NULL for
+#          non-numeric values), so rules compare and aggregate on a REAL
+#          column instead of CASTing text on every scan.
+
+# Plain decimal / exponent form only: version strings ('7.2.0.6'), hex, 'nan'
+# and 'inf' stay text-only.
+_NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def to_number(value):
+    """Returns the value as a float, or None when it is not a number."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, str):
+        text = value.strip()
+        if _NUMBER.fullmatch(text):
+            number = float(text)
+            return number if math.isfinite(number) else None
+    return None
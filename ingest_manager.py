@@ -1,74 +1,358 @@
 import sqlite3
-import tarfile
+import collections
+import concurrent.futures
+import contextlib
+import io
 import json
 import os
 import datetime
-import io
-import gzip
-import zipfile
-from ingest import INGESTORS 
+import itertools
+import shutil
+import tempfile
+import time
+from ingest import ENGINE, INGESTORS
+from ingest.bulk_loader import BULK_PRAGMAS, SAFE_PRAGMAS, BulkLoader
+from ingest.bundle_scan import scan_bundle
+from ingest.decoder import DecodeStats
+from ingest.dimensions import FactTable
+from ingest.fleet import find_bundles, merge_shard
+from ingest.catalog import build_catalog
+from ingest.indexes import build_indexes
+from ingest.json_stream import iter_nodes
+from ingest.platform_detect import PlatformDetector
+from ingest.registry import content_hash, derive_run_id, find_registered, register, registered_in, run_count
+from ingest.trends import TREND_METRICS, refresh_trends
 
 __version__ = "1.6.0"
 
-def get_json_content(tar, member):
-    """Handles .json, .json.gz, and .json.zip members inside a tarball."""
-    f_bytes = tar.extractfile(member).read()
-    # Handle Zip wrapper (common in newer collectinfo)
-    if member.name.endswith('.zip'):
-        with zipfile.ZipFile(io.BytesIO(f_bytes)) as z:
-            f_bytes = z.read(z.namelist()[0])
-    # Handle Gzip wrapper
-    if f_bytes.startswith(b'\x1f\x8b'):
-        f_bytes = gzip.decompress(f_bytes)
-    return json.loads(f_bytes.decode('utf-8'))
-
-def find_telemetry_member(tar):
+CLUSTER_METADATA_DDL = "CREATE TABLE IF NOT EXISTS cluster_metadata (key TEXT PRIMARY KEY, value TEXT)"
+CLUSTER_METADATA_INSERT = "INSERT OR REPLACE INTO cluster_metadata VALUES (?, ?)"
+# Cluster membership of every node; with run_id it is the (bundle, cluster) partition key
+CLUSTER_NODES_DDL = "CREATE TABLE IF NOT EXISTS cluster_nodes (run_id TEXT, cluster_name TEXT, node_id TEXT)"
+CLUSTER_NODES_INSERT = "INSERT INTO cluster_nodes VALUES (?, ?, ?)"
+
+def extract_node(node_id, node_data, run_id, only=None, snapshot=None):
     """
-    Dynamic Discovery: Finds the primary telemetry file.
-    Filters for files containing '.json' but ignoring 'manifest'.
-    Returns the largest such file, as telemetry is always the bulk of the bundle.
+    Runs every ingestor's extract step on one node payload via the shared
+    traversal engine. Pure (no DB), so it can execute in a worker process.
+    `only` limits the pass to a set of INGESTORS indexes (partial re-ingest);
+    `snapshot` is the payload's telemetry timestamp, stored with its rows.
+    Returns [(ingestor_index, batch)].
+    """
+    return ENGINE.extract(node_id, node_data, run_id, only, snapshot)
+
+def write_node(loader, batches):
+    """Queues the row batches of one node on the bundle's single BulkLoader."""
+    for idx, batch in batches:
+        ingestor = INGESTORS[idx]
+        try:
+            loader.add(ingestor.TABLES, batch)
+            ingestor.collect(batch)
+        except Exception as e:
+            print(f"⚠️ {ingestor.__class__.__name__} failed: {e}")
+
+def ingest_nodes(payloads, loader, run_id, workers=0, only=None):
     """
-    candidates = [
-        m for m in tar.getmembers() 
-        if (".json" in m.name.lower()) and ("manifest" not in m.name.lower())
-    ]
-    if not candidates:
+    Consumes (timestamp, cluster_name, node_id, node_data) payloads in order.
+    workers=0 runs serially; workers=N fans extraction out to N processes
+    while this process stays the only SQLite writer. Batches are applied in
+    submission order, so the database is identical to the serial path.
+    Platform detection runs here, once per cluster, on targeted fields;
+    each ingestor's finalize() hook runs after a cluster's last node.
+    `only` restricts extraction and finalize() to a set of INGESTORS indexes.
+    """
+    current_cluster = None
+    detectors = {}
+    selected = [i for idx, i in enumerate(INGESTORS) if only is None or idx in only]
+    # cluster_name / cloud_platform rows belong with the ingestor owning cluster_metadata
+    writes_metadata = any("cluster_metadata" in i.TABLES for i in selected)
+
+    members = set()  # (cluster, node) pairs already in cluster_nodes
+
+    def _observe(payloads):
+        for timestamp, cluster_name, node_id, node_data in payloads:
+            detectors.setdefault(cluster_name, PlatformDetector()).observe(node_id, node_data)
+            yield timestamp, cluster_name, node_id, node_data
+
+    def _close_cluster(cluster_name):
+        for ingestor in selected:
+            try:
+                loader.add(ingestor.TABLES, ingestor.finalize())
+            except Exception as e:
+                print(f"⚠️ {ingestor.__class__.__name__} finalize failed: {e}")
+        if not writes_metadata:
+            return
+        detector = detectors[cluster_name]
+        print(f"☁️  Platform for {cluster_name}: {detector.platform} ({detector.nodes_scanned} node(s) scanned)")
+        loader.add_rows("cluster_metadata", CLUSTER_METADATA_DDL, CLUSTER_METADATA_INSERT,
+                        [("cloud_platform", detector.platform)])
+
+    def _apply(cluster_name, node_id, batches):
+        nonlocal current_cluster
+        if cluster_name != current_cluster:
+            if current_cluster is not None:
+                _close_cluster(current_cluster)
+            if writes_metadata:
+                loader.add_rows("cluster_metadata", CLUSTER_METADATA_DDL, CLUSTER_METADATA_INSERT,
+                                [("cluster_name", cluster_name)])
+            current_cluster = cluster_name
+        if writes_metadata and (cluster_name, node_id) not in members:
+            # Once per node, however many snapshots the bundle holds
+            members.add((cluster_name, node_id))
+            loader.add_rows("cluster_nodes", CLUSTER_NODES_DDL, CLUSTER_NODES_INSERT, [(run_id, cluster_name, node_id)])
+        write_node(loader, batches)
+
+    if workers <= 0:
+        for timestamp, cluster_name, node_id, node_data in _observe(payloads):
+            print(f"📦 Processing Node: {node_id}")
+            _apply(cluster_name, node_id, extract_node(node_id, node_data, run_id, only, timestamp))
+            del node_data
+    else:
+        # Bounded window of in-flight nodes keeps streaming memory flat
+        pending = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for timestamp, cluster_name, node_id, node_data in _observe(payloads):
+                pending.append((cluster_name, node_id,
+                                pool.submit(extract_node, node_id, node_data, run_id, only, timestamp)))
+                del node_data
+                if len(pending) >= workers * 2:
+                    cluster_name, node_id, future = pending.popleft()
+                    print(f"📦 Processing Node: {node_id}")
+                    _apply(cluster_name, node_id, future.result())
+            while pending:
+                cluster_name, node_id, future = pending.popleft()
+                print(f"📦 Processing Node: {node_id}")
+                _apply(cluster_name, node_id, future.result())
+
+    # cluster_metadata is not keyed by cluster, so the last cluster wins (as before)
+    if current_cluster is not None:
+        _close_cluster(current_cluster)
+
+def current_run_id(conn):
+    """run_id of the database's last load (table_versions), or None for older ingests."""
+    try:
+        return conn.execute("SELECT MAX(run_id) FROM table_versions").fetchone()[0]
+    except sqlite3.OperationalError:
         return None
-    # Heuristic: The telemetry file is the largest JSON file
-    return max(candidates, key=lambda m: m.size)
 
-def process_collectinfo(input_path, db_path="aerospike_health.db"):
-    if os.path.exists(db_path):
-        os.remove(db_path)
+def clear_tables(conn, only):
+    """
+    Empties the tables owned by the selected ingestors before they are
+    re-loaded. Fact rows go; dimension entries stay (the Interner reuses them).
+    """
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    for idx in sorted(only):
+        for table, spec in INGESTORS[idx].TABLES.items():
+            targets = [spec.fact if isinstance(spec, FactTable) else table]
+            if table == "cluster_metadata":
+                targets.append("cluster_nodes")  # written alongside it, see ingest_nodes
+            for target in targets:
+                if target in existing:
+                    conn.execute(f"DELETE FROM {target}")
+
+def process_collectinfo(input_path, db_path="aerospike_health.db", streaming=False, index_path=None, workers=0,
+                        only=None, run_id=None, force=False, digest=None, trends=True):
+    """
+    Ingests a collectinfo bundle into SQLite.
+    The archive is read in a single sequential pass; the telemetry member is
+    decoded while the pass is positioned on it. With streaming=True the JSON
+    is decoded node-by-node straight off the decompression stream, so peak
+    memory stays near one node's payload. workers=N extracts rows in N
+    processes with a single writer. index_path saves a sidecar index of
+    member offsets. All rows go through one BulkLoader transaction, then
+    the access-pattern indexes are built and ANALYZE is run.
+    only=<set of INGESTORS indexes> re-ingests just those slices into the
+    existing database (see ingest.select_ingestors): their tables are
+    emptied and re-loaded under the database's run_id, and only their
+    table_versions stamps change, so only downstream rule results go stale.
+    The run_id is derived from the bundle (snapshot timestamp + content
+    hash, see ingest.registry) and the bundle is registered in `bundles`;
+    a full ingest of the bundle the database already holds is skipped
+    (returns None) unless force=True. run_id overrides the derived id;
+    digest passes an already computed content hash. trends=False leaves
+    the trend store (ingest.trends) to the caller, e.g. a fleet merge.
+    Returns the per-layer DecodeStats.
+    """
+    start = time.perf_counter()
+    if only is not None and not os.path.exists(db_path):
+        print(f"⚠️ {db_path} not found; running a full ingest instead of a partial one.")
+        only = None
+    if only is None:
+        if os.path.exists(db_path):
+            known, digest = registered_in(db_path, input_path) if not force else (None, digest)
+            if known:
+                print(f"⏭️  {os.path.basename(input_path)} is already ingested in {db_path} as {known}; skipping.")
+                return None
+            os.remove(db_path)
     
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("CREATE TABLE IF NOT EXISTS cluster_metadata (key TEXT PRIMARY KEY, value TEXT)")
+    if only is not None and run_count(conn) > 1:
+        conn.close()
+        raise ValueError(f"{db_path} holds several bundles; partial re-ingest only works on a single-bundle database.")
+    conn.execute(CLUSTER_METADATA_DDL)
     
-    # Generate a run_id based on current wall clock
-    run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    with tarfile.open(input_path, "r:*") as tar:
-        target = find_telemetry_member(tar)
-        
-        if not target:
-            raise FileNotFoundError("Dynamic discovery failed: No telemetry JSON found in bundle.")
-            
-        print(f"🔍 Discovered Telemetry: {target.name} ({target.size / 1024:.2f} KB)")
-        data = get_json_content(tar, target)
-
-    # 3-LEVEL NESTED LOOP: Timestamp -> Cluster -> Node
-    for timestamp, clusters in data.items():
-        for cluster_name, nodes in clusters.items():
-            cursor.execute("INSERT OR REPLACE INTO cluster_metadata VALUES (?, ?)", ("cluster_name", cluster_name))
-            
-            for node_id, node_data in nodes.items():
-                print(f"📦 Processing Node: {node_id}")
-                for ingestor in INGESTORS:
-                    try:
-                        ingestor.run_ingest(node_id, node_data, conn, run_id)
-                    except Exception as e:
-                        print(f"⚠️ {ingestor.__class__.__name__} failed: {e}")
-    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    # A partial re-ingest keeps the existing run_id; otherwise it is fixed from
+    # the first telemetry row's snapshot timestamp before any row is extracted
+    identity = {"run_id": run_id or (current_run_id(conn) if only is not None else None), "timestamp": None}
+    if only is None or identity["run_id"] is None:
+        digest = digest or content_hash(input_path)
+
+    def _identified(rows):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return rows
+        identity["timestamp"] = first[0]
+        identity["run_id"] = identity["run_id"] or derive_run_id(first[0], digest)
+        return itertools.chain([first], rows)
+
+    stats = DecodeStats()
+    loaded = {}
+
+    def _on_telemetry(ref, stream):
+        print(f"🔍 Discovered Telemetry: {ref.name} ({ref.size / 1024:.2f} KB)")
+        if not streaming:
+            loaded["data"] = json.load(stream)
+            return
+        # STREAMING LOOP: Timestamp -> Cluster -> Node, one node in memory at a time
+        payloads = _identified(iter_nodes(stream))
+        ingest_nodes(payloads, loader, identity["run_id"], workers, only)
+
+    try:
+        # A partial re-ingest writes into a store it cannot rebuild: durable journal
+        with BulkLoader(conn, pragmas=BULK_PRAGMAS if only is None else SAFE_PRAGMAS) as loader:
+            if only is not None:
+                # Same transaction as the re-load: a failed pass leaves the old rows in place
+                clear_tables(conn, only)
+            inventory = scan_bundle(input_path, {"telemetry": _on_telemetry}, index_path=index_path, stats=stats)
+            if inventory.telemetry and not streaming:
+                data = loaded.pop("data")
+                # 3-LEVEL NESTED LOOP: Timestamp -> Cluster -> Node
+                payloads = _identified((timestamp, cluster_name, node_id, node_data)
+                                       for timestamp, clusters in data.items()
+                                       for cluster_name, nodes in clusters.items()
+                                       for node_id, node_data in nodes.items())
+                ingest_nodes(payloads, loader, identity["run_id"], workers, only)
+            if not inventory.telemetry:
+                raise FileNotFoundError("Dynamic discovery failed: No telemetry JSON found in bundle.")
+            # Empty telemetry: no snapshot timestamp to derive the run from
+            run_id = identity["run_id"] or derive_run_id(datetime.datetime.now(), digest)
+            # Version stamps for the persisted rule results (see rules/store.py)
+            loader.stamp_tables(run_id)
+        # Indexes for the rule access patterns, built once the data is in;
+        # the name catalog then serves the '%...%' pattern lookups
+        build_indexes(conn)
+        build_catalog(conn)
+        if only is None:
+            with conn:
+                register(conn, run_id, input_path, digest, identity["timestamp"], time.perf_counter() - start)
+        # A partial re-ingest only rewrites the history when it reloaded a trend source
+        if trends and (only is None or set(loader.tables_loaded) & set(TREND_METRICS)):
+            refresh_trends(conn, [run_id])
+    finally:
+        conn.close()
+
+    print(f"🪪 Run: {run_id}")
+    print(f"💾 Bulk Load: {loader.report()}")
+    print(f"📊 Decode Layers:\n{stats.report()}")
+    return stats
+
+def _ingest_shard(bundle, shard_path, digest, streaming):
+    """Worker process: ingests one bundle into its own shard database, quietly."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_collectinfo(bundle, shard_path, streaming=streaming, digest=digest, trends=False)
+
+def _merge(conn, bundle, shard_path):
+    """Merges a finished shard into the store; returns its run_id."""
+    try:
+        run_id, rows = merge_shard(conn, shard_path)
+    finally:
+        if os.path.exists(shard_path):
+            os.remove(shard_path)
+    seconds = conn.execute("SELECT seconds FROM bundles WHERE run_id = ?", (run_id,)).fetchone()[0]
+    print(f"🛰️  {os.path.basename(bundle)} -> {run_id}: {rows:,} rows in {seconds:.2f}s")
+    return run_id
+
+def append_bundle(input_path, db_path="aerospike_health.db", streaming=False, workers=0, index_path=None):
+    """
+    Append mode: adds one bundle to the store next to the bundles already
+    there (same layout as a fleet store) instead of replacing the database.
+    A bundle already in the store is skipped. Returns its run_id.
+    """
+    conn = sqlite3.connect(db_path)
+    shard_dir = tempfile.mkdtemp(prefix="append_shard_", dir=os.path.dirname(os.path.abspath(db_path)))
+    try:
+        known, digest = find_registered(conn, input_path)
+        if known:
+            print(f"⏭️  {os.path.basename(input_path)} is already in {db_path} as {known}; skipping.")
+            return known
+        shard_path = os.path.join(shard_dir, "shard.db")
+        process_collectinfo(input_path, shard_path, streaming=streaming, index_path=index_path, workers=workers,
+                            digest=digest, trends=False)
+        run_id = _merge(conn, input_path, shard_path)
+        build_indexes(conn)
+        build_catalog(conn)
+        # The new run, plus the earlier one of a store that predates the trend tables
+        refresh_trends(conn)
+        return run_id
+    finally:
+        conn.close()
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+def process_fleet(bundle_dir, db_path="fleet_health.db", workers=4, streaming=True, rebuild=False):
+    """
+    Fleet mode: ingests every bundle in `bundle_dir` into one store.
+    Bundles are ingested concurrently (N processes, one shard database each)
+    and merged by this process, the single writer, in bundle order as they
+    complete. Rows are partitioned by run_id (one per bundle, see the bundles
+    table) and cluster (cluster_nodes). The store is appended to: bundles
+    it already holds (or duplicates within the directory) are skipped, so
+    re-running on a growing directory only ingests the new bundles.
+    rebuild=True starts from an empty store.
+    Returns [(bundle, run_id, status)], status 'ingested', 'skipped' or the error.
+    """
+    bundles = find_bundles(bundle_dir)
+    if not bundles:
+        raise FileNotFoundError(f"No collectinfo bundles (.tgz) found in {bundle_dir}")
+    if rebuild and os.path.exists(db_path):
+        os.remove(db_path)
+
+    shard_dir = tempfile.mkdtemp(prefix="fleet_shards_", dir=os.path.dirname(os.path.abspath(db_path)))
+    conn = sqlite3.connect(db_path)
+    outcome = []
+    try:
+        # Skip check first: (path, size, mtime) or content hash against the registry
+        todo, skipped, seen = [], [], set()
+        for bundle in bundles:
+            known, digest = find_registered(conn, bundle)
+            if known or digest in seen:
+                print(f"⏭️  {os.path.basename(bundle)} already ingested; skipping.")
+                skipped.append((bundle, digest))
+            else:
+                seen.add(digest)
+                todo.append((bundle, digest))
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, min(workers, len(todo) or 1))) as pool:
+            jobs = []
+            for idx, (bundle, digest) in enumerate(todo):
+                shard_path = os.path.join(shard_dir, f"shard_{idx:04d}.db")
+                jobs.append((bundle, shard_path, pool.submit(_ingest_shard, bundle, shard_path, digest, streaming)))
+            # Merged in bundle order, so dimension keys do not depend on completion order
+            for bundle, shard_path, future in jobs:
+                try:
+                    future.result()
+                    outcome.append((bundle, _merge(conn, bundle, shard_path), "ingested"))
+                except Exception as e:
+                    print(f"⚠️ {os.path.basename(bundle)} failed: {e}")
+                    outcome.append((bundle, None, str(e)))
+        if any(status == "ingested" for _, _, status in outcome):
+            build_indexes(conn)
+            build_catalog(conn)
+            refresh_trends(conn)
+        # Resolved after the merges: a duplicate's copy may have just been ingested
+        for bundle, digest in skipped:
+            outcome.append((bundle, find_registered(conn, bundle, digest)[0], "skipped"))
+    finally:
+        conn.close()
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return outcome
@@ -1,21 +1,12 @@
 __version__ = "1.4.0"
-import tarfile, json, gzip, zipfile, io
+from ingest.bundle_scan import open_telemetry
+from ingest.json_stream import iter_nodes
 
 def peek():
     path = 'aws-common.collect_info_20260120_230014.tgz'
-    with tarfile.open(path, "r:*") as tar:
-        member = next(m for m in tar.getmembers() if 'ascinfo.json' in m.name)
-        f = tar.extractfile(member).read()
-        
-        # Unzip inner layer
-        with zipfile.ZipFile(io.BytesIO(f)) as z:
-            content = z.read(z.namelist()[0])
-            
-        data = json.loads(content.decode('utf-8'))
-        ts = list(data.keys())[0]
-        cl = list(data[ts].keys())[0]
-        node = list(data[ts][cl].keys())[0]
-        node_data = data[ts][cl][node]
+    with open_telemetry(path) as (member, stream):
+        # Unzips/gunzips lazily; only the first node is decoded
+        ts, cl, node, node_data = next(iter_nodes(stream))
         
         print(f"--- Top Level Keys ---\n{list(node_data.keys())}")
         
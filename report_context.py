@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import datetime
+import pandas as pd
+
+from rules.runner import RuleRunner, open_context
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: report_context
+# Purpose: Report-context build step. The metadata queries and the ruleset run
+#          once per database; the results are saved to a versioned JSON
+#          artifact that _setup.qmd (and so every included partial) loads
+#          instead of re-running anything. Runs as the Quarto pre-render step.
+#          Rule results come from the persisted store (rules/store.py).
+#          On a store holding several bundles (append mode) the metadata is
+#          read for the run the rules evaluated (run_id in the artifact).
+
+CONTEXT_PATH = "report_context.json"
+# Bump when the artifact layout changes; older artifacts are rebuilt
+CONTEXT_VERSION = 2
+
+DEFAULT_METADATA = {
+    "cluster_display": "Unnamed Cluster",
+    "server_version": "Unknown",
+    "node_count": 0,
+    "feature_list": [],
+    "active_features_str": "None detected",
+    "cloud_platform": "Unknown",
+    "consistency": "Unknown",
+    "storage": "Unknown",
+    "idx_type": "Unknown",
+    "topology": "Unknown",
+}
+
+
+def db_fingerprint(db_path):
+    """Identifies the database contents the artifact was built from."""
+    st = os.stat(db_path)
+    return {"path": os.path.abspath(db_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def collect_metadata(db_path, run_id=None):
+    """
+    Cluster-level values shown across the report partials, for `run_id`
+    (default: the latest snapshot of a multi-bundle store, see open_context).
+    """
+    meta = dict(DEFAULT_METADATA)
+    ctx = open_context(db_path, run_id)
+    # Partition views: cluster_metadata is the run's bundle_metadata, run tables hold its rows only
+    conn = ctx.conn
+    try:
+        # 1. Base Metadata extraction
+        meta_df = pd.read_sql_query("SELECT * FROM cluster_metadata", conn)
+        metadata = dict(zip(meta_df['key'], meta_df['value']))
+
+        meta["cluster_display"] = metadata.get('cluster_name', "Unnamed Cluster")
+        meta["cloud_platform"] = metadata.get('cloud_platform', "Unknown")
+        meta["server_version"] = metadata.get('server_version', "Unknown")
+        meta["consistency"] = metadata.get('consistency_model', "Unknown")
+        meta["storage"] = metadata.get('storage_flavor', "Unknown")
+        meta["topology"] = metadata.get('topology', "Unknown")
+
+        # Dynamic Index Location Lookup (Resilient)
+        idx_type = metadata.get('index_flavor', "Unknown")
+        if idx_type == "Unknown":
+            # Check for All-Flash indicators (mounts)
+            idx_res = pd.read_sql_query(
+                "SELECT DISTINCT metric FROM namespace_stats WHERE metric GLOB 'service.index-type.mount*'",
+                conn
+            )
+            # Fallback: If no mounts exist but index metrics do, it's standard RAM
+            idx_type = "Flash (All-Flash)" if not idx_res.empty else "RAM (shmem)"
+        meta["idx_type"] = idx_type
+
+        node_res = pd.read_sql_query("SELECT COUNT(DISTINCT node_id) as count FROM node_stats", conn)
+        meta["node_count"] = int(node_res['count'].iloc[0]) if not node_res.empty else 0
+
+        features_df = pd.read_sql_query("SELECT DISTINCT feature FROM active_features", conn)
+        meta["feature_list"] = sorted(features_df['feature'].tolist())
+        meta["active_features_str"] = ", ".join(meta["feature_list"]) if meta["feature_list"] else "None detected"
+
+    except Exception as e:
+        print(f"Error during metadata retrieval: {e}")
+    finally:
+        ctx.close()
+    return meta
+
+
+def build_context(db_path="aerospike_health.db", path=CONTEXT_PATH):
+    """Runs the metadata queries and the ruleset once and writes the artifact."""
+    runner = RuleRunner(db_path)
+    results = runner.run()
+    context = {
+        "version": CONTEXT_VERSION,
+        "project_version": __version__,
+        "built_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+        # Taken after the run: new results land in the rule_results table
+        "db": db_fingerprint(db_path),
+        # The run the rules evaluated (None: single-bundle database)
+        "run_id": runner.run_id,
+        "metadata": collect_metadata(db_path, runner.run_id),
+        "results": results,
+        "timings": runner.timings,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(context, f, indent=2)
+    os.replace(tmp, path)
+    print(f"🧾 Report context: {runner.report()} -> {path}")
+    return context
+
+
+def load_context(db_path="aerospike_health.db", path=CONTEXT_PATH):
+    """
+    Returns the saved context when it matches the current database and layout
+    version; otherwise (first partial of a render without the pre-render step)
+    builds and saves it.
+    """
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                context = json.load(f)
+            if (context.get("version") == CONTEXT_VERSION
+                    and context.get("project_version") == __version__
+                    and context.get("db") == db_fingerprint(db_path)):
+                return context
+        except (OSError, ValueError):
+            pass
+    return build_context(db_path, path)
+
+
+if __name__ == "__main__":
+    db = sys.argv[1] if len(sys.argv) > 1 else "aerospike_health.db"
+    if not os.path.exists(db):
+        # Nothing to pre-compute; the report renders its "no data" state
+        print(f"⚠️ {db} not found. Skipping report context build.")
+        sys.exit(0)
+    build_context(db)
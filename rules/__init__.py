@@ -16,4 +16,26 @@ from . import hot_key_check
 from . import read_not_found_check
 from . import delete_not_found_check
 from . import set_object_skew_check
-from . import capacity_check
\ No newline at end of file
+from . import capacity_check
+from . import security_connection_audit
+
+# Report order. Rules are independent read-only checks: runner.RuleRunner
+# executes them concurrently and returns results in this order.
+RULESET = [
+    error_skew_check,
+    version_consistency_check,
+    network_acceleration_check,
+    storage_deadlock_check,
+    sindex_on_flash_check,
+    sprig_limit_check,
+    hwm_check,
+    memory_hwm_check,
+    config_symmetry_check,
+    config_drift_check,
+    hot_key_check,
+    read_not_found_check,
+    delete_not_found_check,
+    set_object_skew_check,
+    capacity_check,
+    security_connection_audit,
+]
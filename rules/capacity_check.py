@@ -1,47 +1,187 @@
-import sqlite3
+import numpy as np
 import pandas as pd
 
+from rules.findings import FINDING_COLUMNS, latest_snapshot, severity, summarize, threshold_findings, to_records
+from rules.forecast import breach_dates, days_until, fit_growth, forecastable
+from rules.planner import namespace_pivot
+from rules.runner import run_standalone
+
 __version__ = "1.6.0"
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("namespace_stats", "node_configs", "trend_series", "trend_points")
+NEEDS = {
+    "namespace_stats": ["%data_used_pct%", "%memory_used_pct%"],
+    "node_configs": ["namespace.*.high-water-disk-pct", "namespace.*.evict-used-pct",
+                     "namespace.*.stop-writes-used-pct", "namespace.*.high-water-memory-pct",
+                     "namespace.*.stop-writes-pct"],
+}
+
+# Projected HWM breach < 30 days (CATALOG.md); stop-writes within the horizon is critical
+HORIZON_DAYS = 30
+# Breaches further out than this are not listed
+LIST_DAYS = 365
+# Current utilization planning thresholds (%), for every series the projection does not list
+PLANNING_WARNING = 70
+PLANNING_CRITICAL = 85
+
+# usage metric suffix -> (HWM config keys, stop-writes config keys, default HWM %, default stop-writes %)
+LIMITS = {
+    "data_used_pct": (["evict-used-pct", "high-water-disk-pct"], ["stop-writes-used-pct"], 60, 90),
+    "memory_used_pct": (["high-water-memory-pct", "evict-used-pct"], ["stop-writes-pct", "stop-writes-used-pct"], 60, 90),
+}
+
+FORECAST_COLUMNS = FINDING_COLUMNS + ["growth_per_day", "days_to_hwm", "hwm_date", "stop_writes",
+                                      "days_to_stop_writes", "stop_writes_date"]
+
+
+def _limit(wide, rows, keys, default):
+    """First configured (non-zero) key for each fitted series (`rows` of `wide`, -1 if absent), else the default."""
+    found = np.full(len(rows), np.nan)
+    for key in keys:
+        if key in wide:
+            configured = pd.to_numeric(wide[key], errors="coerce").to_numpy(dtype=float)[np.maximum(rows, 0)]
+            found = np.where(np.isnan(found) & (rows >= 0) & (configured > 0), configured, found)
+    return np.where(np.isnan(found), default, found)
+
+
+def forecast(ctx):
+    """
+    Growth forecast of every node / namespace usage series with enough
+    history: fit (rules/forecast.py) + hwm / stop_writes limits and the
+    days / dates until each, nearest HWM breach first.
+    """
+    fit = forecastable(fit_growth(ctx.history("namespace_stats", NEEDS["namespace_stats"])))
+    if fit.empty:
+        return fit
+    configs = ctx.frame("node_configs", NEEDS["node_configs"]) if ctx.has_table("node_configs") else pd.DataFrame()
+    wide = namespace_pivot(configs, "value_num") if not configs.empty else pd.DataFrame()
+    # Config row of each fitted series, looked up once
+    rows = (wide.index.get_indexer(pd.MultiIndex.from_frame(fit[["node_id", "namespace"]]))
+            if not wide.empty else np.full(len(fit), -1))
+    hwm, stop = np.full(len(fit), np.nan), np.full(len(fit), np.nan)
+    for suffix, (hwm_keys, stop_keys, hwm_default, stop_default) in LIMITS.items():
+        series = fit["metric"].str.endswith(suffix).to_numpy()
+        hwm[series] = _limit(wide, rows, hwm_keys, hwm_default)[series]
+        stop[series] = _limit(wide, rows, stop_keys, stop_default)[series]
+    fit["hwm"], fit["stop_writes"] = hwm, stop
+    fit = fit[~np.isnan(hwm)].reset_index(drop=True)
+    fit["days_to_hwm"] = days_until(fit, fit["hwm"])
+    fit["days_to_stop_writes"] = days_until(fit, fit["stop_writes"])
+    fit["hwm_date"] = breach_dates(fit, fit["days_to_hwm"].to_numpy())
+    fit["stop_writes_date"] = breach_dates(fit, fit["days_to_stop_writes"].to_numpy())
+    # Nearest breach first; among namespaces already past it, the fullest first
+    return fit.sort_values(["days_to_hwm", "days_to_stop_writes", "current"], ascending=[True, True, False],
+                           kind="stable").reset_index(drop=True)
+
+
+def forecast_findings(fit):
+    """Findings table of the series reaching their HWM within LIST_DAYS, nearest breach first."""
+    near = fit[fit["days_to_hwm"] <= LIST_DAYS]
+    days_hwm = near["days_to_hwm"].to_numpy()
+    days_stop = near["days_to_stop_writes"].to_numpy()
+    return pd.DataFrame({
+        "node": near["node_id"].to_numpy(), "namespace": near["namespace"].to_numpy(),
+        "metric": near["metric"].to_numpy(), "value": near["current"].to_numpy(),
+        "threshold": near["hwm"].to_numpy(),
+        "severity": np.where(days_stop <= HORIZON_DAYS, "CRITICAL",
+                             np.where(days_hwm <= HORIZON_DAYS, "WARNING", "INFO")),
+        "growth_per_day": near["growth_per_day"].round(3).to_numpy(),
+        "days_to_hwm": np.floor(days_hwm), "hwm_date": near["hwm_date"].to_numpy(),
+        "stop_writes": near["stop_writes"].to_numpy(),
+        "days_to_stop_writes": np.where(np.isfinite(days_stop), np.floor(days_stop), None),
+        "stop_writes_date": near["stop_writes_date"].to_numpy(),
+    }, columns=FORECAST_COLUMNS)
+
+
+def _nearest(findings):
+    """'namespace 'x' on node y (58% now, +1.2%/day) reaches the 60% HWM in 4 days (2026-02-01)'."""
+    row = findings.iloc[0]
+    when = "is already past" if row["days_to_hwm"] == 0 else "reaches"
+    line = (f"namespace '{row['namespace']}' on node {row['node']} ({round(row['value'], 1):g}% now, "
+            f"{row['growth_per_day']:+g}%/day) {when} the {row['threshold']:g}% HWM")
+    return line + (f" in {row['days_to_hwm']:.0f} days ({row['hwm_date']})" if row["days_to_hwm"] else "")
+
+
+def _remediation(trigger):
+    return (
+        "**Assessment:** Monitoring peak utilization across Disk and RAM is vital for maintaining "
+        "availability. High utilization leaves little room for node failures or unexpected traffic spikes.\n\n"
+        "**Action Plan:**\n"
+        f"1. If {trigger}, begin planning for a cluster expansion.\n"
+        "2. Review the 'Namespace Usage' tables in this report to identify the primary drivers of growth."
+    )
+
+
+def check(ctx):
     check_id = "5.a"
     check_name = "Cluster Capacity Forecast"
-    
+
     try:
-        query = """
-            SELECT metric, CAST(value AS REAL) as val
-            FROM namespace_stats 
-            WHERE metric LIKE '%data_used_pct%' OR metric LIKE '%memory_used_pct%'
-        """
-        df = pd.read_sql_query(query, conn)
-        
+        # Name patterns are resolved through the metric catalog by the planner;
+        # current utilization is each series' latest snapshot
+        df = latest_snapshot(ctx.frame("namespace_stats", NEEDS["namespace_stats"]))
+        df = df[['node_id', 'namespace', 'metric', 'value']]
+
         if df.empty:
             return {"id": check_id, "name": check_name, "status": "PASS", "message": "Cluster resources are within nominal limits."}
 
-        peak_usage = df['val'].max()
-        
-        if peak_usage > 85:
-            status = "CRITICAL"
-            msg = f"Critical Resource Pressure: Cluster peak utilization is at {int(peak_usage)}%."
-        elif peak_usage > 70:
-            status = "WARNING"
-            msg = f"Expansion Planning Required: Cluster peak utilization is at {int(peak_usage)}%."
-        else:
+        peak_usage = df['value'].max()
+        planning = f"the {PLANNING_WARNING}% planning threshold"
+        # Every disk/RAM reading past the planning threshold, worst first
+        current = threshold_findings(df, PLANNING_WARNING, PLANNING_CRITICAL, strict=True)
+
+        fit = forecast(ctx)
+        if not fit.empty:
+            # Growth trends from the stored history: nearest projected breach first
+            projected = forecast_findings(fit)
+            # Series the projection does not list (not fitted: short or noisy history; or no breach
+            # within LIST_DAYS) keep the current utilization check
+            keys = ["node", "namespace", "metric"]
+            listed = pd.MultiIndex.from_frame(projected[keys])
+            current = current[~pd.MultiIndex.from_frame(current[keys]).isin(listed)]
+            flagged = pd.concat([projected[projected["severity"] != "INFO"], current[FINDING_COLUMNS]])
+            findings = pd.concat([projected, current.reindex(columns=FORECAST_COLUMNS)], ignore_index=True)
+            findings = findings.astype(object).where(findings.notna(), None)
+            result = {"id": check_id, "name": check_name, "findings": to_records(findings, FORECAST_COLUMNS),
+                      "remediation": _remediation(f"a namespace is projected to reach its HWM within {HORIZON_DAYS} days "
+                                                  f"or utilization exceeds {PLANNING_WARNING}%"),
+                      "status": severity(flagged) if not flagged.empty else "PASS"}
+            span = fit["span_days"].max()
+            near = projected[projected["severity"] != "INFO"]
+            if not near.empty:
+                message = (f"{len(near)} node/namespace series projected to reach the HWM within "
+                           f"{HORIZON_DAYS} days ({span:.0f} days of history); nearest: {_nearest(projected)}.")
+            elif not projected.empty:
+                message = (f"No HWM breach projected within {HORIZON_DAYS} days ({span:.0f} days of "
+                           f"history); nearest: {_nearest(projected)}.")
+            else:
+                message = (f"No HWM breach projected within {LIST_DAYS} days ({span:.0f} days of history); "
+                           f"peak consumption is currently {int(peak_usage)}%.")
+            if not current.empty:
+                message += f" Current utilization: {summarize(current, planning, unit='%')}"
+            result["message"] = message
+            return result
+
+        # No usable history (single snapshot, or no series with a significant trend):
+        # current utilization against the planning threshold
+        if current.empty:
             status = "PASS"
             msg = f"Resource utilization is healthy. Peak consumption is currently {int(peak_usage)}%."
+        elif severity(current) == "CRITICAL":
+            status = "CRITICAL"
+            msg = f"Critical Resource Pressure: {summarize(current, planning, unit='%')}"
+        else:
+            status = "WARNING"
+            msg = f"Expansion Planning Required: {summarize(current, planning, unit='%')}"
 
         return {
             "id": check_id, "name": check_name, "status": status, "message": msg,
-            "remediation": (
-                "**Assessment:** Monitoring peak utilization across Disk and RAM is vital for maintaining "
-                "availability. High utilization leaves little room for node failures or unexpected traffic spikes.\n\n"
-                "**Action Plan:**\n"
-                "1. If utilization exceeds 70%, begin planning for a cluster expansion.\n"
-                "2. Review the 'Namespace Usage' tables in this report to identify the primary drivers of growth."
-            )
+            "findings": to_records(current),
+            "remediation": _remediation(f"utilization exceeds {PLANNING_WARNING}%")
         }
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -1,17 +1,18 @@
-import sqlite3
 import pandas as pd
 
+from rules.runner import run_standalone
+
 __version__ = "1.6.0"
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_configs", "static_configs")
+
+def check(ctx):
+    conn = ctx.conn
     check_id = "3.b"
     check_name = "Config Drift"
     
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='static_configs'")
-        if not cursor.fetchone():
+        if not ctx.has_table('static_configs'):
             return {
                 "id": check_id, "name": check_name, "status": "⚠️ DATA MISSING",
                 "message": "The static aerospike.conf file was not found in the collectinfo bundle.",
@@ -53,5 +54,7 @@ def run_check(db_path="aerospike_health.db"):
         }
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
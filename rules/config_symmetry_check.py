@@ -1,19 +1,20 @@
-import sqlite3
 import pandas as pd
 
+from rules.runner import run_standalone
+
 __version__ = "1.6.0"
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_configs",)
+
+def check(ctx):
+    conn = ctx.conn
     check_id = "3.a"
     check_name = "Config Symmetry"
     target_table = "node_configs"
     
     try:
         # 1. Schema Safety Check
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
 
         # 2. Query variations
@@ -55,5 +56,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
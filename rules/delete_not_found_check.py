@@ -1,5 +1,4 @@
-import sqlite3
-import pandas as pd
+from rules.runner import run_standalone
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -10,26 +9,22 @@ __version__ = "1.6.0"
 # ID: 4.c
 # Title: Delete Not Found Rate
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("namespace_stats",)
+NEEDS = {"namespace_stats": ["client_delete_not_found"]}
+
+def check(ctx):
     check_id = "4.c"
     check_name = "Delete Not Found Rate"
     target_table = "namespace_stats"
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
 
         # 2. QUERY LOGIC
-        query = f"""
-            SELECT node_id, namespace, CAST(value AS REAL) as delete_not_found
-            FROM {target_table} 
-            WHERE metric = 'client_delete_not_found'
-        """
-        df = pd.read_sql_query(query, conn)
+        df = ctx.frame(target_table, NEEDS[target_table])
+        df = df[['node_id', 'namespace', 'value']].rename(columns={'value': 'delete_not_found'})
         
         if df.empty or df['delete_not_found'].sum() == 0:
             return {"id": check_id, "name": check_name, "status": "PASS", "message": "No unnecessary delete attempts detected.", "remediation": "None"}
@@ -65,5 +60,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
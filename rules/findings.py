@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: findings
+# Purpose: Structured findings for threshold rules. Instead of reporting only
+#          the worst row, a rule returns every breach as a findings table
+#          (node, namespace, metric, value, threshold, severity) built with
+#          one vectorized comparison, plus a one-line summary. The table is
+#          stored in the rule result under "findings" (list of records) and
+#          paged by the report. Bundles holding several snapshots are
+#          reduced to each series' latest reading first, so a node/namespace
+#          breaching in every snapshot is one finding, not one per snapshot.
+
+FINDING_COLUMNS = ["node", "namespace", "metric", "value", "threshold", "severity"]
+
+
+def findings_frame(node, namespace, metric, value, threshold, severity="WARNING"):
+    """Findings table from already-selected offenders (rules with non-threshold logic)."""
+    findings = pd.DataFrame({"node": node, "namespace": namespace, "metric": metric,
+                             "value": value, "threshold": threshold, "severity": severity})
+    return findings.reindex(columns=FINDING_COLUMNS).reset_index(drop=True)
+
+
+def latest_snapshot(df, keys=("node_id", "namespace", "metric")):
+    """
+    One row per series (the `keys` present in `df`): the one with the latest
+    snapshot_ts, the first such row when it repeats within a snapshot. Rows
+    keep their order. Frames without snapshot_ts (older ingests) are returned
+    as is.
+    """
+    if df.empty or "snapshot_ts" not in df:
+        return df
+    stamps = pd.to_datetime(df["snapshot_ts"], errors="coerce").fillna(pd.Timestamp.min)
+    # Latest first, stable: the first row of the latest snapshot leads each series
+    order = np.argsort(-stamps.to_numpy(dtype="datetime64[ns]").astype("int64"), kind="stable")
+    keep = ~df.iloc[order].duplicated([k for k in keys if k in df], keep="first").to_numpy()
+    return df.iloc[np.sort(order[keep])].reset_index(drop=True)
+
+
+def threshold_findings(df, warning, critical=None, value_col="value", strict=False):
+    """
+    Every series of `df` (node_id, [namespace], metric, value_col, [snapshot_ts])
+    at or above `warning` (above, when strict) at its latest snapshot, worst
+    first. Rows that also reach `critical` carry that threshold and a
+    CRITICAL severity.
+    """
+    df = latest_snapshot(df)
+    values = pd.to_numeric(df[value_col], errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        hit = values > warning if strict else values >= warning
+        crit = np.zeros_like(hit) if critical is None else (values > critical if strict else values >= critical)
+    crit = crit[hit]
+
+    def column(name):
+        return df[name].to_numpy()[hit] if name in df else np.full(hit.sum(), None, dtype=object)
+
+    findings = pd.DataFrame({
+        "node": column("node_id"),
+        "namespace": column("namespace"),
+        "metric": column("metric"),
+        "value": values[hit],
+        "threshold": np.where(crit, critical if critical is not None else warning, warning),
+        "severity": np.where(crit, "CRITICAL", "WARNING"),
+    }, columns=FINDING_COLUMNS)
+    # Only the breaches are sorted, not the whole frame
+    order = np.argsort(-findings["value"].to_numpy(), kind="stable")
+    return findings.iloc[order].reset_index(drop=True)
+
+
+def severity(findings):
+    """Rule status for a non-empty findings table."""
+    return "CRITICAL" if (findings["severity"] == "CRITICAL").any() else "WARNING"
+
+
+def summarize(findings, what, unit=""):
+    """
+    One line for the rule message, e.g. "14 breach(es) of disk capacity on
+    9 node(s) across 3 namespace(s) (2 critical); worst: ..."
+    """
+    worst = findings.iloc[0]
+    line = f"{len(findings)} breach(es) of {what} on {findings['node'].nunique()} node(s)"
+    if findings["namespace"].notna().any():
+        line += f" across {findings['namespace'].nunique()} namespace(s)"
+    critical = int((findings["severity"] == "CRITICAL").sum())
+    if critical:
+        line += f" ({critical} critical)"
+    where = f"namespace '{worst['namespace']}' on node {worst['node']}" if pd.notna(worst["namespace"]) else f"node {worst['node']}"
+    return f"{line}; worst: {where} at {worst['value']:g}{unit}."
+
+
+def to_records(findings, names=FINDING_COLUMNS):
+    """
+    JSON-ready rows for the rule result (and so the result store and report
+    context). Rules with extra columns (e.g. forecasts) pass their own names.
+    """
+    # Column-wise tolist() + zip is several times faster than to_dict("records") on large tables
+    columns = [findings[name].tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*columns)]
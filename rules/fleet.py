@@ -0,0 +1,245 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from ingest.registry import RUN_ORDER
+from ingest.trends import TREND_TABLES
+from rules.planner import SharedScan
+from rules.runner import DEFAULT_WORKERS, RuleContext
+from rules.store import ResultStore, rule_key
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: fleet
+# Purpose: Runs the ruleset across every (bundle, cluster) partition of a
+#          fleet store (ingest/fleet.py) in one pass. The planned reads
+#          (NEEDS) happen once for the whole fleet and are split per
+#          partition; rules that query SQL directly see, on their partition
+#          connection, TEMP views that shadow each run_id-keyed table with
+#          the partition filter, so every rule runs unchanged.
+#          Results are stored per partition in rule_results
+#          (run_id = '<bundle run_id>/<cluster>'). A store holding several
+#          bundles (append mode) is evaluated by RuleRunner on one run,
+#          the latest snapshot by default (resolve_run).
+
+# Fleet bookkeeping tables: never shadowed by partition views
+_UNPARTITIONED = {"table_versions", "rule_results", "bundles", "bundle_metadata", "cluster_nodes", *TREND_TABLES}
+
+
+def _quote(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def partition_key(run_id, cluster):
+    return f"{run_id}/{cluster}"
+
+
+def store_runs(db_path):
+    """
+    run_ids registered in the `bundles` table, oldest snapshot first and in
+    ingest order within one snapshot timestamp ([] for older databases).
+    """
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        return [r[0] for r in conn.execute(f"SELECT run_id FROM bundles ORDER BY {RUN_ORDER}")]
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def resolve_run(db_path, run_id=None):
+    """
+    The run a single-run evaluation should see: `run_id` if given, the latest
+    snapshot when the store holds several bundles, else None (whole database).
+    Of two bundles with the same snapshot timestamp, the last one ingested.
+    """
+    if run_id:
+        return run_id
+    runs = store_runs(db_path)
+    return runs[-1] if len(runs) > 1 else None
+
+
+def partitioned_tables(conn):
+    """run_id-keyed tables / views -> whether rows also carry node_id."""
+    found = {}
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"):
+        if name in _UNPARTITIONED or name.startswith(("dim_", "fact_", "sqlite_", "metric_catalog")):
+            continue
+        columns = {r[1] for r in conn.execute(f"PRAGMA table_info({name})")}
+        if "run_id" in columns:
+            found[name] = "node_id" in columns
+    return found
+
+
+class PartitionContext(RuleContext):
+    """
+    RuleContext restricted to one (bundle run_id, cluster) partition of a
+    fleet store; cluster=None keeps every cluster of the run.
+    """
+
+    def __init__(self, db_path, run_id, cluster, scan, tables, partitioned):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.cluster = cluster
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.scan = scan
+        self.tables = tables
+        self._partitioned = partitioned  # name -> filter by cluster nodes too
+
+    @classmethod
+    def for_run(cls, db_path, run_id, cluster=None):
+        """Context over one run (and cluster) of a store, reading through its own shared scan."""
+        with RuleContext(db_path) as base:
+            tables, partitioned = base.tables, partitioned_tables(base.conn)
+        return cls(db_path, run_id, cluster, SharedScan(), tables, partitioned)
+
+    def _open(self):
+        # mode=ro still protects the store; TEMP views live in the connection's temp schema
+        conn = super()._open()
+        run_id, cluster = _quote(self.run_id), _quote(self.cluster)
+        nodes = f"SELECT node_id FROM main.cluster_nodes WHERE run_id = {run_id} AND cluster_name = {cluster}"
+        for name, by_node in self._partitioned.items():
+            where = f"run_id = {run_id}" + (f" AND node_id IN ({nodes})" if by_node and self.cluster is not None else "")
+            conn.execute(f"CREATE TEMP VIEW {name} AS SELECT * FROM main.{name} WHERE {where}")
+        if "bundle_metadata" in self.tables:
+            conn.execute("CREATE TEMP VIEW cluster_metadata AS "
+                         f"SELECT key, value FROM main.bundle_metadata WHERE run_id = {run_id}")
+        return conn
+
+
+class FleetRunner:
+    """
+    Runs rule modules over every partition of a fleet store:
+
+        runner = FleetRunner("fleet_health.db")
+        for part in runner.run():   # [{"run_id", "cluster", "bundle", "results"}]
+            ...
+    """
+
+    def __init__(self, db_path="fleet_health.db", rules=None, workers=DEFAULT_WORKERS, use_store=True):
+        if rules is None:
+            from rules import RULESET
+            rules = RULESET
+        self.db_path = db_path
+        self.rules = list(rules)
+        self.workers = workers
+        self.use_store = use_store
+        self.timings = {}   # module name -> seconds, summed over partitions
+        self.cached = 0
+        self.reads = {}
+        self.seconds = 0.0
+
+    def partitions(self, conn):
+        """[(run_id, cluster, bundle)] in bundle / cluster order."""
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "cluster_nodes" not in tables:
+            raise ValueError(f"{self.db_path} has no cluster_nodes table; re-ingest it to run in fleet mode.")
+        bundle = "b.bundle" if "bundles" in tables else "NULL"
+        join = "LEFT JOIN bundles b ON b.run_id = c.run_id" if "bundles" in tables else ""
+        return conn.execute(f"SELECT DISTINCT c.run_id, c.cluster_name, {bundle} FROM cluster_nodes c {join} "
+                            "ORDER BY 3, 1, 2").fetchall()
+
+    def _split(self, conn, scan, parts):
+        """Fused fleet frames cut into {partition key: {table: frame}} in one groupby per table."""
+        nodes = pd.read_sql_query("SELECT DISTINCT run_id, node_id, cluster_name FROM cluster_nodes", conn)
+        split = {partition_key(run_id, cluster): {} for run_id, cluster, _ in parts}
+        for table, fused in scan.frames.items():
+            keyed = fused[["run_id", "node_id"]].merge(nodes, on=["run_id", "node_id"], how="left")
+            groups = keyed.groupby(["run_id", "cluster_name"], sort=False).indices
+            for key in split:
+                split[key][table] = fused.iloc[[]]
+            for (run_id, cluster), positions in groups.items():
+                key = partition_key(run_id, cluster)
+                if key in split:
+                    split[key][table] = fused.iloc[positions].reset_index(drop=True)
+        return split
+
+    def _run_one(self, ctx, rule):
+        """(result, seconds) of one rule on one partition."""
+        name = rule_key(rule)
+        start = time.perf_counter()
+        try:
+            result = rule.check(ctx)
+        except Exception as e:
+            # Rules trap their own errors; this only catches a rule that crashed outright
+            result = {"id": "??", "name": name, "status": "CRITICAL", "message": f"Rule crashed: {str(e)}"}
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        return result, seconds
+
+    def run(self):
+        start = time.perf_counter()
+        self._lock = threading.Lock()
+        store = ResultStore(self.db_path) if self.use_store else None
+        try:
+            with RuleContext(self.db_path) as base:
+                parts = self.partitions(base.conn)
+                results, pending = {}, []
+                for run_id, cluster, _ in parts:
+                    key = partition_key(run_id, cluster)
+                    for rule in self.rules:
+                        stored = store.lookup(rule, key) if store else None
+                        if stored is not None:
+                            results[(key, rule_key(rule))] = stored
+                        else:
+                            pending.append((run_id, cluster, rule))
+                self.cached = len(results)
+
+                computed = []
+                if pending:
+                    # One fused read per table for the whole fleet, then one split
+                    base.scan.add_rules({rule for _, _, rule in pending})
+                    base.scan.prefetch(base.conn, base.tables)
+                    self.reads = dict(base.scan.reads)
+                    split = self._split(base.conn, base.scan, parts)
+                    partitioned = partitioned_tables(base.conn)
+                    contexts = {partition_key(run_id, cluster): PartitionContext(
+                                    self.db_path, run_id, cluster, base.scan.partition(split[partition_key(run_id, cluster)]),
+                                    base.tables, partitioned)
+                                for run_id, cluster, _ in parts}
+                    try:
+                        def _run(item):
+                            run_id, cluster, rule = item
+                            return self._run_one(contexts[partition_key(run_id, cluster)], rule)
+                        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                            computed = list(pool.map(_run, pending))
+                    finally:
+                        for ctx in contexts.values():
+                            ctx.close()
+            # Written after the read-only connections are closed
+            by_partition = {}
+            for (run_id, cluster, rule), (result, seconds) in zip(pending, computed):
+                key = partition_key(run_id, cluster)
+                results[(key, rule_key(rule))] = result
+                by_partition.setdefault(key, []).append((rule, result, seconds))
+            if store:
+                for key, rows in by_partition.items():
+                    store.save(rows, run_id=key)
+        finally:
+            if store:
+                store.close()
+        self.partition_count = len(parts)
+        self.seconds = time.perf_counter() - start
+        return [{"run_id": run_id, "cluster": cluster, "bundle": bundle,
+                 "results": [results[(partition_key(run_id, cluster), rule_key(rule))] for rule in self.rules]}
+                for run_id, cluster, bundle in parts]
+
+    def report(self):
+        slowest = sorted(self.timings.items(), key=lambda kv: kv[1], reverse=True)[:3]
+        top = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest) or "none computed"
+        reads = ", ".join(f"{table} {rows:,}" for table, rows in self.reads.items()) or "none"
+        return (f"{len(self.rules)} rules x {self.partition_count} partitions in {self.seconds:.2f}s on "
+                f"{self.workers} workers, {self.cached} from the result store "
+                f"(slowest: {top}; shared reads: {reads})")
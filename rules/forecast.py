@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: forecast
+# Purpose: Capacity forecasting. Every (node, namespace, metric) series of
+#          the stored history (trend store, see rules/trends.py) gets a
+#          least-squares growth line, fitted for all series at once: the
+#          per-series sums are np.bincount passes over the series codes,
+#          on times centred per series so day-scale slopes stay exact.
+#          Only fits that explain the series (r2) with a significant slope
+#          (t statistic) are extrapolated. Days to a limit = (limit - current
+#          reading) / growth per day; a series whose reading is at the limit
+#          is 0 days away, one that is not growing never gets there (inf).
+
+SERIES_KEYS = ["node_id", "namespace", "metric"]
+FIT_COLUMNS = ["samples", "span_days", "last_ts", "current", "level", "growth_per_day", "r2", "t_stat"]
+
+MIN_SAMPLES = 3
+MIN_SPAN_DAYS = 1.0  # a few hourly snapshots are noise, not a trend
+MIN_R2 = 0.5  # the line explains at least half of the variance
+MIN_T_STAT = 2.0  # slope about two standard errors away from flat (~95%)
+
+SECONDS_PER_DAY = 86400.0
+
+
+def fit_growth(history, keys=SERIES_KEYS, value_col="value", time_col="snapshot_ts"):
+    """
+    One linear fit per series of `history` (keys + time_col + value_col):
+    keys + FIT_COLUMNS. `current` is the last observed value, `level` the
+    fitted value at the last snapshot, growth_per_day the slope and t_stat
+    the slope over its standard error (inf for an exact fit).
+    """
+    if history.empty:
+        return pd.DataFrame(columns=keys + FIT_COLUMNS)
+    stamps = pd.to_datetime(history[time_col], errors="coerce")
+    t = stamps.to_numpy(dtype="datetime64[ns]").astype("int64") / 1e9 / SECONDS_PER_DAY
+    y = pd.to_numeric(history[value_col], errors="coerce").to_numpy(dtype=float)
+    valid = stamps.notna().to_numpy() & ~np.isnan(y)
+    frame = history.loc[valid, keys].reset_index(drop=True)
+    t, y = t[valid], y[valid]
+    if not len(frame):
+        return pd.DataFrame(columns=keys + FIT_COLUMNS)
+
+    codes, uniques = pd.MultiIndex.from_frame(frame).factorize()
+    count = len(uniques)
+    n = np.bincount(codes, minlength=count).astype(float)
+    t_mean = np.bincount(codes, t, count) / n
+    y_mean = np.bincount(codes, y, count) / n
+    dt, dy = t - t_mean[codes], y - y_mean[codes]
+    sxx = np.bincount(codes, dt * dt, count)
+    sxy = np.bincount(codes, dt * dy, count)
+    syy = np.bincount(codes, dy * dy, count)
+
+    # First / last snapshot of each series: one sort by (series, time); codes
+    # run 0..count-1, so the run boundaries come out in code order
+    order = np.lexsort((t, codes))
+    boundary = codes[order][1:] != codes[order][:-1]
+    first, last = order[np.r_[True, boundary]], order[np.r_[boundary, True]]
+    t_first, t_last, current = t[first], t[last], y[last]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        r2 = np.where((sxx > 0) & (syy > 0), sxy * sxy / (sxx * syy), np.nan)
+        # Residual variance over n - 2 degrees of freedom -> standard error of the slope
+        residual = np.maximum(syy - slope * sxy, 0.0) / (n - 2)
+        t_stat = np.where((sxx > 0) & (n > 2), np.abs(slope) / np.sqrt(residual / sxx), np.nan)
+    fit = uniques.to_frame(index=False, name=keys)
+    fit["samples"] = n.astype(int)
+    fit["span_days"] = t_last - t_first
+    fit["last_ts"] = pd.to_datetime(t_last * SECONDS_PER_DAY, unit="s")
+    fit["current"] = current
+    fit["level"] = y_mean + slope * (t_last - t_mean)
+    fit["growth_per_day"] = slope
+    fit["r2"] = r2
+    fit["t_stat"] = t_stat
+    return fit
+
+
+def forecastable(fit, min_samples=MIN_SAMPLES, min_span_days=MIN_SPAN_DAYS, min_r2=MIN_R2, min_t_stat=MIN_T_STAT):
+    """
+    Series with enough history to extrapolate, whose line fits (r2) and
+    whose slope is significant (t_stat). A flat series (r2 NaN) is kept:
+    it is not growing, so it never reaches a limit.
+    """
+    keep = (fit["samples"] >= min_samples) & (fit["span_days"] >= min_span_days) & fit["growth_per_day"].notna()
+    flat = fit["growth_per_day"] == 0
+    keep &= flat | ((fit["r2"] >= min_r2) & (fit["t_stat"] >= min_t_stat))
+    return fit[keep].reset_index(drop=True)
+
+
+def days_until(fit, limits):
+    """
+    Days from each series' last snapshot until it reaches `limits` (array
+    aligned with `fit`): 0 when the current reading is already there, inf
+    when not growing; otherwise projected from the current reading.
+    """
+    limits = np.asarray(limits, dtype=float)
+    current = fit["current"].to_numpy(dtype=float)
+    growth = fit["growth_per_day"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        days = np.where(growth > 0, (limits - current) / growth, np.inf)
+    return np.where(current >= limits, 0.0, days)
+
+
+def breach_dates(fit, days):
+    """'YYYY-MM-DD' of last snapshot + days (None when never)."""
+    finite = np.isfinite(days)
+    dates = fit["last_ts"] + pd.to_timedelta(np.where(finite, days, 0), unit="D")
+    return np.where(finite, dates.dt.strftime("%Y-%m-%d"), None)
@@ -0,0 +1,95 @@
+from ingest import INGESTORS
+from ingest.dimensions import FactTable
+from ingest.trends import TREND_METRICS, TREND_TABLES
+from rules import RULESET
+from rules.store import rule_key
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: graph
+# Purpose: Dependency graph ingestor -> table -> rule. Ingestors declare the
+#          tables they write (TABLES); rules declare the tables they read
+#          (READS) and, where they go through the planner, the metric
+#          families of each table (NEEDS). Re-ingesting one slice (e.g.
+#          `run_ingest.py <bundle> --only SetStatsIngestor`) re-stamps only
+#          that slice's tables, so exactly the downstream rules below are
+#          invalidated in the result store and re-run. The trend store is
+#          derived from the TREND_METRICS tables after each load, so its
+#          tables count as written by the ingestors of those tables.
+
+# Whole-table reads (SQL aggregates / fixed queries) have no planned families
+WHOLE_TABLE = "*"
+
+
+class DependencyGraph:
+    """Edges between ingestors, the tables they write and the rules reading them."""
+
+    def __init__(self, ingestors=None, rules=None):
+        self.ingestors = list(INGESTORS if ingestors is None else ingestors)
+        self.rules = list(RULESET if rules is None else rules)
+        self.writers = {}   # table -> [ingestor]
+        self.readers = {}   # table -> [rule]
+        for ingestor in self.ingestors:
+            for table, spec in ingestor.TABLES.items():
+                # FactTables are read through their compatibility view (spec.name)
+                name = spec.name if isinstance(spec, FactTable) else table
+                self.writers.setdefault(name, []).append(ingestor)
+        sources = [w for table in TREND_METRICS for w in self.writers.get(table, [])]
+        for table in TREND_TABLES:
+            self.writers[table] = list(dict.fromkeys(sources))
+        for rule in self.rules:
+            for table in getattr(rule, "READS", ()):
+                self.readers.setdefault(table, []).append(rule)
+
+    def families(self, rule, table):
+        """Metric / config name patterns `rule` reads from `table`."""
+        return list(getattr(rule, "NEEDS", {}).get(table, [WHOLE_TABLE]))
+
+    def tables_of(self, ingestors):
+        return sorted({table for table, writers in self.writers.items()
+                       if any(w in writers for w in ingestors)})
+
+    def downstream(self, ingestors):
+        """Rules reading any table written by `ingestors`, in RULESET order."""
+        tables = set(self.tables_of(ingestors))
+        return [rule for rule in self.rules if tables & set(getattr(rule, "READS", ()))]
+
+    def upstream(self, rule):
+        """Ingestors writing the tables `rule` reads."""
+        found = []
+        for table in getattr(rule, "READS", ()):
+            for ingestor in self.writers.get(table, []):
+                if ingestor not in found:
+                    found.append(ingestor)
+        return found
+
+    def unresolved(self):
+        """
+        Problems a contributor should see: rules without READS (never cached,
+        not in the graph) and read tables no ingestor produces.
+        Returns (rule_names, {table: [rule_names]}).
+        """
+        undeclared = [rule_key(r) for r in self.rules if getattr(r, "READS", None) is None]
+        orphans = {table: [rule_key(r) for r in rules]
+                   for table, rules in self.readers.items() if table not in self.writers}
+        return undeclared, orphans
+
+    def describe(self):
+        """Text rendering, one ingestor per block."""
+        lines = []
+        for ingestor in self.ingestors:
+            lines.append(f"{type(ingestor).__name__}")
+            for table in self.tables_of([ingestor]):
+                rules = self.readers.get(table, [])
+                reads = ", ".join(f"{rule_key(r)} [{', '.join(self.families(r, table))}]" for r in rules)
+                lines.append(f"  {table} -> {reads or '(no rules)'}")
+        undeclared, orphans = self.unresolved()
+        for table, rules in orphans.items():
+            lines.append(f"(no ingestor) {table} -> {', '.join(rules)}")
+        if undeclared:
+            lines.append(f"(no READS) {', '.join(undeclared)}")
+        return "\n".join(lines)
@@ -1,5 +1,6 @@
-import sqlite3
-import pandas as pd
+from rules.findings import severity, summarize, threshold_findings, to_records
+from rules.rates import latest, rate_needs
+from rules.runner import run_standalone
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -10,49 +11,80 @@ __version__ = "1.6.0"
 # ID: 4.a
 # Title: Hot Key Detection
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("namespace_stats", "node_stats")
+# fail_key_busy is cumulative: the rule reads its per-second rate (rules/rates.py)
+COUNTER = "service.fail_key_busy"
+NEEDS = rate_needs("namespace_stats", [COUNTER])
+
+# CATALOG.md: fail_key_busy > 100/sec
+RATE_THRESHOLD = 100
+
+REMEDIATION = (
+    "**Assessment:** 'Key Busy' errors occur when multiple concurrent transactions attempt to "
+    "access the same record, exceeding the internal lock wait timeout. This almost always indicates "
+    "a 'Hot Key' (high-contention record) in the application data model.\n\n"
+    "**Action Plan:**\n"
+    "1. Use `asadm -e 'show statistics namespace'` and search for the `fail_key_busy` metric to "
+    "identify the specific Namespace and Node experiencing the highest contention.\n"
+    "2. Evaluate application-level caching or data sharding to distribute access more evenly across different keys.\n"
+    "3. Check for long-running transactions (UDFs, large batch writes, or complex Read-Modify-Write cycles) "
+    "that may be holding record locks for extended periods."
+)
+
+def check(ctx):
     check_id = "4.a"
     check_name = "Hot Key Detection"
+    target_table = "namespace_stats"
     
     try:
-        # Query for contention errors (fail_key_busy)
-        query = """
-            SELECT node_id, namespace, CAST(value AS REAL) as busy_errors
-            FROM namespace_stats 
-            WHERE metric LIKE '%fail_key_busy%'
-        """
-        df = pd.read_sql_query(query, conn)
-        
-        total_errors = df['busy_errors'].sum() if not df.empty else 0
-
-        if total_errors > 0:
+        if not ctx.has_table(target_table):
+            return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
+
+        # Rate of contention errors over the last snapshot interval (lifetime average for one snapshot)
+        rates = latest(ctx.rates(target_table, [COUNTER]), target_table)
+        rates = rates[rates['rate'].notna()]
+
+        if rates.empty:
+            # No snapshot timing / uptime to derive a rate from: fall back to the raw counter
+            df = ctx.frame(target_table, [COUNTER])
+            total_errors = df['value'].sum() if not df.empty else 0
+            if total_errors > 0:
+                return {
+                    "id": check_id, "name": check_name, "status": "WARNING",
+                    "message": f"Detected {int(total_errors):,} 'Key Busy' errors in the cluster telemetry (no rate available).",
+                    "remediation": REMEDIATION,
+                }
             return {
-                "id": check_id, 
-                "name": check_name, 
-                "status": "WARNING",
-                "message": f"Detected {int(total_errors):,} 'Key Busy' errors in the cluster telemetry.",
-                "remediation": (
-                    "**Assessment:** 'Key Busy' errors occur when multiple concurrent transactions attempt to "
-                    "access the same record, exceeding the internal lock wait timeout. This almost always indicates "
-                    "a 'Hot Key' (high-contention record) in the application data model.\n\n"
-                    "**Action Plan:**\n"
-                    "1. Use `asadm -e 'show statistics namespace'` and search for the `fail_key_busy` metric to "
-                    "identify the specific Namespace and Node experiencing the highest contention.\n"
-                    "2. Evaluate application-level caching or data sharding to distribute access more evenly across different keys.\n"
-                    "3. Check for long-running transactions (UDFs, large batch writes, or complex Read-Modify-Write cycles) "
-                    "that may be holding record locks for extended periods."
-                )
+                "id": check_id, "name": check_name, "status": "PASS",
+                "message": "No 'key busy' or transaction contention errors detected in this snapshot.",
+                "remediation": "None"
             }
 
+        span = "since node start" if (rates['basis'] == "lifetime").all() else "over the last snapshot interval"
+        findings = threshold_findings(rates, RATE_THRESHOLD, value_col="rate", strict=True)
+        if not findings.empty:
+            findings["value"] = findings["value"].round(1)
+            return {
+                "id": check_id,
+                "name": check_name,
+                "status": severity(findings),
+                "message": summarize(findings, f"{RATE_THRESHOLD}/sec key-busy errors ({span})", unit="/sec"),
+                "findings": to_records(findings),
+                "remediation": REMEDIATION,
+            }
+
+        peak = rates.loc[rates['rate'].idxmax()]
         return {
             "id": check_id, 
             "name": check_name, 
             "status": "PASS",
-            "message": "No 'key busy' or transaction contention errors detected in this snapshot.",
+            "message": (f"Key contention is below {RATE_THRESHOLD}/sec on every node: peak {peak['rate']:.2f}/sec in "
+                        f"namespace '{peak['namespace']}' on node {peak['node_id']} ({span})."),
             "remediation": "None"
         }
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Diagnostic Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -1,5 +1,5 @@
-import sqlite3
-import pandas as pd
+from rules.findings import latest_snapshot, severity, summarize, threshold_findings, to_records
+from rules.runner import run_standalone
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -10,27 +10,23 @@ __version__ = "1.6.0"
 # ID: 2.e
 # Title: Memory HWM Check
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("namespace_stats",)
+NEEDS = {"namespace_stats": ["service.memory_used_pct"]}
+
+def check(ctx):
     check_id = "2.e"
     check_name = "Memory HWM Check"
     target_table = "namespace_stats"
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
 
         # 2. QUERY LOGIC
-        # We look for the maximum memory usage percentage recorded for each namespace/node
-        query = f"""
-            SELECT node_id, namespace, CAST(value AS REAL) as used_pct 
-            FROM {target_table} 
-            WHERE metric = 'service.memory_used_pct'
-        """
-        df = pd.read_sql_query(query, conn)
+        # We look for the memory usage percentage of each namespace/node at its latest snapshot
+        df = latest_snapshot(ctx.frame(target_table, NEEDS[target_table]))
+        df = df[['node_id', 'namespace', 'metric', 'value']]
         
         if df.empty:
             return {
@@ -44,18 +40,17 @@ def run_check(db_path="aerospike_health.db"):
         warning_threshold = 60
         critical_threshold = 80
         
-        peak_usage = df['used_pct'].max()
-        over_threshold = df[df['used_pct'] >= warning_threshold]
+        peak_usage = df['value'].max()
+        # Every node/namespace breach, not just the worst one
+        findings = threshold_findings(df, warning_threshold, critical_threshold)
 
-        if not over_threshold.empty:
-            worst_case = over_threshold.sort_values(by='used_pct', ascending=False).iloc[0]
-            status = "CRITICAL" if worst_case['used_pct'] >= critical_threshold else "WARNING"
-            
+        if not findings.empty:
             return {
                 "id": check_id,
                 "name": check_name,
-                "status": status,
-                "message": f"Namespace '{worst_case['namespace']}' is at {int(worst_case['used_pct'])}% memory capacity on node {worst_case['node_id']}.",
+                "status": severity(findings),
+                "message": summarize(findings, f"the {warning_threshold}% memory threshold", unit="%"),
+                "findings": to_records(findings),
                 "remediation": (
                     f"**Why this matters:** Memory exhaustion is a critical risk. Once `high-water-memory-pct` is reached, "
                     "Aerospike begins evicting data. If memory hits `stop-writes-sys-memory-pct` or `stop-writes-pct`, "
@@ -79,5 +74,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -1,18 +1,19 @@
-import sqlite3
 import pandas as pd
 
+from rules.runner import run_standalone
+
 __version__ = "1.6.0"
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("sys_stats", "cluster_metadata")
+
+def check(ctx):
+    conn = ctx.conn
     check_id = "1.b"
     check_name = "Network Acceleration Check"
     target_table = "sys_stats"
     
     try:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {
                 "id": check_id, "name": check_name, "status": "WARNING",
                 "message": "System telemetry (sys_stats) is missing from the bundle.",
@@ -29,8 +30,8 @@ def run_check(db_path="aerospike_health.db"):
         query = f"SELECT node_id, value FROM {target_table} WHERE metric = 'network_driver'"
         df = pd.read_sql_query(query, conn)
         
-        cursor.execute("SELECT value FROM cluster_metadata WHERE key = 'cloud_platform'")
-        platform = (cursor.fetchone() or ["Unknown"])[0]
+        row = conn.execute("SELECT value FROM cluster_metadata WHERE key = 'cloud_platform'").fetchone()
+        platform = (row or ["Unknown"])[0]
 
         if "AWS" in platform.upper():
             if df.empty or not df['value'].str.contains('ena|vfio-pci').any():
@@ -54,5 +55,7 @@ def run_check(db_path="aerospike_health.db"):
         }
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingest.catalog import NAME_COLUMNS, pattern_operator, resolve_metrics
+from rules.findings import latest_snapshot
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: planner
+# Purpose: Shared-scan planner. Rules declare the metric / config names they
+#          need per table (NEEDS); the planner takes the union over the
+#          ruleset, reads each table once with an indexed `name IN (...)`
+#          lookup and hands every rule its own pre-filtered frame.
+#          Patterns follow ingest.catalog: '%' = LIKE, '*' / '?' = GLOB,
+#          otherwise an exact name. Aggregates over a whole table (e.g.
+#          config_symmetry_check) stay in SQL and are not planned here.
+
+
+class SharedScan:
+    """One fused read per table, shared by every rule of a run."""
+
+    def __init__(self):
+        self.needs = {}     # table -> set of patterns
+        self.frames = {}    # table -> fused DataFrame
+        self.reads = {}     # table -> rows in its fused read
+        self._names = {}    # (table, patterns) -> resolved names
+        self._lock = threading.Lock()
+
+    def add_rules(self, rules):
+        for rule in rules:
+            for table, patterns in getattr(rule, "NEEDS", {}).items():
+                self.needs.setdefault(table, set()).update(patterns)
+
+    def _resolve(self, conn, table, patterns):
+        key = (table, tuple(sorted(patterns)))
+        names = self._names.get(key)
+        if names is None:
+            # Exact names need no lookup; only wildcard patterns go through the catalog
+            wildcards = [p for p in patterns if pattern_operator(p) != "="]
+            names = set(p for p in patterns if pattern_operator(p) == "=")
+            if wildcards:
+                names.update(resolve_metrics(conn, table, wildcards))
+            self._names[key] = names
+        return names
+
+    def _load(self, conn, table):
+        patterns = self.needs.get(table, set())
+        names = sorted(self._resolve(conn, table, patterns)) if patterns else []
+        placeholders = ','.join(['?'] * len(names))
+        df = pd.read_sql_query(f"SELECT * FROM {table} WHERE {NAME_COLUMNS[table]} IN ({placeholders})",
+                               conn, params=names)
+        self.reads[table] = len(df)
+        return df
+
+    def prefetch(self, conn, tables):
+        """Loads the fused frame of every planned table that exists."""
+        for table in self.needs:
+            if table in tables:
+                self.frame(conn, table, self.needs[table])
+
+    def frame(self, conn, table, patterns):
+        """Rows of `table` whose name matches `patterns`, from the fused read."""
+        patterns = set(patterns)
+        with self._lock:
+            # A rule outside the plan (e.g. run standalone) widens it before the pass
+            if not patterns <= self.needs.get(table, set()):
+                self.needs.setdefault(table, set()).update(patterns)
+                self.frames.pop(table, None)
+            fused = self.frames.get(table)
+            if fused is None:
+                fused = self.frames[table] = self._load(conn, table)
+            names = self._resolve(conn, table, patterns)
+        subset = fused[fused[NAME_COLUMNS[table]].isin(names)]
+        return subset.reset_index(drop=True).infer_objects()
+
+    def partition(self, frames):
+        """
+        A scan over pre-split fused frames (one fleet partition, see
+        rules/fleet.py) sharing this plan and its resolved names.
+        """
+        part = SharedScan()
+        part.needs = {table: set(patterns) for table, patterns in self.needs.items()}
+        part._names = self._names
+        part.frames = dict(frames)
+        part.reads = {table: len(df) for table, df in frames.items()}
+        return part
+
+
+def namespace_pivot(df, value_col="value"):
+    """
+    Pivots namespace config rows ('namespace.<ns>[.<context>].<key>') into one
+    row per (node_id, namespace) and one column per config key, so rules can
+    evaluate every node/namespace pair with whole-column comparisons.
+    Bundles holding several snapshots are read at each node's latest one
+    (when df carries snapshot_ts); the first row wins when a (node,
+    namespace, key) still repeats.
+    """
+    df = latest_snapshot(df, ("node_id", "config_name"))
+    # Strings are hashed once; each distinct config name is parsed once
+    name_codes, names = pd.factorize(df['config_name'])
+    node_codes, nodes = pd.factorize(df['node_id'])
+    ns_codes, namespaces = pd.factorize(np.array([name.split('.')[1] for name in names], dtype=object))
+    key_codes, keys = pd.factorize(np.array([name.rsplit('.', 1)[-1] for name in names], dtype=object))
+    ns_codes, key_codes = ns_codes[name_codes], key_codes[name_codes]
+
+    pairs, row = np.unique(node_codes * len(namespaces) + ns_codes, return_inverse=True)
+    values = df[value_col].to_numpy()
+    grid = np.full((len(pairs), len(keys)), np.nan, dtype=values.dtype if values.dtype.kind == 'f' else object)
+    # NumPy does not order repeated fancy-index writes, so pick each cell's first occurrence explicitly
+    _, first = np.unique(row * len(keys) + key_codes, return_index=True)
+    grid[row[first], key_codes[first]] = values[first]
+
+    index = pd.MultiIndex.from_arrays([nodes[pairs // len(namespaces)], namespaces[pairs % len(namespaces)]],
+                                      names=['node_id', 'namespace'])
+    return pd.DataFrame(grid, index=index, columns=list(keys))
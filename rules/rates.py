@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from rules.skew import SOURCES
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: rates
+# Purpose: Counter-to-rate engine. Aerospike counters (fail_key_busy,
+#          client_read_not_found, client_proxy_error, ...) are cumulative
+#          since the node started; thresholds are per second. Rows carry the
+#          telemetry timestamp of their snapshot (snapshot_ts), so the rows
+#          of one counter on one node are sorted by snapshot and differenced
+#          in a single vectorized pass:
+#            rate = (value - previous) / seconds between the snapshots
+#          A counter that went down was reset (node restart): the increase is
+#          the new value itself. A node whose uptime is shorter than the
+#          interval restarted in between even if the counter grew, so the
+#          increase is the new value over the uptime. With one snapshot only,
+#          the lifetime average (value / uptime) is the best available rate.
+
+UPTIME = ("node_stats", "as_stat.statistics.service.uptime")
+
+# basis: "interval" (between two snapshots) or "lifetime" (since node start)
+RATE_COLUMNS = ["snapshot_ts", "seconds", "previous", "increase", "rate", "reset", "basis"]
+
+
+def rate_needs(table, metrics):
+    """NEEDS entry for rate rules: the counters plus node uptime (restart detection)."""
+    needs = {table: list(metrics)}
+    needs.setdefault(UPTIME[0], []).append(UPTIME[1])
+    return needs
+
+
+def _seconds(snapshots):
+    """Epoch seconds of snapshot timestamps (NaN when unparseable)."""
+    # A bundle has a handful of snapshots: parse the distinct values only
+    codes, uniques = pd.factorize(pd.Series(snapshots))
+    ts = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce")
+    parsed = ts.to_numpy(dtype="datetime64[ns]").astype("int64") / 1e9
+    parsed[ts.isna().to_numpy()] = np.nan
+    # Missing timestamps (code -1) pick the trailing NaN
+    return np.append(parsed, np.nan)[codes]
+
+
+def _uptime_at(uptime, node_ids, snapshots):
+    """Uptime (seconds) of each (node, snapshot) pair, NaN where unknown."""
+    if uptime is None or uptime.empty:
+        return np.full(len(node_ids), np.nan)
+    values = pd.to_numeric(uptime[SOURCES[UPTIME[0]][2]], errors="coerce").to_numpy(dtype=float)
+    index = pd.MultiIndex.from_arrays([uptime["node_id"].to_numpy(), uptime["snapshot_ts"].to_numpy()])
+    # First row wins, as in the skew pivot
+    keep = ~index.duplicated()
+    positions = index[keep].get_indexer(pd.MultiIndex.from_arrays([node_ids, snapshots]))
+    found = values[keep][np.maximum(positions, 0)]
+    return np.where(positions >= 0, found, np.nan)
+
+
+def counter_rates(df, table, uptime=None):
+    """
+    Per-interval rates of the cumulative counters in `df` (rows of `table`
+    with snapshot_ts). One row per (node, entity, metric) and pair of
+    consecutive snapshots, stamped with the later snapshot: the entity and
+    metric columns plus RATE_COLUMNS. `uptime` is the node_stats uptime
+    frame (see rate_needs), used to detect restarts.
+    """
+    entity, name_col, value_col = SOURCES[table]
+    keys = ["node_id", *entity, name_col]
+    if df.empty or "snapshot_ts" not in df:
+        return pd.DataFrame(columns=keys + RATE_COLUMNS)
+
+    at = _seconds(df["snapshot_ts"].to_numpy())
+    values = pd.to_numeric(df[value_col], errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(at) & ~np.isnan(values)
+    frame = df.loc[valid, keys + ["snapshot_ts"]].reset_index(drop=True)
+    at, values = at[valid], values[valid]
+
+    # Series codes, then one sort by (series, time)
+    codes, _ = pd.MultiIndex.from_arrays([frame[c].to_numpy() for c in keys]).factorize()
+    order = np.lexsort((at, codes))
+    codes, at, values = codes[order], at[order], values[order]
+    frame = frame.iloc[order].reset_index(drop=True)
+
+    # Interval i runs from row i to row i + 1 of the same series
+    same = codes[1:] == codes[:-1]
+    seconds = at[1:] - at[:-1]
+    keep = same & (seconds > 0)  # repeated snapshots of a node carry no interval
+    later = frame.iloc[1:].reset_index(drop=True)[keep].reset_index(drop=True)
+    previous, current, seconds = values[:-1][keep], values[1:][keep], seconds[keep]
+
+    up = _uptime_at(uptime, later["node_id"].to_numpy(), later["snapshot_ts"].to_numpy())
+    with np.errstate(invalid="ignore"):
+        restarted = up < seconds
+    reset = (current < previous) | restarted
+    increase = np.where(reset, current, current - previous)
+    # After a restart the counter only ran for the node's uptime (when known)
+    span = np.where(restarted, up, seconds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(span > 0, increase / span, np.nan)
+
+    later["seconds"] = seconds
+    later["previous"] = previous
+    later["increase"] = increase
+    later["rate"] = rate
+    later["reset"] = reset
+    later["basis"] = "interval"
+    return later[keys + RATE_COLUMNS]
+
+
+def lifetime_rates(df, table, uptime=None):
+    """
+    Average rate since node start (value / uptime) at each series' latest
+    snapshot; the fallback for bundles holding a single snapshot.
+    Same columns as counter_rates (previous = 0, seconds = uptime).
+    """
+    entity, name_col, value_col = SOURCES[table]
+    keys = ["node_id", *entity, name_col]
+    if df.empty or "snapshot_ts" not in df:
+        return pd.DataFrame(columns=keys + RATE_COLUMNS)
+    at = _seconds(df["snapshot_ts"].to_numpy())
+    last = df.assign(_at=at).sort_values("_at", kind="stable").drop_duplicates(keys, keep="last")
+    last = last[keys + ["snapshot_ts", value_col]].reset_index(drop=True)
+    values = pd.to_numeric(last.pop(value_col), errors="coerce").to_numpy(dtype=float)
+    up = _uptime_at(uptime, last["node_id"].to_numpy(), last["snapshot_ts"].to_numpy())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        last["seconds"] = up
+        last["previous"] = 0.0
+        last["increase"] = values
+        last["rate"] = np.where(up > 0, values / up, np.nan)
+        last["reset"] = False
+    last["basis"] = "lifetime"
+    return last[keys + RATE_COLUMNS]
+
+
+def latest(rates, table):
+    """The most recent interval of every series."""
+    entity, name_col, _ = SOURCES[table]
+    return rates.drop_duplicates(["node_id", *entity, name_col], keep="last").reset_index(drop=True)
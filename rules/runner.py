@@ -0,0 +1,222 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rules.planner import SharedScan
+from rules.rates import UPTIME, counter_rates, lifetime_rates
+from rules.store import ResultStore, rule_key
+from rules.trends import series_history
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: runner
+# Purpose: Executes the ruleset against one read-only, mmap-backed database.
+#          Every rule is a `check(ctx)` over a shared RuleContext (schema cached
+#          once); rules only read, so they run concurrently on a thread pool.
+#          Each module keeps `run_check(db_path)` as a standalone adapter.
+#          Tables named in the rules' NEEDS are read once per run by the
+#          shared-scan planner (rules/planner.py); see RuleContext.frame.
+#          Results are persisted in rule_results (rules/store.py); a rule is
+#          only recomputed when its input tables or its code changed.
+#          On a store holding several bundles (append mode) rules see one
+#          run, the latest snapshot by default (rules/fleet.py).
+
+DEFAULT_WORKERS = 4
+MMAP_BYTES = 256 * 1024 * 1024
+
+
+class RuleContext:
+    """
+    Read-only view of the health database shared by all rules of one run.
+    The schema is read once; `conn` is a read-only connection owned by the
+    calling thread (a sqlite3 connection serializes its statements, so each
+    pool worker gets its own, all mapping the same file).
+    """
+
+    def __init__(self, db_path="aerospike_health.db"):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"{db_path} not found. Run ingestion first.")
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.scan = SharedScan()
+        self.tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+    def _open(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+        return conn
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def has_table(self, name):
+        """True when `name` is a table or view in the database (cached schema)."""
+        return name in self.tables
+
+    def frame(self, table, patterns):
+        """
+        DataFrame of the `table` rows whose metric / config name matches
+        `patterns` (the rule's NEEDS entry), cut from the run's shared read.
+        """
+        return self.scan.frame(self.conn, table, patterns)
+
+    def rates(self, table, patterns):
+        """
+        Per-second rates of the cumulative counters `patterns` in `table`
+        (rules/rates.py): one row per node / entity / counter and snapshot
+        interval, or the lifetime average when the bundle holds one snapshot.
+        Declare them with NEEDS = rate_needs(table, patterns).
+        """
+        df = self.frame(table, patterns)
+        uptime = self.frame(*UPTIME[:1], [UPTIME[1]]) if self.has_table(UPTIME[0]) else None
+        rates = counter_rates(df, table, uptime)
+        return rates if not rates.empty else lifetime_rates(df, table, uptime)
+
+    def history(self, table, patterns):
+        """
+        Every stored snapshot of the `patterns` series of `table` that the
+        run holds, up to the run's latest one (rules/trends.py): node_id /
+        namespace / metric / snapshot_ts / value, oldest first per series.
+        """
+        return series_history(self.conn, table, self.frame(table, patterns))
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_context(db_path="aerospike_health.db", run_id=None):
+    """
+    RuleContext for a single-bundle database; on a store holding several
+    bundles, a context restricted to `run_id` (default: the latest snapshot).
+    """
+    from rules.fleet import PartitionContext, resolve_run  # rules.fleet builds on this module
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} not found. Run ingestion first.")
+    run_id = resolve_run(db_path, run_id)
+    return PartitionContext.for_run(db_path, run_id) if run_id else RuleContext(db_path)
+
+
+def run_standalone(check, db_path="aerospike_health.db"):
+    """Legacy `run_check(db_path)` entry point: runs one check on its own context."""
+    with open_context(db_path) as ctx:
+        return check(ctx)
+
+
+class RuleRunner:
+    """
+    Runs rule modules concurrently against one RuleContext:
+
+        runner = RuleRunner(db_path)
+        results = runner.run()      # RULESET order
+        print(runner.report())
+
+    Per-rule wall time of computed rules is kept in `timings` (module name ->
+    seconds); rules served from the result store are listed in `cached`.
+    use_store=False always recomputes and persists nothing. run_id picks the
+    run of a store holding several bundles (default: the latest snapshot).
+    """
+
+    def __init__(self, db_path="aerospike_health.db", rules=None, workers=DEFAULT_WORKERS, use_store=True,
+                 run_id=None):
+        if rules is None:
+            from rules import RULESET
+            rules = RULESET
+        self.db_path = db_path
+        self.rules = list(rules)
+        self.workers = workers
+        self.use_store = use_store
+        self.run_id = run_id
+        self.timings = {}
+        self.cached = set()
+        self.reads = {}
+        self.seconds = 0.0
+
+    def _run_one(self, ctx, rule):
+        name = rule_key(rule)
+        start = time.perf_counter()
+        try:
+            return rule.check(ctx)
+        except Exception as e:
+            # Rules trap their own errors; this only catches a rule that crashed outright
+            return {"id": "??", "name": name, "status": "CRITICAL", "message": f"Rule crashed: {str(e)}"}
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def run(self):
+        start = time.perf_counter()
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"{self.db_path} not found. Run ingestion first.")
+        from rules.fleet import resolve_run
+        self.run_id = resolve_run(self.db_path, self.run_id)
+        store = ResultStore(self.db_path) if self.use_store else None
+        try:
+            results = {}
+            for rule in self.rules:
+                stored = store.lookup(rule, self.run_id) if store else None
+                if stored is not None:
+                    results[rule_key(rule)] = stored
+                    self.cached.add(rule_key(rule))
+            pending = [rule for rule in self.rules if rule_key(rule) not in results]
+            if pending:
+                with open_context(self.db_path, self.run_id) as ctx:
+                    # One fused read per table for the union of the pending rules' NEEDS
+                    ctx.scan.add_rules(pending)
+                    ctx.scan.prefetch(ctx.conn, ctx.tables)
+                    if self.workers <= 1:
+                        computed = [self._run_one(ctx, rule) for rule in pending]
+                    else:
+                        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                            computed = list(pool.map(lambda rule: self._run_one(ctx, rule), pending))
+                    self.reads = dict(ctx.scan.reads)
+                # Written after the read-only connections are closed
+                results.update((rule_key(rule), result) for rule, result in zip(pending, computed))
+                if store:
+                    store.save([(rule, result, self.timings[rule_key(rule)]) for rule, result in zip(pending, computed)],
+                               self.run_id)
+        finally:
+            if store:
+                store.close()
+        self.seconds = time.perf_counter() - start
+        return [results[rule_key(rule)] for rule in self.rules]
+
+    def report(self):
+        slowest = sorted(self.timings.items(), key=lambda kv: kv[1], reverse=True)[:3]
+        top = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest) or "none computed"
+        reads = ", ".join(f"{table} {rows:,}" for table, rows in self.reads.items()) or "none"
+        run = f" on run {self.run_id}" if self.run_id else ""
+        return (f"{len(self.rules)} rules{run} in {self.seconds:.2f}s on {self.workers} workers, "
+                f"{len(self.cached)} from the result store (slowest: {top}; shared reads: {reads})")
+
+
+def run_rules(db_path="aerospike_health.db", rules=None, workers=DEFAULT_WORKERS, use_store=True, run_id=None):
+    """Convenience wrapper: returns the results of the ruleset, in ruleset order."""
+    return RuleRunner(db_path, rules, workers, use_store, run_id).run()
+
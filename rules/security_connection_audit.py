@@ -1,17 +1,20 @@
-import sqlite3
 import pandas as pd
 
+from rules.runner import run_standalone
+
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
 __version__ = "1.6.0"
 
-def run_check(db_path="aerospike_health.db"):
+READS = ("security_stats",)
+
+def check(ctx):
     """
     Standardized Rule 6.a: ACL Connection Monopoly Audit.
     Ensures single users are not saturating cluster connection limits.
     """
-    conn = sqlite3.connect(db_path)
+    conn = ctx.conn
     check_id = "6.a"
     check_name = "Security Connection Audit"
     
@@ -19,10 +22,7 @@ def run_check(db_path="aerospike_health.db"):
         # ---------------------------------------------------------------------
         # 1. SCHEMA SAFETY & DATA DISCOVERY
         # ---------------------------------------------------------------------
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='security_stats'")
-        
-        if not cursor.fetchone():
+        if not ctx.has_table('security_stats'):
             return {
                 "id": check_id, 
                 "name": check_name, 
@@ -39,7 +39,12 @@ def run_check(db_path="aerospike_health.db"):
         # ---------------------------------------------------------------------
         # 2. ANALYSIS LOGIC
         # ---------------------------------------------------------------------
-        query = "SELECT user, SUM(connections) as total_conns FROM security_stats GROUP BY user"
+        # Each node's latest snapshot only: multi-snapshot bundles keep one row per snapshot
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(security_stats)")}
+        latest = ("WHERE snapshot_ts IS NULL OR snapshot_ts = "
+                  "(SELECT MAX(snapshot_ts) FROM security_stats l WHERE l.node_id = s.node_id)"
+                  if "snapshot_ts" in columns else "")
+        query = f"SELECT user, SUM(connections) as total_conns FROM security_stats s {latest} GROUP BY user"
         df = pd.read_sql_query(query, conn)
         
         if df.empty or df['total_conns'].sum() == 0:
@@ -92,5 +97,7 @@ def run_check(db_path="aerospike_health.db"):
             "message": f"Execution Error: {str(e)}",
             "remediation": "Contact the Tooling Team to verify the `security_stats` schema compatibility."
         }
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
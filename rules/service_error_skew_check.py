@@ -1,5 +1,5 @@
-import sqlite3
-import pandas as pd
+from rules.runner import run_standalone
+from rules.skew import SkewRule, skew_check
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -10,9 +10,17 @@ __version__ = "1.6.0"
 # ID: 1.a
 # Title: Service Error Skew
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
-    
+# A node is skewed when its service error count is a robust outlier against
+# its peers (median/MAD z-score above 3.5). The 100-error floor keeps tiny,
+# insignificant skews out. The raw statistics name (as_stat.statistics.service.*)
+# is what the ingest stores.
+SKEW = SkewRule("node_stats", ["service.service_error", "as_stat.statistics.service.service_error"],
+                score="robust_z", threshold=3.5, min_nodes=3, min_value=100)
+
+READS = ("node_stats",)
+NEEDS = SKEW.needs
+
+def check(ctx):
     # -------------------------------------------------------------------------
     # CONFIGURATION
     # -------------------------------------------------------------------------
@@ -22,73 +30,24 @@ def run_check(db_path="aerospike_health.db"):
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {
                 "id": check_id, "name": check_name, "status": "⚠️ DATA MISSING",
                 "message": f"Table '{target_table}' not found in database.",
                 "remediation": "Verify that the NodeStatsIngestor is enabled in ingest/__init__.py."
             }
 
-        # 2. QUERY LOGIC
-        # We look for total service errors recorded since the process started.
-        query = f"""
-            SELECT node_id, CAST(value AS REAL) as error_count 
-            FROM {target_table} 
-            WHERE metric = 'service.service_error'
-        """
-        df = pd.read_sql_query(query, conn)
-        
-        # 3. ANALYSIS & RESULTS
-        if df.empty or df['error_count'].sum() == 0:
-            return {
-                "id": check_id, "name": check_name, "status": "PASS",
-                "message": "No service errors detected across the cluster.",
-                "remediation": "None"
-            }
-        
-        # Calculate evidence metrics
-        total_errors = df['error_count'].sum()
-        max_errors = df['error_count'].max()
-        mean_errors = df['error_count'].mean()
-        
-        # Calculate skew: Is any node's error count > 2x the cluster average?
-        # We also set a floor of 100 errors to avoid flagging tiny, insignificant skews.
-        skewed_nodes = df[(df['error_count'] > (mean_errors * 2)) & (df['error_count'] > 100)]
-
-        if not skewed_nodes.empty:
-            worst_node = skewed_nodes.sort_values(by='error_count', ascending=False).iloc[0]
-            return {
-                "id": check_id,
-                "name": check_name,
-                "status": "WARNING",
-                "message": f"Node {worst_node['node_id']} shows significant error skew ({int(worst_node['error_count'])} errors).",
-                "remediation": (
-                    "**Why this matters:** When one node exhibits significantly higher error rates than the rest of the cluster, "
-                    "it typically points to a localized issue such as a failing SSD, a saturated network interface (NIC), "
-                    "or OS-level resource exhaustion.\n\n"
-                    "**Action Plan:**\n"
-                    "1. Check node-specific logs: `asadm -e 'log show' --node {worst_node['node_id']}`.\n"
-                    "2. Inspect the 'service' section of `asinfo -v statistics` for that node to identify which specific "
-                    "error codes (e.g., `error_no_node_id`) are driving the skew.\n"
-                    "3. Verify hardware health and kernel logs (`dmesg`) on the affected host."
-                )
-            }
-
-        # EVIDENCE-BASED PASS
-        return {
-            "id": check_id, 
-            "name": check_name, 
-            "status": "PASS",
-            "message": (
-                f"Cluster total: {int(total_errors)} errors. "
-                f"Max per-node: {int(max_errors)} (Mean: {int(mean_errors)}). "
-                f"Distribution is within healthy thresholds."
-            ),
-            "remediation": "None"
-        }
+        # 2. SKEW ANALYSIS (rules/skew.py)
+        return skew_check(ctx, check_id, check_name, SKEW, remediation=(
+            "**Why this matters:** When one node exhibits significantly higher error rates than the rest of the cluster, "
+            "it typically points to a localized issue such as a failing SSD, a saturated network interface (NIC), "
+            "or OS-level resource exhaustion.\n\n"
+            "**Action Plan:**\n"
+            "1. Check node-specific logs for each node in the findings table: `asadm -e 'log show' --node <node_id>`.\n"
+            "2. Inspect the 'service' section of `asinfo -v statistics` for each affected node to identify which specific "
+            "error codes (e.g., `error_no_node_id`) are driving the skew.\n"
+            "3. Verify hardware health and kernel logs (`dmesg`) on the affected host."
+        ))
         
     except Exception as e:
         return {
@@ -96,5 +55,7 @@ def run_check(db_path="aerospike_health.db"):
             "message": f"Execution Error: {str(e)}",
             "remediation": "Review the database schema and rule query logic."
         }
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -1,64 +1,41 @@
-import sqlite3
-import pandas as pd
+from rules.runner import run_standalone
+from rules.skew import SkewRule, skew_check
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
 __version__ = "1.6.0"
 
-def run_check(db_path):
-    """
-    ID: 4.f - Set Object Skew
-    Description: Node-level object count deviation for specific sets.
-    """
+# ID: 4.f - Set Object Skew
+# Description: Node-level object count deviation for specific sets.
+# A node more than 10% off its set's mean object count (sets averaging at
+# least 1,000 objects, on 2+ nodes) is flagged.
+SKEW = SkewRule("set_stats", ["objects"], score="deviation_pct", threshold=10, min_nodes=2, min_mean=1000)
+
+READS = ("set_stats",)
+NEEDS = SKEW.needs
+
+def check(ctx):
     # Standard Rule Metadata for Report logic
     rule_meta = {"id": "4.f", "name": "Set Object Skew"}
     
     try:
-        conn = sqlite3.connect(db_path)
-        query = """
-        SELECT node_id, ns, set_name, CAST(value AS FLOAT) as objects
-        FROM set_stats 
-        WHERE key = 'objects'
-        """
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-
-        if df.empty:
-            return {
-                **rule_meta,
-                "status": "PASS", 
-                "message": "No set-level object data found to analyze."
-            }
-
-        findings = []
-        for (ns, set_n), group in df.groupby(['ns', 'set_name']):
-            if len(group) < 2: continue
-            avg_objects = group['objects'].mean()
-            if avg_objects < 1000: continue
-            
-            group['deviation_pct'] = (abs(group['objects'] - avg_objects) / avg_objects) * 100
-            max_skew = group['deviation_pct'].max()
-
-            if max_skew > 10:
-                findings.append(f"{ns}:{set_n} ({max_skew:.1f}% skew)")
-
-        if findings:
-            return {
-                **rule_meta,
-                "status": "WARNING",
-                "message": f"High object skew detected in sets: {', '.join(findings)}"
-            }
-
-        return {
-            **rule_meta,
-            "status": "PASS",
-            "message": "Set object distribution is balanced across nodes."
-        }
+        return skew_check(ctx, rule_meta["id"], rule_meta["name"], SKEW, remediation=(
+            "**Why this matters:** Uneven object counts for a set usually mean uneven partition ownership "
+            "(migrations still in progress, a node rejoining) or a hot key range, and the heavier nodes hit "
+            "their memory and disk limits first.\n\n"
+            "**Action Plan:**\n"
+            "1. Confirm migrations are complete: `asadm -e 'show statistics namespace like migrate'`.\n"
+            "2. Review the findings table for nodes that are consistently heavier across sets."
+        ))
 
     except Exception as e:
         return {
             **rule_meta,
             "status": "SCHEMA MISMATCH", 
             "message": f"Analysis failed: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -1,5 +1,4 @@
-import sqlite3
-import pandas as pd
+from rules.runner import run_standalone
 
 # -----------------------------------------------------------------------------
 # VERSION STAMP
@@ -10,16 +9,16 @@ __version__ = "1.6.0"
 # ID: 2.a
 # Title: SIndex on Flash
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_configs",)
+NEEDS = {"node_configs": ["namespace.*.index-type", "namespace.*.sindex-type"]}
+
+def check(ctx):
     check_id = "2.a"
     check_name = "SIndex on Flash"
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='node_configs'")
-        if not cursor.fetchone():
+        if not ctx.has_table('node_configs'):
             return {
                 "id": check_id, "name": check_name, "status": "⚠️ DATA MISSING",
                 "message": "Required table 'node_configs' not found.",
@@ -29,13 +28,7 @@ def run_check(db_path="aerospike_health.db"):
         # 2. QUERY LOGIC
         # We check if any namespace is using Index-on-Flash (index-type flash)
         # and if SIndexes are also configured to use flash.
-        query = """
-            SELECT node_id, config_name, value 
-            FROM node_configs 
-            WHERE config_name LIKE 'namespace.%.index-type'
-               OR config_name LIKE 'namespace.%.sindex-type'
-        """
-        df = pd.read_sql_query(query, conn)
+        df = ctx.frame('node_configs', NEEDS['node_configs'])[['node_id', 'config_name', 'value']]
         
         if df.empty:
             return {
@@ -82,5 +75,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
@@ -0,0 +1,236 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from rules.findings import findings_frame, latest_snapshot, to_records
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: skew
+# Purpose: Vectorized skew engine. Rows of node_stats / namespace_stats /
+#          set_stats are pivoted into a (series x node) matrix, where a
+#          series is one metric of one entity (node-wide, namespace or set),
+#          and every series is scored at once with NumPy:
+#            robust_z      0.6745 * (x - median) / MAD (MeanAD fallback when MAD is 0)
+#            z             (x - mean) / std
+#            deviation_pct |x - mean| / mean * 100
+#          When MAD is 0 (most peers equal) the MeanAD score of a lone outlier
+#          is capped by the cluster size (below 3.5 up to 7 nodes), so rank()
+#          flags any value at least min_value above the median instead.
+#          SkewRule turns a rule into a declaration (table, metrics, score,
+#          threshold); scan() ranks every numeric metric of the cluster.
+
+# table -> (entity columns, metric name column, numeric value column)
+SOURCES = {
+    "node_stats": ((), "metric", "value_num"),
+    "namespace_stats": (("namespace",), "metric", "value"),
+    "set_stats": (("ns", "set_name"), "key", "value_num"),
+}
+
+SCORES = ("robust_z", "z", "deviation_pct")
+SCORE_LABELS = {"robust_z": "robust z", "z": "z-score", "deviation_pct": "% skew"}
+
+# Iglewicz & Hoaglin: 0.6745 makes MAD consistent with the standard deviation
+# for normal data; 1.2533 does the same for the mean absolute deviation.
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.2533
+
+
+def pivot(df, table):
+    """
+    (series, nodes, matrix): series is a DataFrame of entity columns + 'metric',
+    one row per matrix row; matrix[i, j] is series i on node j (NaN if absent).
+    The first row wins when a (series, node) repeats.
+    """
+    entity, name_col, value_col = SOURCES[table]
+    keys = [df[c].to_numpy() for c in entity] + [df[name_col].to_numpy()]
+    # One integer code per distinct (entity..., metric) tuple
+    series_codes, series_index = pd.MultiIndex.from_arrays(keys).factorize()
+    node_codes, nodes = pd.factorize(df['node_id'])
+    values = pd.to_numeric(df[value_col], errors="coerce").to_numpy(dtype=float)
+
+    matrix = np.full((len(series_index), len(nodes)), np.nan)
+    matrix[series_codes[::-1], node_codes[::-1]] = values[::-1]
+    series = pd.DataFrame(list(series_index), columns=list(entity) + ["metric"])
+    return series, np.asarray(nodes), matrix
+
+
+def scores(matrix):
+    """Per-cell scores of a (series x node) matrix, plus the per-series statistics."""
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN series
+        count = np.sum(~np.isnan(matrix), axis=1)
+        median = np.nanmedian(matrix, axis=1)
+        mean = np.nanmean(matrix, axis=1)
+        std = np.nanstd(matrix, axis=1)
+        deviation = matrix - median[:, None]
+        mad = np.nanmedian(np.abs(deviation), axis=1)
+        mean_ad = np.nanmean(np.abs(matrix - mean[:, None]), axis=1)
+
+        robust_z = np.where(mad[:, None] > 0, MAD_SCALE * deviation / mad[:, None],
+                            np.where(mean_ad[:, None] > 0, deviation / (MEAN_AD_SCALE * mean_ad[:, None]), 0.0))
+        z = np.where(std[:, None] > 0, (matrix - mean[:, None]) / std[:, None], 0.0)
+        deviation_pct = np.where(mean[:, None] != 0, np.abs(matrix - mean[:, None]) / np.abs(mean[:, None]) * 100, 0.0)
+    return {
+        "robust_z": robust_z, "z": z, "deviation_pct": deviation_pct,
+        "count": count, "median": median, "mean": mean, "mad": mad,
+    }
+
+
+def rank(df, table, score="robust_z", threshold=3.5, min_nodes=3, min_mean=0.0, min_value=None,
+         min_deviation_pct=0.0, top=None):
+    """
+    Ranked skewed (series, node) pairs, strongest first. A cell is kept when
+    |score| > threshold (upward only for robust_z / z: a node doing *more*
+    than its peers), its series has at least `min_nodes` values and a mean of
+    at least `min_mean`, the value is at least `min_value`, and it sits at
+    least `min_deviation_pct` away from the series mean. For robust_z, a
+    series whose MAD is 0 flags every value at least `min_value` (any
+    amount when None) above its median.
+    """
+    entity, name_col, _ = SOURCES[table]
+    # Multi-snapshot bundles: each node's latest reading of a series
+    series, nodes, matrix = pivot(latest_snapshot(df, ("node_id", *entity, name_col)), table)
+    stats = scores(matrix)
+    values = stats[score]
+    with np.errstate(invalid="ignore"):
+        hit = (np.abs(values) if score == "deviation_pct" else values) > threshold
+        if score == "robust_z":
+            # Equal peers: one node apart from them is the outlier, whatever the cluster size
+            above = matrix - stats["median"][:, None]
+            hit |= (stats["mad"] == 0)[:, None] & (above > 0) & (above >= (min_value or 0))
+        hit &= (stats["count"] >= min_nodes)[:, None] & (stats["mean"] >= min_mean)[:, None]
+        if min_value is not None:
+            hit &= matrix >= min_value
+        if min_deviation_pct:
+            hit &= stats["deviation_pct"] >= min_deviation_pct
+    rows, cols = np.nonzero(hit)
+
+    ranked = series.iloc[rows].reset_index(drop=True)
+    ranked.insert(0, "table", table)
+    ranked["node"] = nodes[cols]
+    ranked["value"] = matrix[rows, cols]
+    for name in ("median", "mean", "mad"):
+        ranked[name] = stats[name][rows]
+    for name in SCORES:
+        ranked[name] = stats[name][rows, cols]
+    ranked["score"] = ranked[score]
+    ranked["series"] = series_labels(ranked, table)
+    order = np.argsort(-np.abs(ranked["score"].to_numpy()), kind="stable")
+    ranked = ranked.iloc[order].reset_index(drop=True)
+    return ranked.head(top) if top else ranked
+
+
+def series_labels(frame, table):
+    """'ns0:set1 objects' / 'ns0 client_write_error' / 'service_error', one per row."""
+    entity = SOURCES[table][0]
+    metric = frame["metric"].astype(str)
+    if not entity:
+        return metric
+    prefix = frame[entity[0]].astype(str)
+    for column in entity[1:]:
+        prefix = prefix + ":" + frame[column].astype(str)
+    return prefix + " " + metric
+
+
+def scan(conn, tables=tuple(SOURCES), top=50, **options):
+    """
+    Every numeric metric of the given tables, scored at once; the `top`
+    strongest skewed node/metric pairs across all of them. Defaults flag a
+    robust z above 3.5 that is also at least 10% off the series mean.
+    """
+    options = {"score": "robust_z", "threshold": 3.5, "min_deviation_pct": 10.0, **options}
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    ranked = []
+    for table in tables:
+        if table not in existing:
+            continue
+        entity, name_col, value_col = SOURCES[table]
+        columns = ", ".join(("node_id",) + entity + (name_col, value_col))
+        df = pd.read_sql_query(f"SELECT {columns} FROM {table} WHERE {value_col} IS NOT NULL", conn)
+        if not df.empty:
+            ranked.append(rank(df, table, top=top, **options))
+    if not ranked:
+        return pd.DataFrame()
+    ranked = pd.concat(ranked, ignore_index=True)
+    order = np.argsort(-np.abs(ranked["score"].to_numpy()), kind="stable")
+    return ranked.iloc[order].head(top).reset_index(drop=True)
+
+
+class SkewRule:
+    """
+    Declarative skew rule: which metrics of which table, scored how.
+
+        SKEW = SkewRule("set_stats", ["objects"], score="deviation_pct", threshold=10, min_mean=1000)
+        NEEDS = SKEW.needs
+    """
+
+    def __init__(self, table, metrics, score="robust_z", threshold=3.5, min_nodes=3, min_mean=0.0,
+                 min_value=None, min_deviation_pct=0.0):
+        if score not in SCORES:
+            raise ValueError(f"Unknown skew score '{score}' (one of {', '.join(SCORES)})")
+        self.table = table
+        self.metrics = list(metrics)
+        self.options = {"score": score, "threshold": threshold, "min_nodes": min_nodes, "min_mean": min_mean,
+                        "min_value": min_value, "min_deviation_pct": min_deviation_pct}
+
+    @property
+    def needs(self):
+        return {self.table: self.metrics}
+
+    def evaluate(self, ctx):
+        """(rows read, ranked offenders) for this rule, read through the shared scan."""
+        df = ctx.frame(self.table, self.metrics)
+        return df, rank(df, self.table, **self.options)
+
+    def findings(self, ranked):
+        """Findings rows (rules/findings.py): the score of each node against the threshold."""
+        entity = SOURCES[self.table][0]
+        namespace = ranked[entity[0]] if entity else None
+        metric = ranked["metric"]
+        if len(entity) > 1:
+            metric = ranked[entity[1]].astype(str) + "." + metric
+        label = SCORE_LABELS[self.options["score"]]
+        return findings_frame(ranked["node"], namespace, metric + f" ({label})",
+                              ranked["score"].round(2), self.options["threshold"])
+
+
+def describe_score(score, value):
+    """'93.3% skew' / 'robust z 5.2'."""
+    return f"{value:.1f}% skew" if score == "deviation_pct" else f"{SCORE_LABELS[score]} {value:.1f}"
+
+
+def skew_check(ctx, check_id, check_name, rule, remediation="None"):
+    """
+    Standard result dict for a SkewRule: WARNING with a findings table and
+    one message entry per skewed series, PASS otherwise.
+    """
+    meta = {"id": check_id, "name": check_name}
+    if not ctx.has_table(rule.table):
+        return {**meta, "status": "⚠️ DATA MISSING", "message": f"Table {rule.table} not found."}
+    df, ranked = rule.evaluate(ctx)
+    if df.empty:
+        return {**meta, "status": "PASS", "message": "No telemetry found to analyze for skew.", "remediation": "None"}
+    score = rule.options["score"]
+    if ranked.empty:
+        return {
+            **meta, "status": "PASS",
+            "message": (f"Distribution is balanced across {df['node_id'].nunique()} node(s): no series above "
+                        f"{describe_score(score, rule.options['threshold'])}."),
+            "remediation": "None",
+        }
+
+    per_series = ranked.groupby("series", sort=True).agg(score=("score", "max"), nodes=("node", "count"))
+    shown = [f"{name} ({describe_score(score, top)} on {nodes} node(s))" for name, top, nodes in per_series.itertuples()]
+    return {
+        **meta,
+        "status": "WARNING",
+        "message": f"Skew detected in {len(per_series)} series: {', '.join(shown)}",
+        "findings": to_records(rule.findings(ranked)),
+        "remediation": remediation,
+    }
@@ -1,6 +1,9 @@
-import sqlite3
 import pandas as pd
 
+from rules.findings import findings_frame, to_records
+from rules.planner import namespace_pivot
+from rules.runner import run_standalone
+
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
@@ -10,44 +13,40 @@ __version__ = "1.6.0"
 # ID: 2.b
 # Title: Sprig Limit Warning
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_configs",)
+NEEDS = {"node_configs": ["namespace.*.index-type", "namespace.*.partition-tree-sprigs"]}
+
+def check(ctx):
     check_id = "2.b"
     check_name = "Sprig Limit Warning"
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='node_configs'")
-        if not cursor.fetchone():
+        if not ctx.has_table('node_configs'):
             return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
 
         # 2. QUERY LOGIC
         # We need namespaces where index-type is flash and the current sprig count
-        query = """
-            SELECT node_id, config_name, value 
-            FROM node_configs 
-            WHERE config_name LIKE 'namespace.%.index-type'
-               OR config_name LIKE 'namespace.%.partition-tree-sprigs'
-        """
-        df = pd.read_sql_query(query, conn)
+        # snapshot_ts stays: namespace_pivot reads each node's latest snapshot
+        df = ctx.frame('node_configs', NEEDS['node_configs'])
         
         if df.empty:
             return {"id": check_id, "name": check_name, "status": "PASS", "message": "No sprig configurations found.", "remediation": "None"}
 
         # 3. ANALYSIS
-        # Extract namespaces using flash
-        flash_ns = df[df['value'] == 'flash']['config_name'].str.split('.').str[1].unique()
-        
-        findings = []
-        for ns in flash_ns:
-            sprig_key = f"namespace.{ns}.partition-tree-sprigs"
-            sprig_val = df[df['config_name'] == sprig_key]['value'].iloc[0] if not df[df['config_name'] == sprig_key].empty else "64"
-            
-            # 64 is the default. For Flash, we generally want at least 4096 or higher
-            # depending on record count. We warn if it's still at the default.
-            if int(sprig_val) <= 256:
-                findings.append(f"{ns} ({sprig_val} sprigs)")
+        # One row per (node, namespace); sprigs default to 64 when not configured
+        text, num = namespace_pivot(df, 'value'), namespace_pivot(df, 'value_num')
+        index_type = text.get('index-type', pd.Series(None, index=text.index, dtype=object))
+        sprigs = num.get('partition-tree-sprigs', pd.Series(64.0, index=num.index)).reindex(text.index).fillna(64)
+
+        # 64 is the default. For Flash, we generally want at least 4096 or higher
+        # depending on record count. We warn if it's still at (or near) the default.
+        low = (index_type == 'flash') & (sprigs <= 256)
+        offenders = pd.DataFrame({'sprigs': sprigs[low].astype(int)}).reset_index()
+
+        # Every offending node/namespace pair is kept; the message groups identical settings
+        groups = offenders.groupby(['namespace', 'sprigs'])['node_id'].count()
+        findings = [f"{ns} ({sprig_val} sprigs on {nodes} node(s))" for (ns, sprig_val), nodes in groups.items()]
 
         if findings:
             return {
@@ -55,6 +54,8 @@ def run_check(db_path="aerospike_health.db"):
                 "name": check_name,
                 "status": "WARNING",
                 "message": f"Namespace(s) {', '.join(findings)} use Index-on-Flash but have low sprig counts.",
+                "findings": to_records(findings_frame(offenders['node_id'], offenders['namespace'], 'partition-tree-sprigs',
+                                                      offenders['sprigs'], 256)),
                 "remediation": (
                     "**Why this matters:** Sprigs define the number of sub-trees in the primary index. For Index-on-Flash, "
                     "a low sprig count causes 'deep' trees, requiring more disk IOPS per lookup. This can lead to high "
@@ -73,5 +74,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
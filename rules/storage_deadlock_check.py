@@ -1,6 +1,9 @@
-import sqlite3
 import pandas as pd
 
+from rules.findings import findings_frame, to_records
+from rules.planner import namespace_pivot
+from rules.runner import run_standalone
+
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
@@ -10,28 +13,23 @@ __version__ = "1.6.0"
 # ID: 2.c
 # Title: Storage Deadlock Risk
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_configs",)
+NEEDS = {"node_configs": ["namespace.*.defrag-lwm-free-pct", "namespace.*.high-water-disk-pct"]}
+
+def check(ctx):
     check_id = "2.c"
     check_name = "Storage Deadlock Risk"
     target_table = "node_configs"
     
     try:
         # 1. SCHEMA SAFETY CHECK
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{target_table}'")
-        if not cursor.fetchone():
+        if not ctx.has_table(target_table):
             return {"id": check_id, "name": check_name, "status": "⚠️ DATA MISSING", "message": "Table not found."}
 
         # 2. QUERY LOGIC
         # We need to compare Defrag LWM and Disk HWM for every namespace
-        query = """
-            SELECT node_id, config_name, value 
-            FROM node_configs 
-            WHERE config_name LIKE 'namespace.%.defrag-lwm-free-pct'
-               OR config_name LIKE 'namespace.%.high-water-disk-pct'
-        """
-        df = pd.read_sql_query(query, conn)
+        # snapshot_ts stays: namespace_pivot reads each node's latest snapshot
+        df = ctx.frame(target_table, NEEDS[target_table])
         
         if df.empty:
             return {
@@ -41,32 +39,32 @@ def run_check(db_path="aerospike_health.db"):
             }
 
         # 3. ANALYSIS
-        # Group by namespace to compare thresholds
-        namespaces = df['config_name'].str.split('.').str[1].unique()
-        findings = []
+        # One row per (node, namespace); missing keys fall back to the Aerospike defaults (50%)
+        wide = namespace_pivot(df, 'value_num')
+        defrag = wide.get('defrag-lwm-free-pct', pd.Series(50.0, index=wide.index)).fillna(50)
+        hwm = wide.get('high-water-disk-pct', pd.Series(50.0, index=wide.index)).fillna(50)
 
-        for ns in namespaces:
-            defrag_key = f"namespace.{ns}.defrag-lwm-free-pct"
-            hwm_key = f"namespace.{ns}.high-water-disk-pct"
-            
-            # Get values (default to Aerospike defaults if missing)
-            defrag_val = df[df['config_name'] == defrag_key]['value'].iloc[0] if not df[df['config_name'] == defrag_key].empty else "50"
-            hwm_val = df[df['config_name'] == hwm_key]['value'].iloc[0] if not df[df['config_name'] == hwm_key].empty else "50"
-            
-            # DEADLOCK CALCULATION:
-            # If (100 - HWM) < (100 - Defrag LWM), the disk might fill up 
-            # before defrag can reclaim enough blocks to stay ahead.
-            # Simplified TAM Rule: defrag-lwm-free-pct should generally be >= 50% 
-            # and should be at least as aggressive as the HWM.
-            if int(defrag_val) < 40 or (int(defrag_val) < int(hwm_val)):
-                findings.append(f"{ns} (Defrag: {defrag_val}%, HWM: {hwm_val}%)")
+        # DEADLOCK CALCULATION:
+        # If (100 - HWM) < (100 - Defrag LWM), the disk might fill up 
+        # before defrag can reclaim enough blocks to stay ahead.
+        # Simplified TAM Rule: defrag-lwm-free-pct should generally be >= 50% 
+        # and should be at least as aggressive as the HWM.
+        at_risk = (defrag < 40) | (defrag < hwm)
+        offenders = pd.DataFrame({'defrag': defrag, 'hwm': hwm})[at_risk].astype(int).reset_index()
 
-        if findings:
+        if not offenders.empty:
+            # Every offending node/namespace pair is kept; the message groups identical settings
+            groups = offenders.groupby(['namespace', 'defrag', 'hwm'])['node_id'].count()
+            findings = [f"{ns} (Defrag: {defrag_val}%, HWM: {hwm_val}%) on {nodes} node(s)"
+                        for (ns, defrag_val, hwm_val), nodes in groups.items()]
             return {
                 "id": check_id,
                 "name": check_name,
                 "status": "WARNING",
                 "message": f"Storage deadlock risk in namespace(s): {', '.join(findings)}.",
+                # Defrag LWM per pair, against the level it has to reach (max of 40% and the HWM)
+                "findings": to_records(findings_frame(offenders['node_id'], offenders['namespace'], 'defrag-lwm-free-pct',
+                                                      offenders['defrag'], offenders['hwm'].clip(lower=40))),
                 "remediation": (
                     "**Why this matters:** If the Disk High Water Mark (eviction) is reached before defragmentation "
                     "reclaims enough space, the node may stop accepting writes (`stop-writes-pct`). "
@@ -88,5 +86,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": f"Error: {str(e)}"}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
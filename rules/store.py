@@ -0,0 +1,145 @@
+import datetime
+import hashlib
+import json
+import sqlite3
+import sys
+import types
+from functools import lru_cache
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: store
+# Purpose: Persisted rule results. Each result is stored in `rule_results`
+#          keyed by (run_id, rule, rule_version) together with a hash of the
+#          rule's input tables (their `table_versions` stamps, see READS in
+#          each rule) and a hash of the rule's code: its module plus every
+#          rules / ingest helper module it uses, transitively (findings, skew,
+#          rates, forecast, planner, trends, ...). A stored result is reused
+#          while both hashes match; otherwise the rule is recomputed.
+
+RESULTS_DDL = """
+    CREATE TABLE IF NOT EXISTS rule_results (
+        run_id TEXT, rule TEXT, rule_version TEXT,
+        input_hash TEXT, code_hash TEXT,
+        result TEXT, seconds REAL, computed_at TEXT,
+        PRIMARY KEY (run_id, rule, rule_version))
+"""
+RESULTS_UPSERT = "INSERT OR REPLACE INTO rule_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Packages whose modules count as rule code
+CODE_PACKAGES = ("rules", "ingest")
+
+
+def rule_key(rule):
+    return rule.__name__.rsplit(".", 1)[-1]
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _code_module(value):
+    """The rules / ingest module a global of some module refers to (module, function, class), else None."""
+    module = value if isinstance(value, types.ModuleType) else getattr(value, "__module__", None)
+    if isinstance(module, str):
+        module = sys.modules.get(module)
+    if not isinstance(module, types.ModuleType) or not getattr(module, "__file__", None):
+        return None
+    return module if module.__name__.split(".")[0] in CODE_PACKAGES else None
+
+
+def code_modules(rule):
+    """{module name: source file} of `rule` and every rules / ingest module it uses, transitively."""
+    found, pending = {}, [rule]
+    while pending:
+        module = pending.pop()
+        if module.__name__ in found:
+            continue
+        found[module.__name__] = module.__file__
+        for value in list(vars(module).values()):
+            used = _code_module(value)
+            if used is not None and used.__name__ not in found:
+                pending.append(used)
+    return found
+
+
+@lru_cache(maxsize=None)
+def code_hash(rule):
+    parts = [f"{name}={_file_hash(path)}" for name, path in sorted(code_modules(rule).items())]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Read/write access to rule_results for one database. Rules without READS,
+    and databases without table_versions (older ingests), are never cached.
+    """
+
+    def __init__(self, db_path="aerospike_health.db"):
+        self.conn = sqlite3.connect(db_path)
+        tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.stamps = None
+        self.run_id = None
+        if "table_versions" in tables:
+            rows = self.conn.execute("SELECT table_name, run_id, row_count, loaded_at FROM table_versions").fetchall()
+            self.stamps = {table: f"{run_id}:{count}:{loaded_at}" for table, run_id, count, loaded_at in rows}
+            self.run_id = max((r[1] for r in rows), default=None)
+        self.hits = 0
+
+    def input_hash(self, rule):
+        reads = getattr(rule, "READS", None)
+        if self.stamps is None or reads is None:
+            return None
+        # Tables that do not exist hash as 'absent', so their later arrival invalidates too
+        parts = [f"{table}={self.stamps.get(table, 'absent')}" for table in sorted(reads)]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def lookup(self, rule, run_id=None):
+        """
+        Returns the stored result dict when inputs and code are unchanged, else None.
+        run_id overrides the database's run (fleet partitions, see rules/fleet.py).
+        """
+        input_hash = self.input_hash(rule)
+        if input_hash is None:
+            return None
+        try:
+            row = self.conn.execute(
+                "SELECT input_hash, code_hash, result FROM rule_results WHERE run_id = ? AND rule = ? AND rule_version = ?",
+                (run_id or self.run_id, rule_key(rule), getattr(rule, "__version__", None))).fetchone()
+        except sqlite3.OperationalError:
+            return None  # no rule_results table yet
+        if row and row[0] == input_hash and row[1] == code_hash(rule):
+            self.hits += 1
+            return json.loads(row[2])
+        return None
+
+    def save(self, computed, run_id=None):
+        """Persists [(rule, result, seconds)] for every cacheable rule."""
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        rows = []
+        for rule, result, seconds in computed:
+            input_hash = self.input_hash(rule)
+            if input_hash is None:
+                continue
+            rows.append((run_id or self.run_id, rule_key(rule), getattr(rule, "__version__", None), input_hash,
+                         code_hash(rule), json.dumps(result, default=str), seconds, now))
+        if not rows:
+            return 0
+        try:
+            with self.conn:
+                self.conn.execute(RESULTS_DDL)
+                self.conn.executemany(RESULTS_UPSERT, rows)
+        except sqlite3.OperationalError as e:
+            # e.g. a read-only database file: results are still returned, just not kept
+            print(f"⚠️ Rule results not persisted: {e}")
+            return 0
+        return len(rows)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,150 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from ingest.catalog import pattern_operator
+from ingest.registry import RUN_ORDER
+from ingest.trends import normalize_ts
+
+# -----------------------------------------------------------------------------
+# VERSION STAMP
+# -----------------------------------------------------------------------------
+__version__ = "1.6.0"
+
+# --- Metadata ---
+# Module: trends
+# Purpose: Queries over the trend store (ingest/trends.py): metric windows
+#          from the daily rollups or the raw points, and run-to-run deltas.
+#          Every query starts from trend_series (metric first, matching its
+#          UNIQUE index) and reads points / rollups by (series, time) range.
+
+SERIES_COLUMNS = ["cluster_name", "node_id", "namespace", "set_name", "metric"]
+
+
+def trend_runs(conn):
+    """run_ids held by the trend store, oldest snapshot first (see resolve_run in rules/fleet.py)."""
+    try:
+        return [r[0] for r in conn.execute(
+            "SELECT run_id FROM bundles WHERE EXISTS "
+            f"(SELECT 1 FROM trend_points p WHERE p.run_id = bundles.run_id) ORDER BY {RUN_ORDER}")]
+    except sqlite3.OperationalError:
+        # No registry or no trend store (older ingest)
+        return []
+
+
+def _series_filter(metric=None, cluster=None, node=None, namespace=None, set_name=None):
+    """WHERE clause and parameters on trend_series `s`; metric may be a pattern (see pattern_operator)."""
+    clauses, params = [], []
+    if metric:
+        clauses.append(f"s.metric {pattern_operator(metric)} ?")
+        params.append(metric)
+    for column, value in (("cluster_name", cluster), ("node_id", node), ("namespace", namespace),
+                          ("set_name", set_name)):
+        if value is not None:
+            clauses.append(f"s.{column} = ?")
+            params.append(value)
+    return " AND ".join(clauses) or "1", params
+
+
+def trend_window(conn, metric, start=None, end=None, cluster=None, node=None, namespace=None, set_name=None,
+                 daily=True):
+    """
+    History of `metric` between days `start` and `end` (inclusive,
+    'YYYY-MM-DD'; open-ended when None), one row per series and day
+    (min / max / last / samples) from the rollups, or per snapshot
+    (ts / run_id / value) with daily=False.
+    """
+    where, params = _series_filter(metric, cluster, node, namespace, set_name)
+    if daily:
+        columns, source, time_col = "d.day, d.min, d.max, d.last, d.samples", "trend_daily d", "d.day"
+        lower, upper = start, end
+    else:
+        columns, source, time_col = "d.ts, d.run_id, d.value", "trend_points d", "d.ts"
+        # Whole days: the upper bound sorts after any time of day
+        lower, upper = start, (f"{end}~" if end else None)
+    if lower:
+        where += f" AND {time_col} >= ?"
+        params.append(lower)
+    if upper:
+        where += f" AND {time_col} <= ?"
+        params.append(upper)
+    sql = (f"SELECT {', '.join('s.' + c for c in SERIES_COLUMNS)}, {columns} FROM trend_series s "
+           f"JOIN {source} ON d.series_key = s.series_key WHERE {where} ORDER BY s.series_key, {time_col}")
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def _run_values(conn, run_id, where, params):
+    """Last value of every series in one run."""
+    # Bare column with MAX(): `value` comes from the row holding the latest ts
+    sql = (f"SELECT {', '.join('s.' + c for c in SERIES_COLUMNS)}, p.value, MAX(p.ts) AS ts "
+           "FROM trend_points p JOIN trend_series s ON s.series_key = p.series_key "
+           f"WHERE p.run_id = ? AND {where} GROUP BY p.series_key")
+    return pd.read_sql_query(sql, conn, params=[run_id, *params]).drop(columns="ts")
+
+
+def compare_runs(conn, run_a=None, run_b=None, metric=None, cluster=None):
+    """
+    Per-series deltas between two runs (default: the two latest snapshots):
+    SERIES_COLUMNS + value_a, value_b, delta, delta_pct. A series present in
+    one run only keeps NaN on the other side.
+    """
+    if run_a is None or run_b is None:
+        runs = trend_runs(conn)
+        if len(runs) < 2:
+            raise ValueError("The trend store holds fewer than two runs; pass both run_ids to compare.")
+        run_a, run_b = runs[-2], runs[-1]
+    where, params = _series_filter(metric, cluster)
+    merged = _run_values(conn, run_a, where, params).merge(
+        _run_values(conn, run_b, where, params), on=SERIES_COLUMNS, how="outer", suffixes=("_a", "_b"))
+    a = merged["value_a"].to_numpy(dtype=float)
+    b = merged["value_b"].to_numpy(dtype=float)
+    merged["delta"] = b - a
+    with np.errstate(invalid="ignore", divide="ignore"):
+        merged["delta_pct"] = np.where(a != 0, (b - a) / np.abs(a) * 100, np.nan)
+    merged.attrs["runs"] = (run_a, run_b)
+    return merged.sort_values(["metric", "cluster_name", "node_id", "namespace", "set_name"],
+                              kind="stable").reset_index(drop=True)
+
+
+def series_history(conn, table, current, entity="namespace", name_col="metric", value_col="value"):
+    """
+    Stored history of the series in `current` (rows of `table` for the run
+    being evaluated: node_id, entity, name_col, value_col, snapshot_ts):
+    node_id / namespace / metric / snapshot_ts / value, one row per stored
+    snapshot up to the run's latest one, from the trend store. Series the
+    trend store does not hold (older ingests) keep the run's own snapshots.
+    """
+    # Snapshot times in the stored points' format, so both compare and parse alike
+    stamps = current["snapshot_ts"].map(normalize_ts) if "snapshot_ts" in current else None
+    own = pd.DataFrame({"node_id": current["node_id"], "namespace": current[entity], "metric": current[name_col],
+                        "snapshot_ts": stamps, "value": current[value_col]})
+    runs = current["run_id"].dropna().unique().tolist() if "run_id" in current else []
+    if own.empty or not runs:
+        return own
+    # Later runs of the same nodes are not history for this one
+    cutoff = own["snapshot_ts"].dropna().max() if own["snapshot_ts"].notna().any() else "9999"
+    metrics = own["metric"].unique().tolist()
+    try:
+        members = pd.read_sql_query(
+            f"SELECT DISTINCT cluster_name, node_id FROM cluster_nodes WHERE run_id IN ({', '.join('?' * len(runs))})",
+            conn, params=runs)
+        members = members[members["node_id"].isin(own["node_id"].unique())]
+        clusters = members["cluster_name"].unique().tolist()
+        stored = pd.read_sql_query(
+            "SELECT s.cluster_name, s.node_id, s.namespace, s.metric, p.ts AS snapshot_ts, p.value "
+            "FROM trend_series s JOIN trend_points p ON p.series_key = s.series_key "
+            f"WHERE s.metric IN ({', '.join('?' * len(metrics))}) "
+            f"AND s.cluster_name IN ({', '.join('?' * len(clusters))}) AND s.source = ? AND p.ts <= ? "
+            "ORDER BY s.series_key, p.ts",
+            conn, params=[*metrics, *clusters, table, cutoff])
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        # No trend store / cluster_nodes: older ingest
+        return own
+    # Same cluster and node as the evaluated run, and a series the run still has
+    stored = stored.merge(members, on=["cluster_name", "node_id"]).drop(columns="cluster_name")
+    keys = ["node_id", "namespace", "metric"]
+    stored = stored.merge(own[keys].drop_duplicates(), on=keys)
+    held = pd.MultiIndex.from_frame(stored[keys].drop_duplicates())
+    missing = ~pd.MultiIndex.from_frame(own[keys]).isin(held)
+    return pd.concat([stored, own[missing]], ignore_index=True) if missing.any() else stored
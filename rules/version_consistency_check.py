@@ -1,6 +1,8 @@
-import sqlite3
 import pandas as pd
 
+from ingest.catalog import resolve_metrics
+from rules.runner import run_standalone
+
 # -----------------------------------------------------------------------------
 # VERSION STAMP
 # -----------------------------------------------------------------------------
@@ -10,20 +12,16 @@ __version__ = "1.6.0"
 # ID: 1.c
 # Title: Version Consistency
 
-def run_check(db_path="aerospike_health.db"):
-    conn = sqlite3.connect(db_path)
+READS = ("node_stats",)
+
+def check(ctx):
+    conn = ctx.conn
     check_id = "1.c"
     check_name = "Version Consistency"
     
     try:
         # 1. DYNAMIC KEY DISCOVERY
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DISTINCT metric 
-            FROM node_stats 
-            WHERE metric LIKE '%version' OR metric LIKE '%build'
-        """)
-        found_keys = [row[0] for row in cursor.fetchall()]
+        found_keys = resolve_metrics(conn, "node_stats", ['%version', '%build'])
         
         # 2. HANDLING MISSING TELEMETRY (PROFESSIONAL TONE)
         if not found_keys:
@@ -82,5 +80,7 @@ def run_check(db_path="aerospike_health.db"):
         
     except Exception as e:
         return {"id": check_id, "name": check_name, "status": "CRITICAL", "message": "Diagnostic execution error during version audit."}
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+def run_check(db_path="aerospike_health.db"):
+    return run_standalone(check, db_path)
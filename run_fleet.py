@@ -0,0 +1,55 @@
+import os
+import argparse
+from ingest_manager import process_fleet
+from rules.runner import DEFAULT_WORKERS
+
+__version__ = "1.6.0"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest a directory of collectinfo bundles into one fleet store and run the ruleset "
+                    "on every (bundle, cluster) partition.")
+    parser.add_argument("bundle_dir", help="Directory of collectinfo .tgz bundles")
+    parser.add_argument("--db", default="fleet_health.db", help="SQLite fleet store to write")
+    parser.add_argument("--workers", type=int, default=4, metavar="N",
+                        help="Ingest N bundles concurrently (one process per bundle)")
+    parser.add_argument("--rule-workers", type=int, default=DEFAULT_WORKERS, metavar="N",
+                        help="Run rules on N threads")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Decode each bundle's telemetry in one piece instead of node-by-node")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Start from an empty store instead of appending the new bundles")
+    parser.add_argument("--no-rules", action="store_true", help="Only build the fleet store")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Recompute every rule instead of reading the rule_results store")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.bundle_dir):
+        print(f"❌ Error: Directory not found: {args.bundle_dir}")
+        return
+
+    try:
+        outcome = process_fleet(args.bundle_dir, args.db, workers=args.workers, streaming=not args.no_stream,
+                                rebuild=args.rebuild)
+    except Exception as e:
+        print(f"💥 Critical Failure: {e}")
+        return
+    statuses = [status for _, _, status in outcome]
+    failed = len(statuses) - statuses.count("ingested") - statuses.count("skipped")
+    print(f"✨ Fleet ingestion complete: {statuses.count('ingested')} new, {statuses.count('skipped')} already "
+          f"in the store, {failed} failed ({args.db})")
+    if args.no_rules or not os.path.exists(args.db) or failed == len(statuses):
+        return
+
+    from rules.fleet import FleetRunner
+    runner = FleetRunner(args.db, workers=args.rule_workers, use_store=not args.fresh)
+    for part in runner.run():
+        statuses = [res.get("status", "") for res in part["results"]]
+        flagged = [res.get("id", "??") for res in part["results"] if res.get("status") != "PASS"]
+        bundle = os.path.basename(part["bundle"] or part["run_id"])
+        print(f"{part['cluster']:<20} | {bundle:<30} | {statuses.count('CRITICAL'):>2} critical, "
+              f"{statuses.count('WARNING'):>2} warning | {', '.join(flagged) or 'all PASS'}")
+    print(f"⏱️ {runner.report()}")
+
+if __name__ == "__main__":
+    main()
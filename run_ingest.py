@@ -1,24 +1,81 @@
 import sys
 import os
-from ingest_manager import process_collectinfo
+import argparse
+from ingest_manager import append_bundle, process_collectinfo
+from ingest import INGESTORS, select_ingestors
+from ingest.bundle_scan import default_index_path
 
 __version__ = "1.6.0"
 
 def main():
     if len(sys.argv) < 2:
-        print("❌ Usage: python3 run_ingest.py <path_to_bundle.tgz>")
+        print("❌ Usage: python3 run_ingest.py <path_to_bundle.tgz> [--stream] [--workers N] [--index] [--only INGESTOR,...] [--append] [--force]")
         return
 
-    input_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Ingest an Aerospike collectinfo bundle into SQLite.")
+    parser.add_argument("input_path", help="Path to the collectinfo .tgz bundle")
+    parser.add_argument("--stream", action="store_true",
+                        help="Decode telemetry node-by-node to keep memory flat on large clusters")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="Extract node rows in N worker processes (single SQLite writer)")
+    parser.add_argument("--index", action="store_true",
+                        help="Save a sidecar index of member offsets next to the bundle")
+    parser.add_argument("--only", metavar="INGESTOR[,INGESTOR]",
+                        help="Re-ingest only these slices (e.g. SetStatsIngestor or set_stats) into the "
+                             "existing database and re-run the rules downstream of them")
+    parser.add_argument("--append", action="store_true",
+                        help="Add the bundle next to those already in the database instead of replacing it")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-ingest even when the database already holds this bundle")
+    parser.add_argument("--db", default="aerospike_health.db", help="SQLite database to write")
+    args = parser.parse_args()
+
+    input_path = args.input_path
     if not os.path.exists(input_path):
         print(f"❌ Error: File not found: {input_path}")
         return
 
     try:
-        process_collectinfo(input_path)
+        only = select_ingestors(args.only.split(",")) if args.only else None
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+
+    if args.append and only is not None:
+        print("❌ Error: --append and --only cannot be combined.")
+        return
+
+    try:
+        partial = only is not None and os.path.exists(args.db)
+        index_path = default_index_path(input_path) if args.index else None
+        if args.append:
+            append_bundle(input_path, args.db, streaming=args.stream, workers=args.workers, index_path=index_path)
+            print("✨ Append complete.")
+            return
+        stats = process_collectinfo(input_path, args.db, streaming=args.stream, index_path=index_path,
+                                    workers=args.workers, only=only, force=args.force)
+        if stats is None:
+            return
         print("✨ Ingestion complete.")
+        if partial:
+            rerun_downstream(args.db, [INGESTORS[idx] for idx in sorted(only)])
     except Exception as e:
         print(f"💥 Critical Failure: {e}")
 
+def rerun_downstream(db_path, ingestors):
+    """Re-evaluates the rules fed by the re-ingested slices; every other stored result stays valid."""
+    from rules.graph import DependencyGraph
+    from rules.runner import RuleRunner
+    from rules.store import rule_key
+
+    rules = DependencyGraph().downstream(ingestors)
+    if not rules:
+        print("♻️ No rules read the re-ingested tables.")
+        return
+    print(f"♻️ Re-running downstream rules: {', '.join(rule_key(r) for r in rules)}")
+    runner = RuleRunner(db_path, rules=rules)
+    runner.run()
+    print(f"⏱️ {runner.report()}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
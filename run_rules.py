@@ -0,0 +1,87 @@
+import os
+import argparse
+from rules.runner import DEFAULT_WORKERS, RuleRunner
+
+__version__ = "1.6.0"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the health ruleset against an ingested database.")
+    parser.add_argument("db_path", nargs="?", default="aerospike_health.db",
+                        help="SQLite database produced by run_ingest.py")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Recompute every rule instead of reading the rule_results store")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, metavar="N",
+                        help="Run rules on N threads")
+    parser.add_argument("--run", metavar="RUN_ID",
+                        help="Run of a database holding several bundles (default: the latest snapshot)")
+    parser.add_argument("--graph", action="store_true",
+                        help="Print the ingestor -> table -> rule dependency graph and exit")
+    parser.add_argument("--skew", type=int, nargs="?", const=25, metavar="N",
+                        help="Rank the N most skewed node/metric pairs across every numeric metric and exit")
+    parser.add_argument("--trend", metavar="METRIC",
+                        help="Print the daily min / max / last of METRIC from the trend store and exit")
+    parser.add_argument("--since", metavar="YYYY-MM-DD", help="First day of the --trend window")
+    parser.add_argument("--compare", nargs="*", metavar="RUN_ID",
+                        help="Print per-series deltas between two runs (default: the two latest) and exit")
+    args = parser.parse_args()
+
+    if args.graph:
+        from rules.graph import DependencyGraph
+        print(DependencyGraph().describe())
+        return
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Error: {args.db_path} not found. Run ingestion first.")
+        return
+
+    if args.skew:
+        import sqlite3
+        from rules.skew import scan
+        with sqlite3.connect(args.db_path) as conn:
+            ranked = scan(conn, top=args.skew)
+        if ranked.empty:
+            print("✅ No skewed node/metric pairs (robust z > 3.5 and >= 10% off the mean).")
+        for row in ranked.itertuples():
+            print(f"{row.table:<16} | {row.node:<22} | robust z {row.robust_z:6.1f} | {row.value:>14,.0f} vs median "
+                  f"{row.median:,.0f} | {row.series}")
+        return
+
+    if args.trend or args.compare is not None:
+        import sqlite3
+        from rules.trends import compare_runs, trend_window
+        if args.compare is not None and len(args.compare) not in (0, 2):
+            parser.error("--compare takes no run_id (the two latest runs) or two run_ids")
+        with sqlite3.connect(args.db_path) as conn:
+            try:
+                if args.trend:
+                    history = trend_window(conn, args.trend, start=args.since)
+                else:
+                    history = compare_runs(conn, *args.compare)
+            except sqlite3.OperationalError as e:
+                print(f"❌ Error: {e} (re-ingest the bundles to build the trend store)")
+                return
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                return
+        if args.trend:
+            for row in history.itertuples():
+                series = "/".join(p for p in (row.cluster_name, row.node_id, row.namespace, row.set_name) if p)
+                print(f"{row.day} | {series:<45} | min {row.min:>14,.2f} | max {row.max:>14,.2f} | "
+                      f"last {row.last:>14,.2f} | {row.metric}")
+        else:
+            print(f"Δ {history.attrs['runs'][0]} -> {history.attrs['runs'][1]}")
+            for row in history.itertuples():
+                series = "/".join(p for p in (row.cluster_name, row.node_id, row.namespace, row.set_name) if p)
+                print(f"{series:<45} | {row.value_a:>14,.2f} -> {row.value_b:>14,.2f} | "
+                      f"{row.delta:>+14,.2f} ({row.delta_pct:+.1f}%) | {row.metric}")
+        if history.empty:
+            print("✅ No matching series in the trend store.")
+        return
+
+    runner = RuleRunner(args.db_path, workers=args.workers, use_store=not args.fresh, run_id=args.run)
+    for res in runner.run():
+        print(f"{res.get('id', '??'):<5} | {res.get('status', ''):<15} | {res.get('message', '')}")
+    print(f"⏱️ {runner.report()}")
+
+if __name__ == "__main__":
+    main()